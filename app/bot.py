@@ -4,11 +4,12 @@ import logging
 from typing import Any
 
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters
 
 from app.config import settings
 from app.handlers.image import handle_image_message
 from app.handlers.text import handle_text_message
+from app.utils.deadline import begin_update, end_update
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +28,11 @@ def create_bot_application() -> Application:
     """
     application = Application.builder().token(settings.telegram_bot_token).build()
 
+    # Every update gets a time budget before any handler runs (in webhook
+    # mode it was already started on arrival) and is measured after all of them
+    application.add_handler(TypeHandler(Update, begin_update_deadline), group=-1)
+    application.add_handler(TypeHandler(Update, end_update_deadline), group=1)
+
     # Register handlers
     # Text messages
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
@@ -41,6 +47,16 @@ def create_bot_application() -> Application:
     return application
 
 
+async def begin_update_deadline(update: Update, context: Any) -> None:
+    """Start the update's deadline budget."""
+    begin_update(update.update_id)
+
+
+async def end_update_deadline(update: Update, context: Any) -> None:
+    """Record whether the update stayed within its budget."""
+    end_update()
+
+
 async def start_command(update: Update, context: Any) -> None:
     """Handle /start command."""
     await update.message.reply_text(
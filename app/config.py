@@ -1,7 +1,21 @@
 """Configuration management using Pydantic settings."""
 
+from typing import Literal, Optional
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ResponseFormat = Literal["json_schema", "json_object", "none"]
+
+
+class LLMEndpointConfig(BaseModel):
+    """An extra OpenAI-compatible endpoint for failover and hedged requests."""
+
+    api_base: str
+    api_key: str = ""  # empty = llm_api_key
+    model: str = ""  # empty = the routed model
+    response_format: Optional[ResponseFormat] = None  # None = llm_response_format
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -10,15 +24,91 @@ class Settings(BaseSettings):
     telegram_bot_token: str
     telegram_webhook_url: str = ""
     telegram_secret_token: str = ""
+    # Time budget for handling one update, shared by downloads, inference, LLM and replies
+    update_deadline_seconds: float = 45.0
 
     # LLM Configuration
     llm_api_key: str = ""
     llm_api_base: str = "https://openrouter.ai/api/v1"
     llm_model: str = "openai/gpt-3.5-turbo"
+    # Route by input size (empty = llm_model); counted with a Hugging Face tokenizer
+    llm_fast_model: str = ""
+    llm_long_context_model: str = ""
+    llm_route_threshold_tokens: int = 1000
+    llm_tokenizer: str = "openai-community/gpt2"  # empty = estimate from length
+    # More endpoints (JSON list): requests go to the fastest healthy one, with a
+    # hedged duplicate to the next after its p95 latency
+    llm_fallback_endpoints: list[LLMEndpointConfig] = []
+    llm_hedging: bool = True
+    # Structured output: a strict JSON schema, plain JSON mode, or prompt only.
+    # An endpoint that rejects it is downgraded one step at a time
+    llm_response_format: ResponseFormat = "json_schema"
+    # Stream completions and edit the reply as the summary arrives
+    llm_streaming: bool = True
+    llm_stream_edit_interval_seconds: float = 1.5  # Telegram limits edits per chat
+
+    # LLM Request Scheduling (0 = no limit for the per-minute budgets)
+    llm_max_concurrency: int = 4
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_max_retries: int = 2  # on 429/502/503/504, honoring Retry-After
+
+    # Long texts: analyze chunks in parallel, then merge ("local") or summarize the summaries ("reduce")
+    llm_chunk_threshold_tokens: int = 3000  # 0 = never chunk
+    llm_chunk_max_tokens: int = 1000  # capped at llm_route_threshold_tokens
+    llm_chunk_merge: Literal["local", "reduce"] = "local"
+
+    # Who analyzes long texts: the LLM, the local CPU tier with the LLM for the
+    # summary only, or the local tier alone
+    text_analysis_policy: Literal["llm", "local_first", "local"] = "llm"
+    local_sentiment_model: str = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+    local_sentiment_max_batch_size: int = 32
+    local_sentiment_max_wait_ms: float = 10.0
+
+    # Circuit breakers: open after this many failures in a row, probe again after the interval
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_recovery_seconds: float = 30.0
+    n8n_circuit_failure_threshold: int = 5
+    n8n_circuit_recovery_seconds: float = 60.0
+    n8n_deferred_max_events: int = 1000  # held while the n8n circuit is open
+
+    # LLM Analysis Cache (successful analyses only)
+    llm_cache_max_entries: int = 5000
+    llm_cache_ttl_seconds: int = 24 * 3600
+    llm_cache_path: str = ""  # SQLite file; empty = memory only
+
+    # Image Inference
+    inference_max_batch_size: int = 16
+    inference_max_wait_ms: float = 5.0
+    inference_workers: int = 1
+    inference_threads_per_worker: int = 0  # 0 = runtime default
+    inference_backend: Literal["torch", "onnx"] = "torch"
+    onnx_model_path: str = ""  # default: app/assets/resnet18.onnx
+    # Torch CPU execution mode; check accuracy with scripts/parity_check.py before switching
+    inference_mode: Literal[
+        "eager", "torchscript", "compile", "dynamic_int8", "static_int8", "bf16"
+    ] = "eager"
+    # Download weights when app/assets/resnet18.pth is missing (local development)
+    model_allow_download: bool = True
+    # Cheap-first cascade: escalate to ResNet18 when the fast model's top-1 is below threshold
+    cascade_enabled: bool = False
+    cascade_threshold: float = 0.6
+    cascade_fast_model: Literal["mobilenet_v3_small"] = "mobilenet_v3_small"
+
+    # Image Classification Cache
+    classification_cache_max_entries: int = 10000
+    classification_cache_ttl_seconds: int = 7 * 24 * 3600
+    classification_cache_path: str = ""  # SQLite file; empty = memory only
 
     # n8n Event Logging
     n8n_webhook_url: str = ""
 
+    # Outbound HTTP connection pools (LLM API, n8n), per upstream
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = True  # needs the h2 package; falls back to HTTP/1.1
+
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
@@ -1,13 +1,106 @@
 """Image message handler."""
 
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
 from datetime import datetime
+from typing import Any, Optional
 
-from telegram import Update
+from telegram import PhotoSize, Update
 from telegram.ext import ContextTypes
 
-from app.utils.classify import classify_image
+from app.utils.cache import classification_cache
+from app.utils.classify import ClassificationResult
+from app.utils.deadline import telegram_timeouts, within_deadline
 from app.utils.events import log_event
-from app.utils.image_descriptions import get_image_description, get_category_description
+from app.utils.image_io import RESIZE_SIZE
+from app.utils.image_reply import render_image_reply
+from app.utils.inference import classify_image_async
+from app.utils.metrics import metrics
+from app.utils.phash import perceptual_hash
+
+logger = logging.getLogger(__name__)
+
+
+def select_photo_size(photos: Sequence[PhotoSize], min_side: int = RESIZE_SIZE) -> PhotoSize:
+    """
+    Pick the smallest photo variant the model can use without upscaling.
+
+    The model only sees a 224px center crop of the image resized to
+    ``min_side``, so anything larger than that is wasted download. The
+    largest variant is used only when no smaller one is big enough.
+
+    Args:
+        photos: Telegram PhotoSize variants of one photo
+        min_side: Minimum length of the short side
+
+    Returns:
+        The selected PhotoSize
+    """
+    large_enough = [p for p in photos if min(p.width, p.height) >= min_side]
+    if large_enough:
+        return min(large_enough, key=lambda p: p.width * p.height)
+    return max(photos, key=lambda p: p.width * p.height)
+
+
+async def _download_photo(
+    photo: PhotoSize, largest: PhotoSize, context: ContextTypes.DEFAULT_TYPE
+) -> tuple[bytearray, dict[str, Any]]:
+    """Download a photo variant and record bytes saved versus the largest variant."""
+    start = time.perf_counter()
+    file = await within_deadline(context.bot.get_file(photo.file_id))
+    # Keep the downloaded bytearray; decoding reads it through a memoryview
+    image_bytes = await within_deadline(file.download_as_bytearray())
+    download_ms = (time.perf_counter() - start) * 1000
+
+    download_bytes = len(image_bytes)
+    bytes_saved = max((largest.file_size or download_bytes) - download_bytes, 0)
+
+    metrics.increment("image_download_bytes", download_bytes)
+    metrics.increment("image_download_bytes_saved", bytes_saved)
+    metrics.observe("image_download_ms", download_ms)
+
+    return image_bytes, {
+        "photo_size": f"{photo.width}x{photo.height}",
+        "download_bytes": download_bytes,
+        "bytes_saved": bytes_saved,
+        "download_ms": round(download_ms, 1),
+    }
+
+
+async def _classify_photo(
+    photo: PhotoSize, largest: PhotoSize, context: ContextTypes.DEFAULT_TYPE
+) -> tuple[ClassificationResult, Optional[dict[str, Any]]]:
+    """
+    Classify a photo, consulting the result cache before downloading or inferring.
+
+    A hit on ``file_unique_id`` skips the download; a hit on the perceptual
+    hash skips inference.
+
+    Returns:
+        Classification result and download stats (None when the download was skipped)
+    """
+    result = classification_cache.get_by_file_id(photo.file_unique_id)
+    if result is not None:
+        return result, None
+
+    image_bytes, download = await _download_photo(photo, largest, context)
+
+    try:
+        phash = await asyncio.to_thread(perceptual_hash, image_bytes)
+    except ValueError as e:
+        # Let the classifier report undecodable images
+        logger.debug(f"Skipping perceptual hash cache: {e}")
+        phash = None
+
+    result = classification_cache.get_by_phash(phash) if phash else None
+    if result is None:
+        # Classify image - get top 3 predictions
+        result = await within_deadline(classify_image_async(image_bytes, top_k=3))
+
+    classification_cache.set(result, file_unique_id=photo.file_unique_id, phash=phash)
+    return result, download
 
 
 async def handle_image_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -22,62 +115,23 @@ async def handle_image_message(update: Update, context: ContextTypes.DEFAULT_TYP
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
 
-    # Get the largest photo
-    photo = update.message.photo[-1]
+    # Get the smallest photo variant that still covers the model input
+    largest = update.message.photo[-1]
+    photo = select_photo_size(update.message.photo)
 
     # Send processing message
-    processing_msg = await update.message.reply_text("🔍 Analyzing image...")
+    processing_msg = await update.message.reply_text(
+        "🔍 Analyzing image...", **telegram_timeouts()
+    )
 
     try:
-        # Download image
-        file = await context.bot.get_file(photo.file_id)
-        image_bytes = await file.download_as_bytearray()
-
-        # Classify image - get top 3 predictions
-        predictions = classify_image(bytes(image_bytes), top_k=3)
+        result, download = await _classify_photo(photo, largest, context)
+        predictions = result.predictions
 
         # Format response using HTML (more reliable than Markdown)
-        from telegram.helpers import escape
-        
-        # Get main description
-        top_label, top_confidence = predictions[0]
-        main_description = get_image_description(top_label, top_confidence)
-        category_desc = get_category_description(top_label)
-        
-        response_parts = [
-            "🖼️ <b>Image Recognition Analysis</b>\n",
-            f"📸 {category_desc.lower()}.\n",
-            f"🎯 <b>Primary Identification:</b>\n{main_description}\n",
-            "\n📊 <b>Detailed Predictions:</b>\n"
-        ]
-        
-        for i, (label, confidence) in enumerate(predictions, 1):
-            confidence_percent = confidence * 100
-            escaped_label = escape(label.replace("_", " ").title())
-            description = get_image_description(label, confidence)
-            
-            # Add emoji for ranking
-            emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
-            
-            # Confidence level
-            if confidence_percent > 80:
-                conf_level = "Very High"
-            elif confidence_percent > 50:
-                conf_level = "High"
-            elif confidence_percent > 30:
-                conf_level = "Medium"
-            else:
-                conf_level = "Low"
-            
-            response_parts.append(
-                f"{emoji} <b>{i}.</b> {escaped_label}\n"
-                f"   {description}\n"
-                f"   Confidence: {confidence_percent:.1f}% ({conf_level})\n"
-            )
-        
-        response_text = "\n".join(response_parts)
-
-        await processing_msg.edit_text(response_text, parse_mode="HTML")
+        response_text = render_image_reply(result)
+
+        await processing_msg.edit_text(response_text, parse_mode="HTML", **telegram_timeouts())
 
         # Log event to n8n
         await log_event(
@@ -87,6 +141,8 @@ async def handle_image_message(update: Update, context: ContextTypes.DEFAULT_TYP
                 "user_id": user_id,
                 "chat_id": chat_id,
                 "file_id": photo.file_id,
+                "download": download,
+                "model": result.model,
                 "predictions": [
                     {"label": label, "confidence": conf * 100} 
                     for label, conf in predictions
@@ -96,7 +152,7 @@ async def handle_image_message(update: Update, context: ContextTypes.DEFAULT_TYP
 
     except Exception as e:
         error_msg = f"❌ Error processing image: {str(e)}"
-        await processing_msg.edit_text(error_msg)
+        await processing_msg.edit_text(error_msg, **telegram_timeouts())
 
         # Log error event
         await log_event(
@@ -5,8 +5,12 @@ from datetime import datetime
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from app.config import settings
+from app.utils.deadline import telegram_timeouts
 from app.utils.events import log_event
 from app.utils.llm import analyze_text
+from app.utils.llm_scheduler import chat_priority
+from app.utils.message_editor import ThrottledEditor, summary_progress
 
 
 async def handle_llm_request(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -39,10 +43,17 @@ async def handle_llm_request(update: Update, context: ContextTypes.DEFAULT_TYPE)
     chat_id = update.effective_chat.id
 
     # Send processing message
-    processing_msg = await update.message.reply_text("🤖 Analyzing with AI...")
+    processing_msg = await update.message.reply_text(
+        "🤖 Analyzing with AI...", **telegram_timeouts()
+    )
 
-    # Perform AI analysis
-    analysis = await analyze_text(text)
+    # Perform AI analysis, showing the summary while it is generated
+    editor = ThrottledEditor(processing_msg, settings.llm_stream_edit_interval_seconds)
+    analysis = await analyze_text(
+        text,
+        on_partial=summary_progress(editor),
+        priority=chat_priority(update.effective_chat.type),
+    )
 
     # Format response
     response_parts = [
@@ -69,7 +80,7 @@ async def handle_llm_request(update: Update, context: ContextTypes.DEFAULT_TYPE)
     response_text = "\n".join(response_parts)
 
     # Update message with results
-    await processing_msg.edit_text(response_text, parse_mode="Markdown")
+    await editor.finish(response_text, parse_mode="Markdown")
 
     # Log LLM analysis event
     await log_event(
@@ -6,8 +6,11 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from app.config import settings
+from app.utils.deadline import telegram_timeouts
 from app.utils.events import log_event
 from app.utils.llm import analyze_text
+from app.utils.llm_scheduler import chat_priority
+from app.utils.message_editor import ThrottledEditor, summary_progress
 
 # Threshold for considering a message "long" (characters)
 LONG_TEXT_THRESHOLD = 200
@@ -43,14 +46,19 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     if len(text) > LONG_TEXT_THRESHOLD:
         # Send processing message
         processing_msg = await update.message.reply_text(
-            "🤖 Analyzing your message with AI..."
+            "🤖 Analyzing your message with AI...", **telegram_timeouts()
         )
 
-        # Perform AI analysis
-        analysis = await analyze_text(text)
+        # Perform AI analysis, showing the summary while it is generated
+        editor = ThrottledEditor(processing_msg, settings.llm_stream_edit_interval_seconds)
+        analysis = await analyze_text(
+            text,
+            on_partial=summary_progress(editor),
+            priority=chat_priority(update.effective_chat.type),
+        )
 
-        # Check if LLM API key is configured
-        if not settings.llm_api_key:
+        # Check if LLM API key is configured (the local tiers work without it)
+        if not settings.llm_api_key and settings.text_analysis_policy == "llm":
             # Provide helpful message if API key is not set
             response_text = (
                 "📊 **AI Analysis**\n\n"
@@ -87,7 +95,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             response_text = "\n".join(response_parts)
 
         # Update message with results
-        await processing_msg.edit_text(response_text, parse_mode="Markdown")
+        await editor.finish(response_text, parse_mode="Markdown")
 
         # Log LLM analysis event
         await log_event(
@@ -130,6 +138,6 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             response_parts.append("   • Sentiment analysis")
         
         response_text = "\n".join(response_parts)
-        await update.message.reply_text(response_text, parse_mode="HTML")
+        await update.message.reply_text(response_text, parse_mode="HTML", **telegram_timeouts())
 
 
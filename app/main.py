@@ -1,5 +1,6 @@
 """FastAPI application with Telegram webhook endpoint."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -10,7 +11,19 @@ from app.bot import create_bot_application
 from app.config import settings
 from app.handlers.text import handle_text_message
 from app.handlers.image import handle_image_message
-from app.utils.events import log_event
+from app.utils.cache import classification_cache
+from app.utils.circuit_breaker import circuit_stats
+from app.utils.deadline import begin_update, end_update
+from app.utils.events import deferred_event_count, flush_deferred_events, log_event
+from app.utils.http import http_clients
+from app.utils.image_reply import get_reply_renderer
+from app.utils.inference import cascade_stats, get_image_batcher, inference_engine
+from app.utils.llm import analysis_cache, analysis_flights
+from app.utils.llm_endpoints import llm_endpoints
+from app.utils.llm_scheduler import llm_scheduler
+from app.utils.local_analysis import get_sentiment_batcher, warmup_local_analysis
+from app.utils.metrics import metrics as runtime_metrics
+from app.utils.tokens import load_tokenizer
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +41,28 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for FastAPI app."""
     global bot_application
 
+    # Startup: Pre-render the per-class reply fragments
+    get_reply_renderer()
+
+    # Startup: Keep-alive connection pools for the LLM API and n8n
+    http_clients.start(*(e.api_base for e in llm_endpoints.endpoints), settings.n8n_webhook_url)
+
+    # Startup: Start inference workers and warm the model before taking updates
+    try:
+        await inference_engine.warmup()
+    except Exception as e:
+        logger.error(f"Model warmup failed, image classification unavailable: {e}")
+
+    # Startup: Load the tokenizer used to count and route LLM prompts
+    await asyncio.to_thread(load_tokenizer)
+
+    # Startup: Load the local sentiment model if the text policy uses it
+    if settings.text_analysis_policy != "llm":
+        try:
+            await warmup_local_analysis()
+        except Exception as e:
+            logger.error(f"Local sentiment model failed to load: {e}")
+
     # Startup: Initialize bot
     logger.info("Starting Telegram bot application...")
     bot_application = create_bot_application()
@@ -55,6 +90,16 @@ async def lifespan(app: FastAPI):
         await bot_application.bot.delete_webhook()
         await bot_application.shutdown()
 
+    await flush_deferred_events()
+    if deferred_event_count():
+        logger.warning(f"{deferred_event_count()} n8n event(s) not delivered before shutdown")
+    await get_image_batcher().close()
+    await get_sentiment_batcher().close()
+    await inference_engine.shutdown()
+    await http_clients.close()
+    classification_cache.close()
+    analysis_cache.close()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -77,6 +122,46 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness endpoint: OK only once the image model is loaded and warm."""
+    if not inference_engine.ready:
+        return JSONResponse(
+            {"status": "not ready", "model": "warming up"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for caches, inference workers, outbound HTTP and I/O."""
+    return {
+        **runtime_metrics.snapshot(),
+        "classification_cache": classification_cache.stats(),
+        "llm_cache": analysis_cache.stats(),
+        "llm_coalescing": analysis_flights.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_endpoints": llm_endpoints.stats(),
+        "inference": {
+            "workers": inference_engine.workers,
+            "restarts": inference_engine.restarts,
+            "ready": inference_engine.ready,
+            "cascade": cascade_stats(),
+        },
+        "http": http_clients.stats(),
+    }
+
+
+@app.get("/circuits")
+async def circuits():
+    """Circuit breaker states for the LLM API and n8n."""
+    return {
+        **circuit_stats(),
+        "n8n_deferred_events": deferred_event_count(),
+    }
+
+
 @app.post("/webhook")
 async def webhook(request: Request):
     """
@@ -105,15 +190,20 @@ async def webhook(request: Request):
         update_data = await request.json()
         from telegram import Update
 
-        update = Update.de_json(update_data, bot_application.bot)
+        # The update's time budget starts as soon as it arrives
+        begin_update(update_data.get("update_id"))
+        try:
+            update = Update.de_json(update_data, bot_application.bot)
 
-        if update is None:
-            logger.warning("Failed to parse update from webhook")
-            return {"status": "error", "message": "Invalid update"}
+            if update is None:
+                logger.warning("Failed to parse update from webhook")
+                return {"status": "error", "message": "Invalid update"}
 
-        # Process update
-        # For webhook mode, process_update handles the update directly
-        await bot_application.process_update(update)
+            # Process update
+            # For webhook mode, process_update handles the update directly
+            await bot_application.process_update(update)
+        finally:
+            end_update()
 
         return {"status": "ok"}
 
@@ -0,0 +1,74 @@
+"""Inference backend interface for the image classifier.
+
+A backend turns a preprocessed NCHW float32 batch into 1000-way logits.
+Everything around it (decoding, preprocessing, softmax, labels) is shared and
+lives in ``app.utils.classify``, so backends are interchangeable. Backend
+modules import their runtime lazily: an ONNX worker never imports torch.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from app.utils.image_io import CROP_SIZE
+
+INFERENCE_BACKENDS = ("torch", "onnx")
+
+# Supported ImageNet classifiers, cheapest first
+MODELS = ("mobilenet_v3_small", "resnet18")
+MODEL_DISPLAY_NAMES = {
+    "mobilenet_v3_small": "MobileNetV3-Small",
+    "resnet18": "ResNet18",
+}
+
+
+class InferenceBackend(ABC):
+    """Runs the classification model on preprocessed batches."""
+
+    name: str = ""
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the model. Called once per worker process."""
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run a forward pass.
+
+        Args:
+            batch: float32 array of shape (N, 3, 224, 224)
+
+        Returns:
+            float32 logits of shape (N, 1000)
+        """
+
+    def warmup(self) -> None:
+        """Run a dummy forward pass so lazy initialization happens up front."""
+        self.predict(np.zeros((1, 3, CROP_SIZE, CROP_SIZE), dtype=np.float32))
+
+
+def create_backend(
+    name: str, model_name: str = "resnet18", mode: str = "eager", num_threads: int = 0
+) -> InferenceBackend:
+    """
+    Create an (unloaded) inference backend.
+
+    Args:
+        name: One of INFERENCE_BACKENDS
+        model_name: One of MODELS
+        mode: Torch inference mode (ignored by other backends)
+        num_threads: Intra-op threads per worker; 0 keeps the runtime default
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "torch":
+        from app.utils.torch_backend import TorchBackend
+
+        return TorchBackend(model_name=model_name, mode=mode, num_threads=num_threads)
+    if name == "onnx":
+        from app.utils.onnx_backend import OnnxBackend, onnx_path
+
+        return OnnxBackend(model_path=onnx_path(model_name), num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend: {name}")
@@ -0,0 +1,146 @@
+"""Asyncio micro-batching for inference workloads."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect concurrent requests into batches and process them together.
+
+    The first pending item opens a batch window. The batch is dispatched as
+    soon as it reaches ``max_batch_size`` items or ``max_wait_ms`` has passed,
+    whichever comes first. Each caller gets back the result for its own item.
+
+    ``process_batch`` receives the list of items and must return one result
+    per item in the same order. A result that is an exception instance is
+    raised to that caller only. Up to ``max_concurrency`` batches may be in
+    flight at once, e.g. one per inference worker process.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[T]], Awaitable[list[R | BaseException]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        max_concurrency: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_concurrency = max_concurrency
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, item: T) -> R:
+        """Queue an item for the next batch and wait for its result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the batching worker and fail any requests still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._in_flight.clear()
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher closed"))
+
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    def _ensure_worker(self) -> None:
+        """Start the worker task on the running loop if it is not alive."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # A new event loop (e.g. after a restart or in tests) needs its own queue
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = loop.create_task(self._run())
+
+    async def _collect_batch(self) -> list[tuple[T, asyncio.Future]]:
+        """Wait for the first item, then fill the batch until it is full or the window ends."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                # Take whatever is already queued without waiting further
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Worker loop: wait for a free slot, collect a batch, dispatch it."""
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            task = self._loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        """Process one batch and resolve each caller's future."""
+        items = [item for item, _ in batch]
+        try:
+            results = await self._process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch processor returned {len(results)} results for {len(items)} items"
+                )
+        except asyncio.CancelledError:
+            results = [RuntimeError("Batcher closed")] * len(items)
+        except Exception as e:
+            results = [e] * len(items)
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                # Caller was cancelled while waiting
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
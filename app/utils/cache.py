@@ -0,0 +1,87 @@
+"""Two-tier cache for image classification results."""
+
+from typing import Any, Optional
+
+from app.config import settings
+from app.utils.classify import ClassificationResult
+from app.utils.phash import is_distinctive_hash
+from app.utils.ttl_cache import TTLCache
+
+
+class ClassificationCache:
+    """
+    Two-tier cache for image classification results.
+
+    The first tier is keyed by Telegram's ``file_unique_id``, so a re-sent or
+    forwarded photo is answered without downloading it. The second tier is
+    keyed by a perceptual hash of the decoded image, which catches the same
+    picture uploaded again as a new file. Hashes of flat, low-detail images
+    (sky, a plain wall, a dark photo) say little about the picture, so
+    those images are never looked up or stored in the second tier.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        sqlite_path: str = "",
+    ):
+        self.by_file_id = TTLCache(max_entries, ttl_seconds, sqlite_path, namespace="file_id")
+        self.by_phash = TTLCache(max_entries, ttl_seconds, sqlite_path, namespace="phash")
+
+    def get_by_file_id(self, file_unique_id: str) -> Optional[ClassificationResult]:
+        """Look up the result for a Telegram file."""
+        return _as_result(self.by_file_id.get(file_unique_id))
+
+    def get_by_phash(self, phash: str) -> Optional[ClassificationResult]:
+        """Look up the result for a perceptual image hash."""
+        if not is_distinctive_hash(phash):
+            return None
+        return _as_result(self.by_phash.get(phash))
+
+    def set(
+        self,
+        result: ClassificationResult,
+        file_unique_id: Optional[str] = None,
+        phash: Optional[str] = None,
+    ) -> None:
+        """Store a result under whichever keys are known."""
+        value = {
+            "model": result.model,
+            "predictions": [[label, confidence] for label, confidence in result.predictions],
+            "class_indices": result.class_indices,
+        }
+        if file_unique_id:
+            self.by_file_id.set(file_unique_id, value)
+        if phash and is_distinctive_hash(phash):
+            self.by_phash.set(phash, value)
+
+    def close(self) -> None:
+        """Close persistence for both tiers."""
+        self.by_file_id.close()
+        self.by_phash.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for both tiers."""
+        return {
+            "file_unique_id": self.by_file_id.stats(),
+            "perceptual_hash": self.by_phash.stats(),
+        }
+
+
+def _as_result(value: Optional[dict]) -> Optional[ClassificationResult]:
+    """Convert a cached (possibly JSON round-tripped) value back into a result."""
+    if value is None:
+        return None
+    return ClassificationResult(
+        [(label, confidence) for label, confidence in value["predictions"]],
+        model=value["model"],
+        class_indices=value.get("class_indices", []),
+    )
+
+
+classification_cache = ClassificationCache(
+    max_entries=settings.classification_cache_max_entries,
+    ttl_seconds=settings.classification_cache_ttl_seconds,
+    sqlite_path=settings.classification_cache_path,
+)
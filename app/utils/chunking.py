@@ -0,0 +1,64 @@
+"""Splitting long texts into chunks on paragraph boundaries."""
+
+import re
+
+from app.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> list[str]:
+    """Split a paragraph that alone exceeds the budget: by line, then sentence, then length."""
+    for pattern in (re.compile(r"\n"), _SENTENCE_END):
+        pieces = [p for p in pattern.split(paragraph) if p.strip()]
+        if len(pieces) > 1:
+            return _pack(pieces, max_tokens, separator="\n" if pattern.pattern == r"\n" else " ")
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return [paragraph[i : i + max_chars] for i in range(0, len(paragraph), max_chars)]
+
+
+def _pack(pieces: list[str], max_tokens: int, separator: str) -> list[str]:
+    """Greedily join consecutive pieces into chunks of at most ``max_tokens``."""
+    chunks: list[str] = []
+    current: list[str] = []
+    current_chars = 0
+
+    for piece in pieces:
+        if estimate_tokens(piece) > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, current_chars = [], 0
+            chunks.extend(_split_oversized(piece, max_tokens))
+            continue
+        # Count the separator too, so the joined chunk stays within the budget
+        joined_chars = current_chars + len(separator) + len(piece)
+        if current and joined_chars // CHARS_PER_TOKEN > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_chars = [], 0
+        current_chars = current_chars + len(separator) + len(piece) if current else len(piece)
+        current.append(piece)
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Split text into chunks of roughly ``max_tokens`` tokens, on paragraph boundaries.
+
+    Consecutive paragraphs are packed together while they fit. A paragraph
+    that alone is over the budget is split by lines, then sentences, and
+    only as a last resort at a fixed length.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk (estimated, see estimate_tokens)
+
+    Returns:
+        Non-empty chunks in document order
+    """
+    paragraphs = [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+    return _pack(paragraphs, max(max_tokens, 1), separator="\n\n")
@@ -0,0 +1,174 @@
+"""Circuit breakers for outbound upstreams (LLM API, n8n).
+
+After enough consecutive failures a circuit opens and calls fail immediately
+instead of each waiting for its own timeout. Once the probe interval has
+passed the circuit is half-open: one call goes through as a probe, and its
+outcome closes the circuit again or reopens it for another interval.
+"""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import httpx
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open, next probe in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit for one upstream.
+
+    Only errors for which ``is_failure`` returns True count; other errors
+    (e.g. a bad request) are passed through without affecting the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_seconds = recovery_seconds
+        self._is_failure = is_failure
+        self._clock = clock
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit turns half-open once the probe interval has passed."""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open state, only one probe at a time."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        metrics.increment(f"circuit_{self.name}_rejected")
+        return False
+
+    def record_success(self) -> None:
+        """A call succeeded: close the circuit."""
+        if self._state != CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self._state = CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """A call failed: open the circuit after a failed probe or too many failures in a row."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+                metrics.increment(f"circuit_{self.name}_opened")
+                logger.warning(
+                    f"{self.name} circuit opened after {self._failures} failure(s), "
+                    f"probing again in {self.recovery_seconds:.0f}s"
+                )
+            self._state = OPEN
+            self._opened_at = self._clock()
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.recovery_seconds - self._clock(), 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn()`` through the circuit.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (``fn`` is not called)
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, Exception) and self._is_failure(e):
+                self.record_failure()
+            else:
+                # Cancelled, or not the upstream's fault: free the probe slot
+                self._probe_in_flight = False
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """State, configuration and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_seconds": self.recovery_seconds,
+            "retry_in_seconds": round(self.retry_in(), 3),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error is the upstream's fault (5xx, 429, connection errors) rather than the request's."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+llm_circuit = CircuitBreaker(
+    "llm",
+    failure_threshold=settings.llm_circuit_failure_threshold,
+    recovery_seconds=settings.llm_circuit_recovery_seconds,
+    is_failure=is_upstream_failure,
+)
+
+# Any failed delivery counts: a 404 means the webhook is as unusable as a 503
+n8n_circuit = CircuitBreaker(
+    "n8n",
+    failure_threshold=settings.n8n_circuit_failure_threshold,
+    recovery_seconds=settings.n8n_circuit_recovery_seconds,
+)
+
+
+def circuit_stats() -> dict[str, Any]:
+    """States of the upstream circuits, by name."""
+    return {c.name: c.stats() for c in (llm_circuit, n8n_circuit)}
@@ -0,0 +1,102 @@
+"""Per-class description and category tables indexed by ImageNet class index.
+
+Descriptions and categories only depend on the class label, so they are
+computed once for all 1000 classes and rendering a reply is array indexing.
+The tables are written to ``app/assets/class_tables.json`` at build time by
+scripts/fetch_assets.py; if that file is missing or stale they are built in
+memory at startup instead.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.utils import image_descriptions
+from app.utils.labels import ASSETS_DIR, IMAGENET_CLASSES_PATH, NUM_CLASSES, load_imagenet_classes
+
+logger = logging.getLogger(__name__)
+
+CLASS_TABLES_PATH = ASSETS_DIR / "class_tables.json"
+
+
+@dataclass
+class ClassTables:
+    """Base description and category sentence for every class index."""
+
+    descriptions: list[str]
+    categories: list[str]
+
+
+_tables: Optional[ClassTables] = None
+
+
+def _fingerprint() -> str:
+    """Hash of the inputs the tables are generated from, to detect stale artifacts."""
+    digest = hashlib.sha256()
+    digest.update(IMAGENET_CLASSES_PATH.read_bytes())
+    digest.update(Path(image_descriptions.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_class_tables() -> ClassTables:
+    """Compute the description and category of every class."""
+    descriptions = image_descriptions._get_image_descriptions()
+    classes = load_imagenet_classes()
+    return ClassTables(
+        descriptions=[descriptions[label.lower()] for label in classes],
+        categories=[image_descriptions.get_category_description(label) for label in classes],
+    )
+
+
+def save_class_tables(tables: ClassTables, path: Path = CLASS_TABLES_PATH) -> None:
+    """
+    Write the tables as JSON.
+
+    Categories are stored once and referenced by position to keep the file small.
+    """
+    category_names = sorted(set(tables.categories))
+    positions = {name: i for i, name in enumerate(category_names)}
+    artifact = {
+        "fingerprint": _fingerprint(),
+        "descriptions": tables.descriptions,
+        "category_names": category_names,
+        "categories": [positions[name] for name in tables.categories],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(artifact, separators=(",", ":")), encoding="utf-8")
+
+
+def _read_artifact(path: Path) -> Optional[ClassTables]:
+    """Read saved tables, or None if the file is missing, malformed or stale."""
+    try:
+        artifact = json.loads(path.read_text(encoding="utf-8"))
+        if artifact["fingerprint"] != _fingerprint():
+            logger.info(f"Class tables at {path} are stale, rebuilding")
+            return None
+        names = artifact["category_names"]
+        tables = ClassTables(
+            descriptions=artifact["descriptions"],
+            categories=[names[i] for i in artifact["categories"]],
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable class tables at {path}: {e}")
+        return None
+
+    if len(tables.descriptions) != NUM_CLASSES or len(tables.categories) != NUM_CLASSES:
+        logger.warning(f"Ignoring class tables at {path}: expected {NUM_CLASSES} entries")
+        return None
+    return tables
+
+
+def load_class_tables(path: Path = CLASS_TABLES_PATH) -> ClassTables:
+    """Load the tables from the build artifact, building them if it's unusable."""
+    global _tables
+    if _tables is None:
+        _tables = _read_artifact(path) or build_class_tables()
+    return _tables
+
@@ -1,151 +1,269 @@
-"""Image classification utilities using torchvision ResNet18."""
+"""Image classification utilities using ResNet18.
 
-import io
-import os
-import ssl
+Decoding, preprocessing and top-k labeling are shared; the forward pass is
+delegated to the configured inference backend (PyTorch or ONNX Runtime).
+With the cascade enabled, a cheap model answers first and only low-confidence
+images are escalated to ResNet18.
+"""
+
+import logging
+from dataclasses import dataclass, field
 from typing import Optional
 
-import certifi
-import torch
+import numpy as np
 from PIL import Image
-from torchvision import models, transforms
-
-# Fix SSL certificate issues on macOS
-# Set SSL certificate path before any network requests
-os.environ["SSL_CERT_FILE"] = certifi.where()
-os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
-
-# Load ResNet18 model and ImageNet class labels
-_model: Optional[torch.nn.Module] = None
-_class_names: Optional[list[str]] = None
-_transform = transforms.Compose(
-    [
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-    ]
-)
+
+from app.config import settings
+from app.utils.backends import InferenceBackend, create_backend
+from app.utils.image_io import CROP_SIZE, RESIZE_SIZE, ImageBuffer, open_image
+from app.utils.labels import load_imagenet_classes
+
+logger = logging.getLogger(__name__)
+
+# Primary model; the cascade's fast model escalates to it
+MAIN_MODEL = "resnet18"
+
+# Loaded inference backends by model name, one set per worker process
+_backends: dict[str, InferenceBackend] = {}
+
+# Preprocessing: equivalent to Resize(256) + CenterCrop(224) + ToTensor + Normalize
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+# Per-channel lookup table: uint8 pixel value -> normalized float32,
+# so scaling and normalization happen in a single gather per channel
+_NORMALIZE_LUT = (np.arange(256, dtype=np.float32)[None, :] / 255.0 - _MEAN[:, None]) / _STD[:, None]
+
+# Reused input buffer for batches (grown on demand, one per worker process)
+_batch_buffer: Optional[np.ndarray] = None
+
+
+@dataclass
+class ClassificationResult:
+    """Top-k predictions for one image and the model that produced them."""
+
+    predictions: list[tuple[str, float]]
+    model: str = MAIN_MODEL
+    # ImageNet class index of each prediction (empty for results cached before indices)
+    class_indices: list[int] = field(default_factory=list)
 
 
 def _load_imagenet_classes() -> list[str]:
-    """Load ImageNet class names from PyTorch's official repository."""
-    global _class_names
-    if _class_names is None:
-        import urllib.request
-        
-        # URL to ImageNet class names (standard mapping from PyTorch)
-        imagenet_url = "https://raw.githubusercontent.com/pytorch/hub/master/imagenet_classes.txt"
-        
-        try:
-            # Download ImageNet class names
-            with urllib.request.urlopen(imagenet_url, timeout=10) as response:
-                class_names_text = response.read().decode('utf-8')
-                _class_names = [line.strip() for line in class_names_text.strip().split('\n')]
-            
-            if len(_class_names) != 1000:
-                raise ValueError(f"Expected 1000 classes, got {len(_class_names)}")
-                
-        except Exception as e:
-            # Fallback: use a hardcoded subset if download fails
-            print(f"Warning: Could not download ImageNet classes: {e}")
-            print("Using fallback class names")
-            
-            # Create fallback with generic names
-            _class_names = [f"class_{i}" for i in range(1000)]
-            
-            # Add some common class names we know
-            common_classes = [
-                "tench", "goldfish", "great white shark", "tiger shark", "hammerhead",
-                "electric ray", "stingray", "cock", "hen", "ostrich",
-                "brambling", "goldfinch", "house finch", "junco", "indigo bunting",
-                "robin", "bulbul", "jay", "magpie", "chickadee",
-            ]
-            for i, name in enumerate(common_classes):
-                if i < len(_class_names):
-                    _class_names[i] = name
-
-    return _class_names
-
-
-def _load_model() -> torch.nn.Module:
-    """Load and initialize ResNet18 model."""
-    global _model
-    if _model is None:
-        # Fix SSL certificate issues for model download
-        import ssl
-        
-        # Create SSL context with certifi certificates
-        try:
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            ssl._create_default_https_context = lambda: ssl_context
-        except Exception:
-            # Fallback: disable SSL verification (for local testing only)
-            # WARNING: Not recommended for production
-            ssl._create_default_https_context = ssl._create_unverified_context
-        
-        try:
-            # Try to load pretrained weights
-            _model = models.resnet18(weights=models.ResNet18_Weights.IMAGENET1K_V1)
-        except Exception as e:
-            # If download fails, try loading without weights (will use random weights)
-            # This is a fallback for local testing
-            try:
-                _model = models.resnet18(weights=None)
-                print(f"Warning: Could not download pretrained weights: {e}")
-                print("Using model with random weights (classification may be inaccurate)")
-            except Exception as e2:
-                raise RuntimeError(f"Failed to load ResNet18 model: {e2}") from e2
-        _model.eval()
-    return _model
-
-
-def classify_image(image_bytes: bytes, top_k: int = 3) -> list[tuple[str, float]]:
+    """Load ImageNet class names from the packaged asset file."""
+    return load_imagenet_classes()
+
+
+def _active_models() -> list[str]:
+    """Models this process needs: the cascade's fast model (if enabled) and the main one."""
+    if settings.cascade_enabled:
+        return [settings.cascade_fast_model, MAIN_MODEL]
+    return [MAIN_MODEL]
+
+
+def _get_backend(model_name: str = MAIN_MODEL) -> InferenceBackend:
     """
-    Classify an image using ResNet18.
+    Create and load the configured inference backend for a model.
+
+    Raises:
+        RuntimeError: If the model files are missing or the runtime isn't installed
+    """
+    backend = _backends.get(model_name)
+    if backend is None:
+        backend = create_backend(
+            settings.inference_backend,
+            model_name=model_name,
+            mode=settings.inference_mode,
+            num_threads=settings.inference_threads_per_worker,
+        )
+        backend.load()
+        _backends[model_name] = backend
+    return backend
+
+
+def load_models() -> None:
+    """Load every model the configuration needs."""
+    for model_name in _active_models():
+        _get_backend(model_name)
+
+
+def warmup() -> None:
+    """Run a dummy forward pass so the first real request doesn't pay for lazy init."""
+    _load_imagenet_classes()
+    for model_name in _active_models():
+        _get_backend(model_name).warmup()
+
+
+def _decode(data: ImageBuffer) -> Image.Image:
+    """
+    Decode an image at the smallest scale that still covers the resize target.
+
+    For JPEGs, draft mode lets libjpeg decode at 1/2, 1/4 or 1/8 scale
+    directly, so a 1280px Telegram photo is never fully decoded.
+    """
+    image = open_image(data)
+    image.draft("RGB", (RESIZE_SIZE, RESIZE_SIZE))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
+
+def _resize_and_crop(image: Image.Image) -> Image.Image:
+    """Resize the short side to RESIZE_SIZE and center-crop CROP_SIZE in one resampling pass."""
+    width, height = image.size
+    # Size of the center crop expressed in source pixels
+    crop = min(width, height) * CROP_SIZE / RESIZE_SIZE
+    left = (width - crop) / 2
+    top = (height - crop) / 2
+    return image.resize(
+        (CROP_SIZE, CROP_SIZE),
+        Image.Resampling.BILINEAR,
+        box=(left, top, left + crop, top + crop),
+    )
+
+
+def _normalize_into(image: Image.Image, out: np.ndarray) -> None:
+    """Crop and normalize a decoded image straight into a 3x224x224 float32 slot."""
+    pixels = np.asarray(_resize_and_crop(image), dtype=np.uint8)
+    for channel in range(3):
+        np.take(_NORMALIZE_LUT[channel], pixels[:, :, channel], out=out[channel])
+
+
+def _preprocess_into(data: ImageBuffer, out: np.ndarray) -> None:
+    """Decode, crop and normalize an image straight into a 3x224x224 float32 slot."""
+    _normalize_into(_decode(data), out)
+
+
+def _preprocess(data: ImageBuffer) -> np.ndarray:
+    """Decode raw image bytes into a normalized 3x224x224 float32 array."""
+    out = np.empty((3, CROP_SIZE, CROP_SIZE), dtype=np.float32)
+    _preprocess_into(data, out)
+    return out
+
+
+def _get_batch_buffer(size: int) -> np.ndarray:
+    """Return the reusable NCHW input buffer, growing it if the batch is larger."""
+    global _batch_buffer
+    if _batch_buffer is None or _batch_buffer.shape[0] < size:
+        _batch_buffer = np.empty((size, 3, CROP_SIZE, CROP_SIZE), dtype=np.float32)
+    return _batch_buffer
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax, shifted by the row max for numerical stability."""
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _top_k(probabilities: np.ndarray, top_k: int) -> tuple[list[int], list[tuple[str, float]]]:
+    """Convert a 1000-way probability vector into class indices and (label, confidence) pairs."""
+    top_k = min(top_k, probabilities.shape[0])
+    # argpartition finds the top k in O(n); only those k get sorted
+    top_indices = np.argpartition(probabilities, -top_k)[-top_k:]
+    top_indices = top_indices[np.argsort(probabilities[top_indices])[::-1]]
+
+    class_names = _load_imagenet_classes()
+    class_indices = top_indices.tolist()
+    results = []
+
+    for class_idx in class_indices:
+        confidence = float(probabilities[class_idx])
+
+        if class_idx < len(class_names):
+            label = class_names[class_idx]
+        else:
+            label = f"class_{class_idx}"
+
+        results.append((label, confidence))
+
+    return class_indices, results
+
+
+def _result(probabilities: np.ndarray, top_k: int, model: str) -> ClassificationResult:
+    """Build the result for one row of probabilities."""
+    class_indices, predictions = _top_k(probabilities, top_k)
+    return ClassificationResult(predictions, model=model, class_indices=class_indices)
+
+
+def _predict(model_name: str, batch: np.ndarray) -> np.ndarray:
+    """Class probabilities for a preprocessed batch."""
+    return _softmax(_get_backend(model_name).predict(batch))
+
+
+def classify_images(
+    images: list[ImageBuffer], top_k: int = 3
+) -> list[ClassificationResult | ValueError]:
+    """
+    Classify a batch of images with a single forward pass per model.
+
+    Images that fail to decode get a ValueError in their slot instead of
+    failing the whole batch, so one broken upload does not affect other users.
+
+    With ``cascade_enabled``, the whole batch first goes through the fast
+    model; only images whose top-1 confidence is below ``cascade_threshold``
+    are run through ResNet18. If ResNet18 fails, only the escalated images
+    get the error; the fast model's answers are kept.
 
     Args:
-        image_bytes: Raw image bytes
-        top_k: Number of top predictions to return (default: 3)
+        images: Raw image bytes for each image
+        top_k: Number of top predictions to return per image (default: 3)
 
     Returns:
-        List of tuples (predicted_label, confidence_score) sorted by confidence
+        One entry per input image: either a ClassificationResult with
+        (label, confidence) tuples sorted by confidence, or the ValueError
+        raised for that image
     """
-    try:
-        # Load and preprocess image
-        image = Image.open(io.BytesIO(image_bytes))
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        # Apply transforms
-        input_tensor = _transform(image).unsqueeze(0)
-
-        # Get prediction
-        model = _load_model()
-        with torch.no_grad():
-            output = model(input_tensor)
-            probabilities = torch.nn.functional.softmax(output[0], dim=0)
-
-        # Get top K predictions
-        top_probs, top_indices = torch.topk(probabilities, min(top_k, 1000))
-        
-        # Get class labels
-        class_names = _load_imagenet_classes()
-        results = []
-        
-        for prob, idx in zip(top_probs, top_indices):
-            class_idx = idx.item()
-            confidence = float(prob)
-            
-            if class_idx < len(class_names):
-                label = class_names[class_idx]
-            else:
-                label = f"class_{class_idx}"
-            
-            results.append((label, confidence))
-        
+    results: list[ClassificationResult | ValueError] = []
+    buffer = _get_batch_buffer(len(images))
+    positions = []
+
+    for position, image_bytes in enumerate(images):
+        try:
+            _preprocess_into(image_bytes, buffer[len(positions)])
+            positions.append(position)
+            results.append(ValueError("Image was not classified"))
+        except Exception as e:
+            results.append(ValueError(f"Failed to classify image: {str(e)}"))
+
+    if not positions:
         return results
 
+    batch = buffer[: len(positions)]
+    # Rows still without an answer; a model failure only fails these
+    escalate = np.arange(len(positions))
+    try:
+        if settings.cascade_enabled:
+            fast_model = settings.cascade_fast_model
+            probabilities = _predict(fast_model, batch)
+            confident = probabilities.max(axis=1) >= settings.cascade_threshold
+            for row in np.flatnonzero(confident).tolist():
+                results[positions[row]] = _result(probabilities[row], top_k, fast_model)
+            escalate = np.flatnonzero(~confident)
+
+        if escalate.size:
+            # Contiguous when nothing was answered by the fast model; otherwise a gathered copy
+            main_batch = batch if escalate.size == len(positions) else batch[escalate]
+            probabilities = _predict(MAIN_MODEL, main_batch)
+            for row, batch_row in enumerate(escalate.tolist()):
+                results[positions[batch_row]] = _result(probabilities[row], top_k, MAIN_MODEL)
     except Exception as e:
-        raise ValueError(f"Failed to classify image: {str(e)}") from e
+        for row in escalate.tolist():
+            results[positions[row]] = ValueError(f"Failed to classify image: {str(e)}")
+
+    return results
 
+
+def classify_image(image_bytes: ImageBuffer, top_k: int = 3) -> ClassificationResult:
+    """
+    Classify a single image.
+
+    Args:
+        image_bytes: Raw image bytes
+        top_k: Number of top predictions to return (default: 3)
+
+    Returns:
+        ClassificationResult with (predicted_label, confidence_score) tuples
+        sorted by confidence
+    """
+    result = classify_images([image_bytes], top_k=top_k)[0]
+    if isinstance(result, ValueError):
+        raise result
+    return result
@@ -0,0 +1,47 @@
+"""Shrinking message text before it is sent to the LLM."""
+
+import re
+
+# Reply headers that introduce a quoted message ("On Mon, Bob wrote:")
+_REPLY_HEADER = re.compile(r"^\s*On .{1,200} wrote:\s*$", re.IGNORECASE)
+# Forwarded/original message separators: everything below is a quoted copy
+_QUOTED_TAIL = re.compile(
+    r"^\s*-{2,}\s*(?:Original Message|Forwarded message)\s*-{2,}\s*$", re.IGNORECASE
+)
+_SPACES = re.compile(r"[ \t ]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def compact_text(text: str) -> str:
+    """
+    Remove what doesn't change the analysis of a message.
+
+    Drops quoted reply chains (``>`` lines, "On ... wrote:" headers and
+    anything after an "Original Message" separator), repeated lines, and
+    runs of spaces and blank lines. Paragraph breaks are kept, since long
+    texts are split on them.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Compacted text
+    """
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    for line in text.splitlines():
+        if _QUOTED_TAIL.match(line):
+            break
+        if line.lstrip().startswith(">") or _REPLY_HEADER.match(line):
+            continue
+
+        line = _SPACES.sub(" ", line).strip()
+        if line:
+            key = line.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
@@ -0,0 +1,164 @@
+"""Per-update deadline budgets.
+
+Each Telegram update gets a deadline when it enters the bot (the webhook
+endpoint, or a group -1 handler in polling mode). It lives in a contextvar,
+so every awaited call made while handling the update can see how much time
+is left: downloads, inference, LLM requests and n8n posts run through
+``within_deadline`` and stop early once the budget is spent, and Telegram
+edits get timeouts from ``telegram_timeouts``.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from contextvars import Context, ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Replies are still attempted after the deadline, so the user hears back
+MIN_REPLY_SECONDS = 2.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """The update ran out of its time budget."""
+
+    def __init__(self):
+        super().__init__("Took too long to process this update")
+
+
+@dataclass
+class Deadline:
+    """Time budget of one update."""
+
+    budget: float
+    update_id: Optional[int] = None
+    started_at: float = field(default_factory=time.monotonic)
+    exceeded: bool = False
+
+    @property
+    def expires_at(self) -> float:
+        return self.started_at + self.budget
+
+    def remaining(self) -> float:
+        """Seconds left; zero or less once the budget is spent."""
+        return self.expires_at - time.monotonic()
+
+    def mark_exceeded(self) -> None:
+        """Count the update as over budget (once)."""
+        if not self.exceeded:
+            self.exceeded = True
+            metrics.increment("update_deadline_exceeded")
+            logger.warning(f"Update {self.update_id} exceeded its {self.budget:.0f}s budget")
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("update_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the update being handled, if any."""
+    return _current.get()
+
+
+def begin_update(update_id: Optional[int], budget: Optional[float] = None) -> Deadline:
+    """
+    Start the deadline of an update, unless it already has one.
+
+    The webhook starts the deadline before the update is parsed, and the
+    group -1 handler then finds it already running for the same update.
+
+    Args:
+        update_id: Telegram update_id
+        budget: Seconds for the whole update (default: ``update_deadline_seconds``)
+
+    Returns:
+        The update's deadline
+    """
+    deadline = _current.get()
+    if deadline is None or deadline.update_id != update_id:
+        deadline = Deadline(
+            budget=budget if budget is not None else settings.update_deadline_seconds,
+            update_id=update_id,
+        )
+        _current.set(deadline)
+    return deadline
+
+
+def end_update() -> None:
+    """Record how long the current update took and clear its deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        return
+    elapsed = time.monotonic() - deadline.started_at
+    metrics.observe("update_ms", elapsed * 1000)
+    if elapsed > deadline.budget:
+        deadline.mark_exceeded()
+    _current.set(None)
+
+
+def without_deadline() -> Context:
+    """
+    Copy of the current context with no update deadline.
+
+    For tasks whose result is shared by several updates, which each wait
+    for it under their own deadline instead.
+    """
+    context = copy_context()
+    context.run(_current.set, None)
+    return context
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await a call, cancelling it when the update's budget runs out.
+
+    Without a current deadline the call is awaited as is.
+
+    Raises:
+        DeadlineExceeded: If the budget was spent before or during the call
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return await awaitable
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        deadline.mark_exceeded()
+        raise DeadlineExceeded()
+
+    try:
+        async with asyncio.timeout(remaining) as scope:
+            return await awaitable
+    except TimeoutError:
+        if not scope.expired():
+            # A timeout of the call itself, not of the budget
+            raise
+        deadline.mark_exceeded()
+        raise DeadlineExceeded() from None
+
+
+def telegram_timeouts() -> dict[str, Any]:
+    """
+    Timeout arguments for a Telegram Bot API call that fit the remaining budget.
+
+    Empty without a deadline, so the library defaults apply.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return {}
+    timeout = max(deadline.remaining(), MIN_REPLY_SECONDS)
+    return {
+        "read_timeout": timeout,
+        "write_timeout": timeout,
+        "connect_timeout": timeout,
+        "pool_timeout": timeout,
+    }
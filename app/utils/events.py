@@ -1,23 +1,48 @@
 """Event logging utilities for n8n integration."""
 
-import json
-from typing import Any
-
-import httpx
+import asyncio
+import logging
+from collections import deque
+from functools import partial
+from typing import Any, Optional
 
 from app.config import settings
+from app.utils.circuit_breaker import CircuitOpenError, n8n_circuit
+from app.utils.deadline import DeadlineExceeded, within_deadline
+from app.utils.http import http_clients
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Events that couldn't be delivered, oldest first; sent once n8n answers again
+_deferred: deque[dict[str, Any]] = deque(maxlen=settings.n8n_deferred_max_events)
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def _post(payload: dict[str, Any]) -> None:
+    client = http_clients.client_for(settings.n8n_webhook_url)
+    response = await client.post(
+        settings.n8n_webhook_url,
+        json=payload,
+        headers={"Content-Type": "application/json"},
+        timeout=10.0,
+    )
+    response.raise_for_status()
 
 
 async def log_event(event_type: str, data: dict[str, Any]) -> bool:
     """
     Send event to n8n webhook endpoint.
 
+    Events that can't be delivered, including every event while the n8n
+    circuit is open, are held and sent after the next successful delivery.
+
     Args:
         event_type: Type of event (text_message, image_message, llm_analysis)
         data: Event data payload
 
     Returns:
-        True if successful, False otherwise
+        True if delivered now, False otherwise
     """
     if not settings.n8n_webhook_url:
         # Silently fail if n8n webhook is not configured
@@ -32,16 +57,54 @@ async def log_event(event_type: str, data: dict[str, Any]) -> bool:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                settings.n8n_webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            return True
-    except Exception:
+        # Out of budget counts as undelivered, not as an n8n failure
+        await within_deadline(n8n_circuit.call(lambda: _post(payload)))
+    except Exception as e:
         # Log error but don't fail the bot operation
+        if not isinstance(e, (CircuitOpenError, DeadlineExceeded)):
+            logger.warning(f"Failed to deliver {event_type} event to n8n: {e}")
+        _defer(payload)
         return False
 
+    _schedule_flush()
+    return True
+
+
+def _defer(payload: dict[str, Any]) -> None:
+    """Hold an event for later delivery, dropping the oldest one when full."""
+    if len(_deferred) == _deferred.maxlen:
+        metrics.increment("n8n_events_dropped")
+    _deferred.append(payload)
+    metrics.increment("n8n_events_deferred")
+
+
+def _schedule_flush() -> None:
+    """Deliver held events in the background, unless that is already happening."""
+    global _flush_task
+    if _deferred and (_flush_task is None or _flush_task.done()):
+        _flush_task = asyncio.create_task(flush_deferred_events())
+
+
+async def flush_deferred_events() -> int:
+    """
+    Deliver held events in order, stopping at the first failure.
+
+    Returns:
+        Number of events delivered
+    """
+    sent = 0
+    while _deferred:
+        payload = _deferred[0]
+        try:
+            await n8n_circuit.call(partial(_post, payload))
+        except Exception as e:
+            logger.info(f"Deferred n8n events not delivered yet ({len(_deferred)} held): {e}")
+            break
+        _deferred.popleft()
+        sent += 1
+    return sent
+
 
+def deferred_event_count() -> int:
+    """Number of events waiting for n8n."""
+    return len(_deferred)
@@ -0,0 +1,157 @@
+"""Shared pooled HTTP clients for outbound traffic (LLM API, n8n).
+
+One ``httpx.AsyncClient`` is kept per upstream origin, so requests reuse
+keep-alive connections instead of paying for a TCP and TLS handshake each
+time. HTTP/2 is offered when the ``h2`` package is installed; upstreams that
+don't negotiate it over ALPN keep using HTTP/1.1.
+"""
+
+import importlib.util
+import logging
+from typing import Any, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _origin(url: str) -> str:
+    """scheme://host:port of a URL, the unit connections are pooled by."""
+    parsed = httpx.URL(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return f"{parsed.scheme}://{parsed.host}:{port}"
+
+
+class _UpstreamStats:
+    """Request and connection counters for one upstream."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_responses = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "http2_responses": self.http2_responses,
+            "reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class HTTPClientManager:
+    """
+    Keep-alive connection pools, one per upstream origin.
+
+    Clients are created on first use. ``close()`` closes every pool; the
+    manager can be used again afterwards (clients are recreated lazily).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.info("h2 package not installed, outbound HTTP uses HTTP/1.1 only")
+
+        # Only used by tests, to serve requests from a stub
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._stats: dict[str, _UpstreamStats] = {}
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for the upstream serving ``url``.
+
+        Args:
+            url: Any URL on the upstream (base URL or full endpoint)
+
+        Returns:
+            Shared client; pass per-request timeouts to its methods
+        """
+        origin = _origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            stats = self._stats.setdefault(origin, _UpstreamStats())
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                transport=self._transport,
+                event_hooks={
+                    "request": [self._request_hook(stats)],
+                    "response": [self._response_hook(stats)],
+                },
+            )
+            self._clients[origin] = client
+        return client
+
+    @staticmethod
+    def _request_hook(stats: _UpstreamStats):
+        async def trace(event_name: str, info: dict) -> None:
+            # httpcore reports connection setup only when no pooled connection was reused
+            if event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+            elif event_name == "connection.start_tls.complete":
+                stats.tls_handshakes += 1
+
+        async def on_request(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = trace
+
+        return on_request
+
+    @staticmethod
+    def _response_hook(stats: _UpstreamStats):
+        async def on_response(response: httpx.Response) -> None:
+            if response.http_version == "HTTP/2":
+                stats.http2_responses += 1
+
+        return on_response
+
+    def start(self, *urls: str) -> None:
+        """Create the pools for the configured upstreams up front; empty URLs are skipped."""
+        for url in urls:
+            if url:
+                self.client_for(url)
+        logger.info(f"HTTP client pools ready for {len(self._clients)} upstream(s)")
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        clients, self._clients = self._clients, {}
+        for origin, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client for {origin}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Pool settings and per-upstream connection reuse counters."""
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "upstreams": {origin: s.snapshot() for origin, s in self._stats.items()},
+        }
+
+
+http_clients = HTTPClientManager(
+    max_connections=settings.http_max_connections,
+    max_keepalive_connections=settings.http_max_keepalive_connections,
+    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    http2=settings.http2_enabled,
+)
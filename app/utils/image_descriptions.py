@@ -5,9 +5,9 @@
 
 def _generate_all_descriptions():
     """Generate comprehensive descriptions for all ImageNet classes."""
-    from app.utils.classify import _load_imagenet_classes
+    from app.utils.labels import load_imagenet_classes
     
-    classes = _load_imagenet_classes()
+    classes = load_imagenet_classes()
     descriptions = {}
     
     # Rich descriptive vocabulary pool
@@ -172,17 +172,51 @@ def _generate_all_descriptions():
     return descriptions
 
 
+def _build_word_index(descriptions):
+    """
+    Map each word to the description keys containing it, in dictionary order.
+
+    Keeping dictionary order lets the fuzzy lookup return the same key the
+    original front-to-back scan over all descriptions would have found.
+    """
+    index = {}
+    for key in descriptions:
+        for word in set(key.split()):
+            index.setdefault(word, []).append(key)
+    return index
+
+
 # Load all descriptions (lazy loading)
 _image_descriptions_cache = None
+_word_index_cache = None
 
 def _get_image_descriptions():
     """Get or generate the image descriptions dictionary."""
-    global _image_descriptions_cache
+    global _image_descriptions_cache, _word_index_cache
     if _image_descriptions_cache is None:
         _image_descriptions_cache = _generate_all_descriptions()
+        _word_index_cache = _build_word_index(_image_descriptions_cache)
     return _image_descriptions_cache
 
 
+def _find_key_containing_words(label_words):
+    """
+    Find the first description key (in dictionary order) containing every label word.
+
+    Only keys sharing the label's rarest word are checked, instead of
+    scanning all descriptions.
+    """
+    _get_image_descriptions()
+    postings = [_word_index_cache.get(word) for word in label_words]
+    if not postings or not all(postings):
+        return None
+
+    for key in min(postings, key=len):
+        if label_words.issubset(key.split()):
+            return key
+    return None
+
+
 # Legacy support - keep existing common descriptions for quick access
 IMAGE_DESCRIPTIONS = {
     # This will be populated by _get_image_descriptions() when needed
@@ -206,43 +240,32 @@ def get_image_description(label: str, confidence: float) -> str:
     if label_lower in descriptions:
         base_desc = descriptions[label_lower]
     else:
-        # Try word-based matching (more precise than substring matching)
+        # Try word-based matching (more precise than substring matching):
+        # the first key that contains every word of the label
         label_words = set(label_lower.split())
-        base_desc = None
-        best_match_score = 0
-        
-        for key, desc in descriptions.items():
-            key_words = set(key.split())
-            # Calculate match score based on word overlap
-            overlap = len(label_words & key_words)
-            if overlap > 0 and overlap > best_match_score:
-                # Prefer exact word matches over partial matches
-                if label_lower == key or all(word in key_words for word in label_words):
-                    base_desc = desc
-                    best_match_score = overlap
-                    break
-                elif overlap == len(label_words):  # All label words found in key
-                    base_desc = desc
-                    best_match_score = overlap
+        key = _find_key_containing_words(label_words)
+        base_desc = descriptions[key] if key is not None else None
         
         # Fallback to formatted label with rich description
         if base_desc is None:
             name_formatted = label.replace("_", " ").title()
             base_desc = f"a {name_formatted}, a distinctive and recognizable object with unique identifying features, characteristic properties, and notable attributes"
     
-    # Add confidence-based qualifiers
+    return f"{confidence_phrase(confidence)} {base_desc}."
+
+
+def confidence_phrase(confidence: float) -> str:
+    """Confidence-based qualifier that opens a description."""
     if confidence > 0.9:
-        confidence_phrase = "I'm very confident this is"
+        return "I'm very confident this is"
     elif confidence > 0.7:
-        confidence_phrase = "I'm quite confident this is"
+        return "I'm quite confident this is"
     elif confidence > 0.5:
-        confidence_phrase = "This appears to be"
+        return "This appears to be"
     elif confidence > 0.3:
-        confidence_phrase = "This might be"
+        return "This might be"
     else:
-        confidence_phrase = "This could possibly be"
-    
-    return f"{confidence_phrase} {base_desc}."
+        return "This could possibly be"
 
 
 def get_category_description(label: str) -> str:
@@ -0,0 +1,64 @@
+"""Zero-copy image opening from in-memory buffers."""
+
+import io
+
+from PIL import Image
+
+ImageBuffer = bytes | bytearray | memoryview
+
+# Model input geometry: short side resized to RESIZE_SIZE, then center-cropped
+RESIZE_SIZE = 256
+CROP_SIZE = 224
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a memoryview.
+
+    ``io.BytesIO`` copies any buffer that isn't ``bytes``, so wrapping the
+    ``bytearray`` returned by Telegram downloads would duplicate the whole
+    image. This reader only copies the chunks PIL actually reads.
+    """
+
+    def __init__(self, data: ImageBuffer):
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._pos = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos : self._pos + len(buffer)]
+        size = len(chunk)
+        memoryview(buffer).cast("B")[:size] = chunk
+        self._pos += size
+        return size
+
+
+def open_image(data: ImageBuffer) -> Image.Image:
+    """Open an image from bytes, a bytearray or a memoryview without copying the buffer."""
+    if isinstance(data, bytes):
+        # BytesIO shares the memory of an immutable bytes object
+        return Image.open(io.BytesIO(data))
+    return Image.open(BufferReader(data))
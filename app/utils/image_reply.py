@@ -0,0 +1,139 @@
+"""HTML reply rendering for image classification results.
+
+Everything that only depends on the predicted class (escaped title-cased
+label, category line, description text) and the fixed header, headings and
+model footer are rendered once. Per reply only the confidence qualifier,
+percentage and confidence tier are filled in.
+"""
+
+from html import escape
+from typing import Optional
+
+from app.utils.backends import MODEL_DISPLAY_NAMES
+from app.utils.class_tables import load_class_tables
+from app.utils.classify import ClassificationResult
+from app.utils.image_descriptions import (
+    confidence_phrase,
+    get_category_description,
+    get_image_description,
+)
+from app.utils.labels import load_imagenet_classes
+
+HEADER = "🖼️ <b>Image Recognition Analysis</b>\n"
+PRIMARY_HEADING = "🎯 <b>Primary Identification:</b>\n"
+DETAILS_HEADING = "\n📊 <b>Detailed Predictions:</b>\n"
+
+# Ranks past the third keep the bronze medal
+_RANK_EMOJIS = ("🥇", "🥈", "🥉")
+
+
+def _label_html(label: str) -> str:
+    """Escaped, title-cased label as shown in the reply."""
+    return escape(label.replace("_", " ").title())
+
+
+def _category_line(category: str) -> str:
+    return f"📸 {category.lower()}.\n"
+
+
+def _rank_prefix(rank: int) -> str:
+    return f"{_RANK_EMOJIS[min(rank, 3) - 1]} <b>{rank}.</b> "
+
+
+def _confidence_level(confidence_percent: float) -> str:
+    """Confidence tier shown next to the percentage."""
+    if confidence_percent > 80:
+        return "Very High"
+    elif confidence_percent > 50:
+        return "High"
+    elif confidence_percent > 30:
+        return "Medium"
+    return "Low"
+
+
+class ReplyRenderer:
+    """Renders image replies from fragments pre-rendered per class and per model."""
+
+    def __init__(self):
+        tables = load_class_tables()
+        self.labels = [_label_html(label) for label in load_imagenet_classes()]
+        self.category_lines = [_category_line(category) for category in tables.categories]
+        # Completes "<confidence phrase>" into the full description sentence
+        self.description_tails = [f" {description}." for description in tables.descriptions]
+        self.rank_prefixes = [_rank_prefix(rank) for rank in range(1, 11)]
+        self.footers = {
+            model: f"🧠 <i>Model: {escape(name)}</i>" for model, name in MODEL_DISPLAY_NAMES.items()
+        }
+
+    def _rank_prefix(self, rank: int) -> str:
+        if rank <= len(self.rank_prefixes):
+            return self.rank_prefixes[rank - 1]
+        return _rank_prefix(rank)
+
+    def _footer(self, model: str) -> str:
+        footer = self.footers.get(model)
+        if footer is None:
+            footer = f"🧠 <i>Model: {escape(model)}</i>"
+        return footer
+
+    def _fragments(self, result: ClassificationResult) -> tuple[str, list[tuple[str, str]]]:
+        """Category line and (label, description) per prediction."""
+        indices = result.class_indices
+        if indices and len(indices) == len(result.predictions):
+            predictions = [
+                (self.labels[index], confidence_phrase(confidence) + self.description_tails[index])
+                for index, (_, confidence) in zip(indices, result.predictions, strict=True)
+            ]
+            return self.category_lines[indices[0]], predictions
+
+        # Results cached before class indices were recorded
+        predictions = [
+            (_label_html(label), get_image_description(label, confidence))
+            for label, confidence in result.predictions
+        ]
+        return _category_line(get_category_description(result.predictions[0][0])), predictions
+
+    def render(self, result: ClassificationResult) -> str:
+        """
+        Render the HTML reply for a classification result.
+
+        Args:
+            result: Classification result with at least one prediction
+
+        Returns:
+            Telegram HTML message text
+        """
+        category_line, fragments = self._fragments(result)
+        parts = [
+            HEADER,
+            category_line,
+            f"{PRIMARY_HEADING}{fragments[0][1]}\n",
+            DETAILS_HEADING,
+        ]
+        for rank, ((label, description), (_, confidence)) in enumerate(
+            zip(fragments, result.predictions, strict=True), 1
+        ):
+            confidence_percent = confidence * 100
+            parts.append(
+                f"{self._rank_prefix(rank)}{label}\n"
+                f"   {description}\n"
+                f"   Confidence: {confidence_percent:.1f}% ({_confidence_level(confidence_percent)})\n"
+            )
+        parts.append(self._footer(result.model))
+        return "\n".join(parts)
+
+
+_renderer: Optional[ReplyRenderer] = None
+
+
+def get_reply_renderer() -> ReplyRenderer:
+    """Get the shared renderer, pre-rendering the fragments on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = ReplyRenderer()
+    return _renderer
+
+
+def render_image_reply(result: ClassificationResult) -> str:
+    """Render the HTML reply for a classification result."""
+    return get_reply_renderer().render(result)
@@ -0,0 +1,242 @@
+"""Async image classification backed by a process-pool inference engine.
+
+PIL decoding and the forward passes are CPU-bound and would block the
+asyncio event loop (webhook acks, LLM calls, n8n posts). They run in worker
+processes instead; each worker loads the model once at startup.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.config import settings
+from app.utils.batching import MicroBatcher
+from app.utils.classify import ClassificationResult
+from app.utils.image_io import ImageBuffer
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (image_bytes, top_k) -> result
+_ImageRequest = tuple[ImageBuffer, int]
+
+
+def _init_worker() -> None:
+    """Worker process initializer: load the inference backends and labels once."""
+    from app.utils.classify import _load_imagenet_classes, load_models
+
+    load_models()
+    _load_imagenet_classes()
+
+
+def _worker_warmup() -> None:
+    """Run a dummy forward pass inside a worker process."""
+    from app.utils.classify import warmup
+
+    warmup()
+
+
+def _worker_classify(
+    images: list[ImageBuffer], top_k: int
+) -> list[ClassificationResult | ValueError]:
+    """Classify a batch inside a worker process."""
+    from app.utils.classify import classify_images
+
+    return classify_images(images, top_k=top_k)
+
+
+class InferenceEngine:
+    """
+    Process pool that runs image classification off the event loop.
+
+    If a worker dies (e.g. killed by the OOM killer) the pool is rebuilt and
+    the batch that was in flight is retried once.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(workers, 1)
+        self.restarts = 0
+        self.ready = False
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker pool has been started."""
+        return self._executor is not None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Create a fresh worker pool."""
+        # Fork is unsafe once torch has started its thread pools
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self._executor is None:
+            logger.info(f"Starting inference engine with {self.workers} worker(s)")
+            self._executor = self._create_executor()
+
+    async def warmup(self) -> None:
+        """
+        Start the workers and run a dummy forward pass in each of them.
+
+        Marks the engine as ready once every warmup pass has finished.
+
+        Raises:
+            RuntimeError: If a worker fails to load the model
+        """
+        await self.start()
+
+        loop = asyncio.get_running_loop()
+        # Submitting one task per worker at once makes the pool spawn all of them
+        try:
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(self._executor, _worker_warmup)
+                    for _ in range(self.workers)
+                )
+            )
+        except BrokenProcessPool as e:
+            await self._restart(self._executor)
+            raise RuntimeError("Inference worker failed to load the model") from e
+
+        self.ready = True
+        logger.info("Inference engine warmed up")
+
+    async def shutdown(self) -> None:
+        """Stop the worker pool and cancel queued work."""
+        self.ready = False
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken pool, unless another caller already did."""
+        async with self._lock:
+            if self._executor is not broken:
+                return
+            logger.warning("Inference worker crashed, restarting worker pool")
+            self.restarts += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+
+    async def classify_batch(
+        self, images: list[ImageBuffer], top_k: int = 3
+    ) -> list[ClassificationResult | ValueError]:
+        """
+        Classify a batch of images in a worker process.
+
+        Args:
+            images: Raw image bytes for each image
+            top_k: Number of top predictions to return per image
+
+        Returns:
+            One entry per image: a ClassificationResult or the ValueError for that image
+        """
+        if self._executor is None:
+            await self.start()
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, _worker_classify, images, top_k)
+            except BrokenProcessPool as exc:
+                await self._restart(executor)
+                if attempt == 1:
+                    raise RuntimeError("Inference worker crashed twice on the same batch") from exc
+
+        raise AssertionError("unreachable")
+
+
+inference_engine = InferenceEngine(workers=settings.inference_workers)
+
+_batcher: Optional[MicroBatcher[_ImageRequest, ClassificationResult]] = None
+
+
+async def _classify_batch(
+    requests: list[_ImageRequest],
+) -> list[ClassificationResult | BaseException]:
+    """Run one forward pass for a batch of requests and trim each to its own top_k."""
+    max_top_k = max(top_k for _, top_k in requests)
+    results = await inference_engine.classify_batch(
+        [image_bytes for image_bytes, _ in requests], top_k=max_top_k
+    )
+
+    for result in results:
+        if not isinstance(result, BaseException):
+            _record_model(result.model)
+
+    return [
+        result
+        if isinstance(result, BaseException)
+        else dataclasses.replace(
+            result,
+            predictions=result.predictions[:top_k],
+            class_indices=result.class_indices[:top_k],
+        )
+        for result, (_, top_k) in zip(results, requests, strict=True)
+    ]
+
+
+def _record_model(model_name: str) -> None:
+    """Count which model answered; with the cascade, anything from ResNet18 was escalated."""
+    metrics.increment(f"classify_model_{model_name}")
+    if settings.cascade_enabled:
+        metrics.increment("cascade_images")
+        if model_name != settings.cascade_fast_model:
+            metrics.increment("cascade_escalations")
+
+
+def cascade_stats() -> dict[str, float]:
+    """Cascade counters and escalation rate for /metrics."""
+    images = metrics.counter("cascade_images")
+    escalations = metrics.counter("cascade_escalations")
+    return {
+        "enabled": settings.cascade_enabled,
+        "threshold": settings.cascade_threshold,
+        "images": images,
+        "escalations": escalations,
+        "escalation_rate": round(escalations / images, 4) if images else 0.0,
+    }
+
+
+def get_image_batcher() -> MicroBatcher[_ImageRequest, ClassificationResult]:
+    """Get the shared image classification batcher."""
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            _classify_batch,
+            max_batch_size=settings.inference_max_batch_size,
+            max_wait_ms=settings.inference_max_wait_ms,
+            # Keep every worker busy with its own batch
+            max_concurrency=inference_engine.workers,
+        )
+    return _batcher
+
+
+async def classify_image_async(image_bytes: ImageBuffer, top_k: int = 3) -> ClassificationResult:
+    """
+    Classify an image without blocking the event loop.
+
+    Concurrent requests share a forward pass via the micro-batcher, and the
+    batch itself runs in an inference worker process.
+
+    Args:
+        image_bytes: Raw image bytes
+        top_k: Number of top predictions to return (default: 3)
+
+    Returns:
+        ClassificationResult with (predicted_label, confidence_score) tuples
+        sorted by confidence and the model that produced them
+    """
+    return await get_image_batcher().submit((image_bytes, top_k))
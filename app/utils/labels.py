@@ -0,0 +1,33 @@
+"""ImageNet class labels loaded from the packaged asset file."""
+
+from pathlib import Path
+from typing import Optional
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+IMAGENET_CLASSES_PATH = ASSETS_DIR / "imagenet_classes.txt"
+NUM_CLASSES = 1000
+
+_class_names: Optional[list[str]] = None
+
+
+def load_imagenet_classes() -> list[str]:
+    """
+    Load the 1000 ImageNet class names shipped in ``app/assets``.
+
+    Raises:
+        RuntimeError: If the asset file is missing or malformed
+    """
+    global _class_names
+    if _class_names is None:
+        try:
+            class_names = IMAGENET_CLASSES_PATH.read_text(encoding="utf-8").strip().split("\n")
+        except OSError as e:
+            raise RuntimeError(f"ImageNet class file not found: {IMAGENET_CLASSES_PATH}") from e
+
+        class_names = [line.strip() for line in class_names]
+        if len(class_names) != NUM_CLASSES:
+            raise RuntimeError(f"Expected {NUM_CLASSES} classes, got {len(class_names)}")
+
+        _class_names = class_names
+
+    return _class_names
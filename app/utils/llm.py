@@ -1,26 +1,169 @@
 """LLM utilities for text analysis using OpenAI-compatible API."""
 
+import asyncio
+import hashlib
 import json
-from typing import Any
+import logging
+import re
+import time
+import unicodedata
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
 
 import httpx
 
 from app.config import settings
+from app.utils.chunking import split_into_chunks
+from app.utils.circuit_breaker import CircuitOpenError, llm_circuit
+from app.utils.compaction import compact_text
+from app.utils.deadline import DeadlineExceeded, within_deadline
+from app.utils.http import http_clients
+from app.utils.llm_endpoints import LLMEndpoint, llm_endpoints
+from app.utils.llm_scheduler import PRIORITY_PRIVATE, llm_scheduler
+from app.utils.local_analysis import analyze_locally
+from app.utils.metrics import metrics
+from app.utils.partial_json import parse_partial_object, recover_object
+from app.utils.singleflight import SingleFlight
+from app.utils.tokens import count_tokens
+from app.utils.ttl_cache import TTLCache
 
+logger = logging.getLogger(__name__)
 
-async def analyze_text(text: str) -> dict[str, Any]:
+# Bump whenever the prompt or response handling changes, so cached analyses
+# produced by the old prompt are no longer served
+PROMPT_VERSION = "3"
+
+# Output budgets (max_tokens) per kind of request; like upstream, the
+# tokens-per-minute budget counts them in full
+ANALYSIS_MAX_TOKENS = 500
+SUMMARY_MAX_TOKENS = 160
+REDUCE_MAX_TOKENS = 200
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+# Fields each kind of request asks for, and their JSON schemas
+ANALYSIS_FIELDS = ("summary", "tasks", "sentiment")
+SUMMARY_FIELDS = ("summary",)
+REDUCE_FIELDS = ("summary", "sentiment")
+_FIELD_SCHEMAS: dict[str, dict[str, Any]] = {
+    "summary": {"type": "string"},
+    "tasks": {"type": "array", "items": {"type": "string"}},
+    "sentiment": {"type": "string", "enum": list(SENTIMENTS)},
+}
+# Output budget of a repair request, per missing field
+_REPAIR_MAX_TOKENS = {"summary": 160, "tasks": 250, "sentiment": 10}
+# What to try next when an endpoint rejects a response_format
+_FORMAT_FALLBACK = {"json_schema": "json_object", "json_object": "none"}
+# A 400 naming one of these is about the format; any other 400 is the request's fault
+_FORMAT_ERROR_TERMS = ("response_format", "json_schema", "json_object", "structured output")
+# Streamed output is re-parsed on every delta only until the summary shows up
+# (within this many characters); after that, at most once per progress edit
+_PARTIAL_SCAN_CHARS = 512
+
+# Receives the fields parsed so far while a streamed analysis is generated
+PartialCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class _PartialRelay:
+    """
+    Forward partial results to a caller only while it is still waiting.
+
+    A coalesced analysis outlives the caller that started it (see
+    SingleFlight), so its stream must stop reaching a caller that gave up.
+    """
+
+    def __init__(self, callback: Optional[PartialCallback]):
+        self.callback = callback
+
+    async def __call__(self, partial: dict[str, Any]) -> None:
+        if self.callback is not None:
+            await self.callback(partial)
+
+    def close(self) -> None:
+        self.callback = None
+
+# Cache key suffix for the summary-only analyses of the local_first policy
+SUMMARY_ONLY = ":summary"
+
+# LLM text analyses, keyed by analysis_cache_key
+analysis_cache = TTLCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    sqlite_path=settings.llm_cache_path,
+    namespace="llm_analysis",
+)
+
+# In-flight analyses by cache key
+analysis_flights: SingleFlight[dict[str, Any]] = SingleFlight()
+
+
+def _normalize_text(text: str) -> str:
+    """Canonical form of a message for cache keys: NFC, whitespace runs collapsed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def select_model(input_tokens: int) -> str:
+    """
+    Pick the model for a prompt by its size.
+
+    Short texts go to ``llm_fast_model`` and texts over
+    ``llm_route_threshold_tokens`` to ``llm_long_context_model``; either
+    falls back to ``llm_model`` when not set.
+    """
+    if input_tokens > settings.llm_route_threshold_tokens:
+        return settings.llm_long_context_model or settings.llm_model
+    return settings.llm_fast_model or settings.llm_model
+
+
+def _prepare(text: str) -> tuple[str, int]:
+    """Compacted text to send to the LLM and its size in tokens."""
+    compacted = compact_text(text) or text
+    return compacted, count_tokens(compacted)
+
+
+def analysis_cache_key(text: str, model: str) -> str:
+    """Content address of an analysis: hash of the normalized text, model and prompt version."""
+    digest = hashlib.sha256()
+    for part in (PROMPT_VERSION, model, _normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def analyze_text(
+    text: str,
+    on_partial: Optional[PartialCallback] = None,
+    priority: int = PRIORITY_PRIVATE,
+) -> dict[str, Any]:
     """
     Analyze long text message: generate summary, extract tasks, analyze sentiment.
 
+    ``text_analysis_policy`` decides who does the work: the LLM ("llm"),
+    the local tier with only the summary from the LLM ("local_first"), or
+    the local tier alone ("local", no network round trip).
+
     Args:
         text: The text message to analyze
+        on_partial: Called with the fields parsed so far as the completion
+            streams in (when ``llm_streaming`` is enabled). Not called for
+            cached results, when joining an identical request in flight,
+            or for long texts analyzed in chunks.
+        priority: Scheduling priority (PRIORITY_PRIVATE or PRIORITY_GROUP)
 
     Returns:
         Dictionary with:
         - summary: Concise AI summary
         - tasks: List of extracted tasks/to-dos
         - sentiment: positive/neutral/negative
+
+    Successful analyses are cached by content; error fallbacks never are.
     """
+    policy = settings.text_analysis_policy
+    if policy == "local" or (policy == "local_first" and not settings.llm_api_key):
+        return await analyze_locally(text)
+    if policy == "local_first":
+        return await _analyze_local_first(text, on_partial, priority)
+
     if not settings.llm_api_key:
         return {
             "summary": "LLM API key not configured",
@@ -28,8 +171,149 @@ async def analyze_text(text: str) -> dict[str, Any]:
             "sentiment": "neutral",
         }
 
-    # Prepare the prompt
-    prompt = f"""Analyze the following text message and provide:
+    prompt_text, tokens = _prepare(text)
+    cache_key = analysis_cache_key(text, select_model(tokens))
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return _copy_analysis(cached)
+
+    # Concurrent requests for the same text share one upstream call
+    relay = _PartialRelay(on_partial) if on_partial else None
+    try:
+        result = await analysis_flights.do(
+            cache_key,
+            lambda: _request_analysis(prompt_text, tokens, cache_key, relay, priority),
+        )
+    except DeadlineExceeded:
+        return {
+            "summary": "Analysis took too long, please try again.",
+            "tasks": [],
+            "sentiment": "neutral",
+        }
+    finally:
+        if relay is not None:
+            relay.close()
+    return _copy_analysis(result)
+
+
+async def _analyze_local_first(
+    text: str, on_partial: Optional[PartialCallback], priority: int
+) -> dict[str, Any]:
+    """Tasks and sentiment from the local tier, summary from the LLM (lead of the text if it fails)."""
+    analysis, summary = await asyncio.gather(
+        analyze_locally(text), _summarize(text, on_partial, priority)
+    )
+    if summary is not None:
+        analysis["summary"] = summary
+    return analysis
+
+
+async def _summarize(
+    text: str, on_partial: Optional[PartialCallback], priority: int
+) -> Optional[str]:
+    """Summary-only LLM analysis, cached and coalesced like full ones; None on failure."""
+    prompt_text, tokens = _prepare(text)
+    cache_key = analysis_cache_key(text, select_model(tokens) + SUMMARY_ONLY)
+    cached = analysis_cache.get(cache_key)
+    if cached is None:
+        relay = _PartialRelay(on_partial) if on_partial else None
+        try:
+            cached = await analysis_flights.do(
+                cache_key,
+                lambda: _fetch_analysis(
+                    prompt_text, tokens, cache_key, relay, priority, summary_only=True
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"LLM summary failed, using the local summary: {e}")
+            return None
+        finally:
+            if relay is not None:
+                relay.close()
+    return cached["summary"]
+
+
+def _copy_analysis(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Copy of a shared analysis that a caller may modify."""
+    return {**analysis, "tasks": list(analysis["tasks"])}
+
+
+async def _stream_completion(
+    client: httpx.AsyncClient, url: str, headers: dict, payload: dict, on_partial: PartialCallback
+) -> str:
+    """
+    Read an OpenAI-compatible SSE completion, reporting partial results as they arrive.
+
+    Returns:
+        The full message content
+    """
+    start = time.perf_counter()
+    parts: list[str] = []
+    size = 0
+    first_summary = True
+    last_parse = start
+    stale = False
+
+    async with client.stream(
+        "POST", url, headers=headers, json={**payload, "stream": True}, timeout=30.0
+    ) as response:
+        if response.is_error:
+            # Keep the error body readable for the caller (see _rejects_response_format)
+            await response.aread()
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            # Skip blank separators and SSE comments (keep-alive pings)
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+
+            choices = json.loads(data).get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if not delta:
+                continue
+            parts.append(delta)
+            size += len(delta)
+
+            # Parsing the whole buffer each time is quadratic in the response
+            # length, so throttle it like the edits that consume the partials
+            now = time.perf_counter()
+            throttled = not first_summary or size > _PARTIAL_SCAN_CHARS
+            if throttled and now - last_parse < settings.llm_stream_edit_interval_seconds:
+                stale = True
+                continue
+            last_parse = now
+            stale = False
+
+            partial = parse_partial_object("".join(parts))
+            if first_summary and partial.get("summary"):
+                first_summary = False
+                metrics.observe("llm_first_summary_ms", (now - start) * 1000)
+            await on_partial(partial)
+
+    if stale:
+        await on_partial(parse_partial_object("".join(parts)))
+    return "".join(parts)
+
+
+def _analysis_prompt(
+    text: str, part: Optional[tuple[int, int]] = None, summary_only: bool = False
+) -> str:
+    """Prompt asking for the summary/tasks/sentiment JSON of a text (or of one part of it)."""
+    subject = "text message"
+    if part is not None:
+        subject = f"part {part[0]} of {part[1]} of a long text message"
+    if summary_only:
+        return f"""Summarize the following {subject} concisely (2-3 sentences).
+
+Text: {text}
+
+Respond in JSON format:
+{{
+    "summary": "concise summary here"
+}}"""
+    return f"""Analyze the following {subject} and provide:
 1. A concise summary (2-3 sentences)
 2. A list of tasks/to-dos mentioned (if any)
 3. The sentiment (positive, neutral, or negative)
@@ -43,48 +327,421 @@ Respond in JSON format:
     "sentiment": "positive|neutral|negative"
 }}"""
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{settings.llm_api_base}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.llm_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.llm_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that analyzes text messages. Always respond with valid JSON only.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    "temperature": 0.3,
+
+def _reduce_prompt(summaries: list[str]) -> str:
+    """Prompt combining the summaries of consecutive parts into one summary and sentiment."""
+    parts = "\n".join(f"{i}. {summary}" for i, summary in enumerate(summaries, start=1))
+    return f"""The following are summaries of consecutive parts of one long text message:
+
+{parts}
+
+Combine them into:
+1. A concise summary of the whole message (2-3 sentences)
+2. The overall sentiment (positive, neutral, or negative)
+
+Respond in JSON format:
+{{
+    "summary": "concise summary here",
+    "sentiment": "positive|neutral|negative"
+}}"""
+
+
+def _repair_prompt(prompt: str, fields: tuple[str, ...]) -> str:
+    """Prompt asking again for only the fields missing from a broken answer."""
+    shape = ", ".join(f'"{field}"' for field in fields)
+    return f"""{prompt}
+
+Your previous answer was cut off or malformed.
+Respond with a JSON object containing only these fields: {shape}"""
+
+
+def _response_format(mode: str, fields: tuple[str, ...]) -> Optional[dict[str, Any]]:
+    """The ``response_format`` request parameter for a structured output mode, if any."""
+    if mode == "json_object":
+        return {"type": "json_object"}
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "text_analysis",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {field: _FIELD_SCHEMAS[field] for field in fields},
+                    "required": list(fields),
+                    "additionalProperties": False,
                 },
+            },
+        }
+    return None
+
+
+def _rejects_response_format(response: httpx.Response) -> bool:
+    """Whether an error answer is the API refusing the ``response_format`` (not the request)."""
+    if response.status_code != 400:
+        return False
+    try:
+        body = response.text.lower()
+    except httpx.ResponseNotRead:
+        return False
+    return any(term in body for term in _FORMAT_ERROR_TERMS)
+
+
+def _valid_field(field: str, value: Any) -> Any:
+    """A field value in canonical form, or None if it doesn't fit the field."""
+    if field == "summary":
+        return (value.strip() or None) if isinstance(value, str) else None
+    if field == "tasks":
+        if not isinstance(value, list):
+            return None
+        return [task for task in value if isinstance(task, str) and task.strip()]
+    if field == "sentiment":
+        sentiment = str(value).strip().lower()
+        return sentiment if sentiment in SENTIMENTS else None
+    return None
+
+
+def _recover_fields(
+    content: str, fields: tuple[str, ...]
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Salvage the requested fields from a completion, even a truncated or fenced one.
+
+    Returns:
+        The complete, valid fields and the raw values of fields that were cut off
+    """
+    values, complete = recover_object(content)
+    valid: dict[str, Any] = {}
+    cut_off: dict[str, Any] = {}
+    for field in fields:
+        if field not in values:
+            continue
+        if field in complete:
+            value = _valid_field(field, values[field])
+            if value is not None:
+                valid[field] = value
+        else:
+            cut_off[field] = values[field]
+    return valid, cut_off
+
+
+def _salvage(cut_off: dict[str, Any]) -> dict[str, Any]:
+    """Usable parts of fields that were cut off: the summary so far and the tasks listed."""
+    salvaged: dict[str, Any] = {}
+    summary = cut_off.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        salvaged["summary"] = summary.strip() + "…"
+    tasks = cut_off.get("tasks")
+    if isinstance(tasks, list):
+        salvaged["tasks"] = [task for task in tasks if isinstance(task, str) and task.strip()]
+    # A cut-off sentiment is a guess; the default is safer
+    return salvaged
+
+
+async def _complete(
+    prompt: str,
+    model: str,
+    max_tokens: int,
+    fields: tuple[str, ...],
+    on_partial: Optional[PartialCallback] = None,
+    priority: int = PRIORITY_PRIVATE,
+    repair: bool = True,
+) -> tuple[dict[str, Any], bool]:
+    """
+    Run one chat completion through the scheduler and parse its JSON answer.
+
+    The request goes to the best LLM endpoint, with hedging and failover
+    across endpoints inside the scheduler's retries, and asks for output
+    matching the fields' schema where the endpoint supports it.
+
+    Fields are recovered from fenced, truncated or partly broken answers.
+    Only if some are still missing is a second, smaller request made for
+    just those; what it can't supply is salvaged from the cut-off values
+    (or left for the caller's defaults).
+
+    Args:
+        prompt: User message
+        model: Model to ask (see select_model)
+        max_tokens: Output budget
+        fields: Fields to ask for (see ANALYSIS_FIELDS)
+        on_partial: Streams the completion and reports partial fields when given
+        priority: Scheduling priority
+        repair: Whether missing fields may be asked for again
+
+    Returns:
+        The fields recovered, possibly not all of ``fields``, and whether
+        every field was answered in full (nothing salvaged or left out)
+
+    Raises:
+        json.JSONDecodeError: If no field could be recovered from the answer
+        httpx.HTTPStatusError: If the API kept failing after retries
+        CircuitOpenError: If the LLM API is considered down
+        DeadlineExceeded: If the update's time budget ran out first
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant that analyzes text messages. Always respond with valid JSON only.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.3,
+        "max_tokens": max_tokens,
+    }
+    streaming = on_partial is not None and settings.llm_streaming
+    # With a hedged duplicate in flight, only the first stream to report progress is shown
+    progress_owner: list[LLMEndpoint] = []
+
+    async def send(endpoint: LLMEndpoint) -> str:
+        url = f"{endpoint.api_base}/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {endpoint.api_key or settings.llm_api_key}",
+            "Content-Type": "application/json",
+        }
+        client = http_clients.client_for(endpoint.api_base)
+
+        async def report(partial: dict[str, Any]) -> None:
+            if not progress_owner:
+                progress_owner.append(endpoint)
+            if progress_owner[0] is endpoint:
+                await on_partial(partial)
+
+        mode = endpoint.response_format or settings.llm_response_format
+        while True:
+            body = {**payload, "model": endpoint.model or model}
+            response_format = _response_format(mode, fields)
+            if response_format is not None:
+                body["response_format"] = response_format
+            try:
+                if streaming:
+                    return await _stream_completion(client, url, headers, body, report)
+                response = await client.post(url, headers=headers, json=body, timeout=30.0)
+                response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"]
+            except httpx.HTTPStatusError as e:
+                if response_format is None or not _rejects_response_format(e.response):
+                    raise
+                # The provider or model doesn't support this mode: remember the next one down
+                mode = _FORMAT_FALLBACK[mode]
+                logger.warning(f"{endpoint.api_base} rejected response_format, using {mode}")
+                endpoint.response_format = mode
+                metrics.increment("llm_response_format_downgrades")
+
+    prompt_tokens = count_tokens(prompt)
+    metrics.observe("llm_prompt_tokens", prompt_tokens)
+
+    async def complete() -> str:
+        # A hedged duplicate takes its own scheduler slot and token budget, or isn't sent
+        return await llm_endpoints.call(
+            send, reserve_hedge=lambda: llm_scheduler.try_reserve(prompt_tokens + max_tokens)
+        )
+
+    # Queue wait and upstream latency are recorded separately by the scheduler;
+    # while the API is down the circuit fails calls before they queue
+    content = await within_deadline(
+        llm_circuit.call(
+            lambda: llm_scheduler.run(
+                complete, priority=priority, tokens=prompt_tokens + max_tokens
+            )
+        )
+    )
+    values, cut_off = _recover_fields(content, fields)
+    if not values and not cut_off:
+        raise json.JSONDecodeError("No JSON object with the requested fields", content, 0)
+
+    missing = tuple(field for field in fields if field not in values)
+    if missing and repair:
+        metrics.increment("llm_json_repairs")
+        try:
+            repaired, _ = await _complete(
+                _repair_prompt(prompt, missing),
+                model,
+                sum(_REPAIR_MAX_TOKENS[field] for field in missing),
+                missing,
+                priority=priority,
+                repair=False,
+            )
+        except (json.JSONDecodeError, httpx.HTTPError, CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"LLM answer repair failed, keeping what was recovered: {e}")
+        else:
+            values.update(repaired)
+
+    answered = all(field in values for field in fields)
+    for field, value in _salvage(cut_off).items():
+        values.setdefault(field, value)
+    return values, answered
+
+
+def _normalize_analysis(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Validate a parsed analysis and fill in defaults."""
+    return {
+        "summary": analysis.get("summary", "No summary available"),
+        "tasks": analysis.get("tasks", []),
+        "sentiment": analysis.get("sentiment", "neutral").lower(),
+    }
+
+
+def _task_key(task: str) -> str:
+    """Form of a task used to spot duplicates across chunks."""
+    return re.sub(r"[\W_]+", " ", task.casefold()).strip()
+
+
+def _dedupe_tasks(task_lists: list[list[str]]) -> list[str]:
+    """Tasks from every chunk in order, without repeats (ignoring case and punctuation)."""
+    seen: set[str] = set()
+    tasks: list[str] = []
+    for chunk_tasks in task_lists:
+        for task in chunk_tasks:
+            key = _task_key(str(task))
+            if key and key not in seen:
+                seen.add(key)
+                tasks.append(task)
+    return tasks
+
+
+def _merge_sentiment(sentiments: list[str], weights: list[int]) -> str:
+    """Sentiment of the whole text: length-weighted vote of the chunks, neutral on a tie."""
+    votes: dict[str, int] = {}
+    for sentiment, weight in zip(sentiments, weights, strict=True):
+        if sentiment in SENTIMENTS:
+            votes[sentiment] = votes.get(sentiment, 0) + weight
+    if not votes:
+        return "neutral"
+    best = max(votes.values())
+    leaders = [sentiment for sentiment, count in votes.items() if count == best]
+    return leaders[0] if len(leaders) == 1 else "neutral"
+
+
+async def _analyze_chunked(
+    chunks: list[str], priority: int, summary_only: bool = False
+) -> tuple[dict[str, Any], bool]:
+    """
+    Analyze the chunks of a long text concurrently and merge the results.
+
+    Chunks go through the scheduler like any other request, so up to
+    ``llm_max_concurrency`` of them are in flight at once.
+
+    Returns:
+        The merged analysis and whether every answer it was built from was complete
+
+    Raises:
+        Whatever the first failing chunk raised; partial results are discarded
+    """
+    start = time.perf_counter()
+    max_tokens = SUMMARY_MAX_TOKENS if summary_only else ANALYSIS_MAX_TOKENS
+    fields = SUMMARY_FIELDS if summary_only else ANALYSIS_FIELDS
+    analyses = await asyncio.gather(
+        *(
+            _complete(
+                _analysis_prompt(chunk, (i, len(chunks)), summary_only),
+                select_model(count_tokens(chunk)),
+                max_tokens,
+                fields,
+                priority=priority,
             )
-            response.raise_for_status()
-            result = response.json()
+            for i, chunk in enumerate(chunks, start=1)
+        )
+    )
+    parts = [_normalize_analysis(analysis) for analysis, _ in analyses]
+    complete = all(answered for _, answered in analyses)
+    metrics.observe("llm_chunked_ms", (time.perf_counter() - start) * 1000)
+    metrics.increment("llm_chunked_analyses")
+    metrics.increment("llm_chunks", len(chunks))
+
+    summaries = [str(part["summary"]) for part in parts]
+    result = {
+        "summary": " ".join(summaries),
+        "tasks": _dedupe_tasks([part["tasks"] for part in parts]),
+        "sentiment": _merge_sentiment(
+            [part["sentiment"] for part in parts], [len(chunk) for chunk in chunks]
+        ),
+    }
+
+    if settings.llm_chunk_merge == "reduce":
+        prompt = _reduce_prompt(summaries)
+        reduced, reduce_complete = await _complete(
+            prompt,
+            select_model(count_tokens(prompt)),
+            REDUCE_MAX_TOKENS,
+            REDUCE_FIELDS,
+            priority=priority,
+        )
+        # Recovered fields are already validated; missing ones keep the local merge
+        result.update(reduced)
+        complete = complete and reduce_complete
+
+    return result, complete
+
+
+async def _fetch_analysis(
+    text: str,
+    tokens: int,
+    cache_key: str,
+    on_partial: Optional[PartialCallback] = None,
+    priority: int = PRIORITY_PRIVATE,
+    summary_only: bool = False,
+) -> dict[str, Any]:
+    """
+    Request an analysis of a compacted text from the LLM API and cache it.
 
-            # Extract the response content
-            content = result["choices"][0]["message"]["content"].strip()
+    Analyses with salvaged or defaulted fields are returned but not cached,
+    like the other fallbacks.
 
-            # Try to parse JSON from the response
-            # Sometimes LLM wraps JSON in markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+    Raises:
+        json.JSONDecodeError: If no field could be recovered from the answer
+        httpx.HTTPStatusError: If the API kept failing after retries
+    """
+    chunks: list[str] = []
+    threshold = settings.llm_chunk_threshold_tokens
+    if threshold > 0 and tokens > threshold:
+        # Keep chunks within the route threshold, so they go to the fast model
+        max_tokens = min(settings.llm_chunk_max_tokens, settings.llm_route_threshold_tokens)
+        chunks = split_into_chunks(text, max_tokens)
+
+    if len(chunks) > 1:
+        # Latency is bounded by the slowest chunk instead of one long completion
+        result, complete = await _analyze_chunked(chunks, priority, summary_only)
+    else:
+        analysis, complete = await _complete(
+            _analysis_prompt(text, summary_only=summary_only),
+            select_model(tokens),
+            SUMMARY_MAX_TOKENS if summary_only else ANALYSIS_MAX_TOKENS,
+            SUMMARY_FIELDS if summary_only else ANALYSIS_FIELDS,
+            on_partial,
+            priority,
+        )
+        result = _normalize_analysis(analysis)
 
-            analysis = json.loads(content)
+    if complete:
+        analysis_cache.set(cache_key, result)
+    else:
+        metrics.increment("llm_degraded_analyses")
+    return result
 
-            # Validate and set defaults
-            return {
-                "summary": analysis.get("summary", "No summary available"),
-                "tasks": analysis.get("tasks", []),
-                "sentiment": analysis.get("sentiment", "neutral").lower(),
-            }
 
+async def _request_analysis(
+    text: str,
+    tokens: int,
+    cache_key: str,
+    on_partial: Optional[PartialCallback] = None,
+    priority: int = PRIORITY_PRIVATE,
+) -> dict[str, Any]:
+    """
+    Request an analysis from the LLM API.
+
+    Falls back to the local tier while the LLM circuit is open, and to an
+    error message if the request fails.
+    """
+    try:
+        return await _fetch_analysis(text, tokens, cache_key, on_partial, priority)
+
+    except CircuitOpenError as e:
+        logger.info(f"{e}; answering with the local analysis")
+        metrics.increment("llm_circuit_fallbacks")
+        # Loading the sentiment model mid-outage would defeat failing fast
+        return await analyze_locally(text, load_model=False)
     except json.JSONDecodeError as e:
         # Fallback if JSON parsing fails
         return {
@@ -104,5 +761,3 @@ Respond in JSON format:
             "tasks": [],
             "sentiment": "neutral",
         }
-
-
@@ -0,0 +1,279 @@
+"""Latency-aware failover and hedged requests across LLM endpoints.
+
+Each OpenAI-compatible endpoint keeps an EWMA of its latency and error rate.
+Requests go to the fastest healthy endpoint; if it hasn't answered by its
+p95 latency, a duplicate is sent to the next one and whichever answers first
+wins, the other being cancelled. An endpoint that fails outright (5xx, 429,
+connection errors) is failed over to the next one.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar
+
+from app.config import settings
+from app.utils.circuit_breaker import is_upstream_failure
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Takes scheduler capacity for a hedged duplicate: returns its release, or None if there is none
+HedgeReservation = Callable[[], Optional[Callable[[], None]]]
+
+# Weight of the newest sample in the latency and error-rate averages
+EWMA_ALPHA = 0.2
+# Above this error rate an endpoint is only used for failover...
+UNHEALTHY_ERROR_RATE = 0.5
+# ...until it has gone this long without a new error
+UNHEALTHY_RETRY_SECONDS = 30.0
+# Latency samples kept for the p95 hedge delay, and how many are needed first
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+# Hedge delay while an endpoint has too few samples for a p95
+DEFAULT_HEDGE_DELAY_SECONDS = 5.0
+
+
+@dataclass
+class LLMEndpoint:
+    """One OpenAI-compatible API and its observed health."""
+
+    api_base: str
+    # Empty = LLM_API_KEY
+    api_key: str = ""
+    # Overrides the routed model, for providers that name models differently
+    model: str = ""
+    # Structured output mode (empty = LLM_RESPONSE_FORMAT); lowered when the API rejects it
+    response_format: str = ""
+
+    latency_ewma: Optional[float] = None
+    error_rate: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    last_error_at: Optional[float] = None
+    _latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW), repr=False)
+
+    def record_success(self, latency: float) -> None:
+        """Fold a successful request into the averages."""
+        self.requests += 1
+        self._latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        self.error_rate *= 1 - EWMA_ALPHA
+
+    def record_censored(self, elapsed: float) -> None:
+        """
+        Fold in a request cancelled after ``elapsed`` seconds, e.g. a lost hedge race.
+
+        Its latency is only known to be at least ``elapsed``, so it is counted
+        when that exceeds the estimate; otherwise a slow endpoint that always
+        loses would keep its stale, fast estimate.
+        """
+        if self.latency_ewma is None or elapsed > self.latency_ewma:
+            self._latencies.append(elapsed)
+            if self.latency_ewma is None:
+                self.latency_ewma = elapsed
+            else:
+                self.latency_ewma += EWMA_ALPHA * (elapsed - self.latency_ewma)
+
+    def record_error(self, now: float) -> None:
+        """Fold a failed request into the error rate."""
+        self.requests += 1
+        self.errors += 1
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        self.last_error_at = now
+
+    def healthy(self, now: float) -> bool:
+        """Whether the endpoint should take first-choice traffic."""
+        if self.error_rate < UNHEALTHY_ERROR_RATE or self.last_error_at is None:
+            return True
+        return now - self.last_error_at >= UNHEALTHY_RETRY_SECONDS
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this endpoint before sending a hedged duplicate: its p95 latency."""
+        if len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "model": self.model or None,
+            "response_format": self.response_format or settings.llm_response_format,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma else None,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class EndpointPool:
+    """
+    Picks, hedges and fails over between LLM endpoints.
+
+    With a single endpoint, requests pass straight through (still timed).
+    """
+
+    def __init__(
+        self,
+        endpoints: list[LLMEndpoint],
+        hedging: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not endpoints:
+            raise ValueError("At least one LLM endpoint is required")
+        self.endpoints = endpoints
+        self.hedging = hedging
+        self._clock = clock
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.failovers = 0
+
+    def ranked(self) -> list[LLMEndpoint]:
+        """Endpoints in the order to try them: healthy by EWMA latency, then the rest."""
+        now = self._clock()
+        # Endpoints without samples yet sort first so they get measured
+        return sorted(
+            self.endpoints,
+            key=lambda e: (not e.healthy(now), e.latency_ewma or 0.0, e.error_rate),
+        )
+
+    async def _timed(
+        self, endpoint: LLMEndpoint, request: Callable[[LLMEndpoint], Awaitable[T]]
+    ) -> T:
+        """Run a request against one endpoint and record how it went."""
+        start = self._clock()
+        try:
+            result = await request(endpoint)
+        except asyncio.CancelledError:
+            # Lost a hedge race: not an error, but it took at least this long
+            endpoint.record_censored(self._clock() - start)
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                endpoint.record_error(self._clock())
+            raise
+        endpoint.record_success(self._clock() - start)
+        return result
+
+    async def call(
+        self,
+        request: Callable[[LLMEndpoint], Awaitable[T]],
+        reserve_hedge: Optional[HedgeReservation] = None,
+    ) -> T:
+        """
+        Run ``request`` against the best endpoint, hedging and failing over as needed.
+
+        Args:
+            request: Sends the request to the given endpoint
+            reserve_hedge: Capacity check for a hedged duplicate; the hedge is
+                skipped when it returns None, and its release is called once
+                the duplicate finishes. Without it hedges are unlimited.
+
+        Returns:
+            The first successful result
+
+        Raises:
+            The error of the last endpoint tried, or any request error that
+            isn't the endpoint's fault (e.g. a 400)
+        """
+        untried = iter(self.ranked())
+        first = next(untried)
+        pending: dict[asyncio.Task, LLMEndpoint] = {
+            asyncio.ensure_future(self._timed(first, request)): first
+        }
+        hedge_pending = self.hedging and len(self.endpoints) > 1
+        hedge: Optional[LLMEndpoint] = None
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                timeout = first.hedge_delay() if hedge_pending else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Slower than its p95: race a duplicate on the next endpoint
+                    hedge_pending = False
+                    release = reserve_hedge() if reserve_hedge is not None else None
+                    if reserve_hedge is not None and release is None:
+                        # No spare slot or rate budget: the duplicate would exceed the limits
+                        self.hedges_skipped += 1
+                        metrics.increment("llm_hedges_skipped")
+                        continue
+                    hedge = next(untried, None)
+                    if hedge is not None:
+                        self.hedged += 1
+                        metrics.increment("llm_hedged")
+                        task = asyncio.ensure_future(self._timed(hedge, request))
+                        if release is not None:
+                            task.add_done_callback(lambda _, release=release: release())
+                        pending[task] = hedge
+                    elif release is not None:
+                        release()
+                    continue
+
+                for task in done:
+                    endpoint = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if endpoint is hedge:
+                            self.hedge_wins += 1
+                            metrics.increment("llm_hedge_wins")
+                        return task.result()
+                    if not is_upstream_failure(error):
+                        raise error
+                    last_error = error
+                    logger.warning(f"LLM endpoint {endpoint.api_base} failed: {error}")
+
+                if not pending:
+                    backup = next(untried, None)
+                    if backup is not None:
+                        hedge_pending = False
+                        self.failovers += 1
+                        metrics.increment("llm_failovers")
+                        pending[asyncio.ensure_future(self._timed(backup, request))] = backup
+
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Per-endpoint health and hedging counters."""
+        return {
+            "hedging": self.hedging,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "failovers": self.failovers,
+            "endpoints": [{"api_base": e.api_base, **e.snapshot()} for e in self.endpoints],
+        }
+
+
+def _configured_endpoints() -> list[LLMEndpoint]:
+    """The primary endpoint from LLM_API_BASE/LLM_API_KEY, then LLM_FALLBACK_ENDPOINTS."""
+    return [LLMEndpoint(api_base=settings.llm_api_base)] + [
+        LLMEndpoint(
+            api_base=config.api_base,
+            api_key=config.api_key,
+            model=config.model,
+            response_format=config.response_format or "",
+        )
+        for config in settings.llm_fallback_endpoints
+    ]
+
+
+llm_endpoints = EndpointPool(_configured_endpoints(), hedging=settings.llm_hedging)
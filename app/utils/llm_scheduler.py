@@ -0,0 +1,259 @@
+"""Scheduling of outbound LLM requests.
+
+Bursts of messages would otherwise send unbounded parallel requests upstream
+and come back as 429s. The scheduler caps concurrency, spends from
+requests-per-minute and tokens-per-minute buckets before each request, lets
+private chats go ahead of groups while waiting, and retries rate-limited or
+overloaded responses after ``Retry-After`` with jittered backoff.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, TypeVar
+
+import httpx
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower values are served first
+PRIORITY_PRIVATE = 0
+PRIORITY_GROUP = 1
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def chat_priority(chat_type: Optional[str]) -> int:
+    """Scheduling priority for a Telegram chat type: private chats first."""
+    return PRIORITY_PRIVATE if chat_type == "private" else PRIORITY_GROUP
+
+
+class TokenBucket:
+    """
+    Per-minute allowance that refills continuously.
+
+    Reservations may overdraw the bucket; the caller then waits until the
+    refill covers the debt, so reservations are served in the order made.
+    A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.per_minute = per_minute
+        self._clock = clock
+        self._tokens = float(per_minute)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        rate = self.per_minute / 60
+        self._tokens = min(self._tokens + (now - self._updated) * rate, self.per_minute)
+        self._updated = now
+
+    def covers(self, amount: float) -> bool:
+        """Whether ``amount`` could be reserved now without waiting."""
+        if self.per_minute <= 0:
+            return True
+        self._refill()
+        return self._tokens >= min(amount, self.per_minute)
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take ``amount`` from the bucket.
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill()
+        # A single request larger than a minute's allowance would wait forever
+        self._tokens -= min(amount, self.per_minute)
+        return max(-self._tokens / (self.per_minute / 60), 0.0)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """Concurrency cap, rate limits, priority queue and retries for LLM calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 2,
+        backoff_base_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self._clock = clock
+
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Set by a 429: everyone waits, not only the request that got it
+        self._paused_until = 0.0
+
+        self.retries = 0
+        self.rate_limited = 0
+
+    async def _acquire(self, priority: int) -> None:
+        """Wait for a concurrency slot; lower priority values are served first."""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as this caller was cancelled
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def try_reserve(self, tokens: int = 0) -> Optional[Callable[[], None]]:
+        """
+        Take a concurrency slot and rate budget for an extra request, without waiting.
+
+        For hedged duplicates, which should only go out on spare capacity:
+        never past ``max_concurrency``, ahead of queued requests, or over
+        the per-minute budgets.
+
+        Args:
+            tokens: Estimated prompt plus completion tokens, for the TPM bucket
+
+        Returns:
+            Releases the slot once the extra request is done, or None if
+            there is no spare capacity right now
+        """
+        if self._active >= self.max_concurrency or self._waiters:
+            return None
+        if self._paused_until > self._clock():
+            return None
+        if not (self.requests.covers(1) and self.tokens.covers(tokens)):
+            return None
+        self.requests.reserve(1)
+        self.tokens.reserve(tokens)
+        self._active += 1
+        return self._release
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before a retry: Retry-After plus jitter, or full-jitter exponential backoff."""
+        jitter = random.uniform(0, self.backoff_base_seconds * 2**attempt)
+        if retry_after is not None:
+            return retry_after + jitter
+        return jitter
+
+    async def _wait_for_budget(self, tokens: int) -> None:
+        """Wait for the rate-limit buckets and any Retry-After pause."""
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        delay = max(delay, self._paused_until - self._clock())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def run(
+        self, call: Callable[[], Awaitable[T]], priority: int = PRIORITY_PRIVATE, tokens: int = 0
+    ) -> T:
+        """
+        Run an upstream call once capacity and rate budget allow.
+
+        Args:
+            call: Makes the request; HTTP errors must surface as ``httpx.HTTPStatusError``
+            priority: PRIORITY_PRIVATE or PRIORITY_GROUP
+            tokens: Estimated prompt plus completion tokens, for the TPM bucket
+
+        Returns:
+            Result of the call
+
+        Raises:
+            httpx.HTTPStatusError: If the call still fails after the retries
+        """
+        queued_at = time.perf_counter()
+        await self._acquire(priority)
+        try:
+            await self._wait_for_budget(tokens)
+            metrics.observe("llm_queue_wait_ms", (time.perf_counter() - queued_at) * 1000)
+
+            for attempt in range(self.max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    return await call()
+                except httpx.HTTPStatusError as e:
+                    status = e.response.status_code
+                    if status not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                        raise
+                    retry_after = retry_after_seconds(e.response)
+                    delay = self._backoff(attempt, retry_after)
+                    if status == 429:
+                        self.rate_limited += 1
+                        metrics.increment("llm_rate_limited")
+                        self._paused_until = max(self._paused_until, self._clock() + delay)
+                    self.retries += 1
+                    metrics.increment("llm_retries")
+                    logger.warning(f"LLM API returned {status}, retrying in {delay:.1f}s")
+                finally:
+                    metrics.observe("llm_upstream_ms", (time.perf_counter() - start) * 1000)
+
+                await asyncio.sleep(delay)
+                await self._wait_for_budget(tokens)
+
+            raise AssertionError("unreachable")
+        finally:
+            self._release()
+
+    def stats(self) -> dict[str, Any]:
+        """Current load and retry counters."""
+        return {
+            "active": self._active,
+            "queued": sum(1 for _, _, f in self._waiters if not f.done()),
+            "max_concurrency": self.max_concurrency,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "paused_seconds": round(max(self._paused_until - self._clock(), 0.0), 3),
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.llm_max_concurrency,
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    max_retries=settings.llm_max_retries,
+)
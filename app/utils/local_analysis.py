@@ -0,0 +1,247 @@
+"""Local text analysis tier: CPU sentiment classifier and rule-based task extraction.
+
+Lets the text path answer without a round trip to the LLM API: sentiment
+comes from a small distilled transformer classifier, batched across
+concurrent messages, and tasks from checkbox, TODO and imperative lines.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from app.config import settings
+from app.utils.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Binary (SST-2 style) classifiers have no neutral class; below this
+# confidence the message is treated as neutral
+NEUTRAL_BELOW_CONFIDENCE = 0.75
+
+# DistilBERT's input limit; longer texts are classified by their beginning
+MAX_INPUT_TOKENS = 512
+
+# Extractive fallback summary when no LLM is used
+SUMMARY_MAX_SENTENCES = 2
+SUMMARY_MAX_CHARS = 300
+
+# A failed model load is retried after this long, doubling up to the maximum
+LOAD_RETRY_SECONDS = 30.0
+LOAD_RETRY_MAX_SECONDS = 600.0
+
+_model: Optional[Any] = None
+_tokenizer: Optional[Any] = None
+_load_failures = 0
+_retry_at = 0.0
+_model_lock = threading.Lock()
+
+_batcher: Optional[MicroBatcher[str, str]] = None
+
+_BULLET = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+_OPEN_CHECKBOX = re.compile(r"^\s*(?:[-*+•]\s*)?(?:\[\s\]|☐)\s*(.+)$")
+_DONE_CHECKBOX = re.compile(r"^\s*(?:[-*+•]\s*)?(?:\[[xX]\]|☑|☒|✅)")
+_TODO_PREFIX = re.compile(r"^(?:todo|to-do|to do|action items?)\s*[:\-]\s*(.+)$", re.IGNORECASE)
+_REQUEST_PHRASE = re.compile(
+    r"\b(?:please|pls|need to|needs to|have to|has to|must|"
+    r"don't forget to|do not forget to|remember to)\s+(.+)$",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Verbs that start an instruction when they open a line or sentence
+IMPERATIVE_VERBS = frozenset(
+    {
+        "add", "arrange", "ask", "book", "bring", "buy", "call", "cancel", "check",
+        "clean", "confirm", "contact", "create", "deploy", "email", "file", "finish",
+        "fix", "follow", "get", "invite", "message", "order", "organize", "pay",
+        "pick", "plan", "prepare", "print", "reply", "remind", "renew", "reschedule",
+        "review", "schedule", "send", "set", "sign", "submit", "text", "update",
+        "upload", "write",
+    }
+)
+
+
+def _load_sentiment_model() -> tuple[Any, Any]:
+    """
+    Load the sentiment tokenizer and model once (thread-safe).
+
+    After a failed load, batches fail fast until the retry backoff has
+    passed, so a missing model isn't reloaded for every batch but a
+    transient failure (e.g. a download error) doesn't disable the tier
+    for good.
+
+    Raises:
+        RuntimeError: If the model can't be loaded
+    """
+    global _model, _tokenizer, _load_failures, _retry_at
+    with _model_lock:
+        if _model is None and time.monotonic() >= _retry_at:
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            name = settings.local_sentiment_model
+            local_only = not settings.model_allow_download
+            logger.info(f"Loading local sentiment model {name}")
+            try:
+                tokenizer = AutoTokenizer.from_pretrained(name, local_files_only=local_only)
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    name, local_files_only=local_only
+                )
+            except Exception as e:
+                _load_failures += 1
+                delay = min(LOAD_RETRY_SECONDS * 2 ** (_load_failures - 1), LOAD_RETRY_MAX_SECONDS)
+                _retry_at = time.monotonic() + delay
+                logger.error(
+                    f"Local sentiment model {name} unavailable, retrying in {delay:.0f}s: {e}"
+                )
+            else:
+                model.eval()
+                _tokenizer, _model = tokenizer, model
+                _load_failures = 0
+        if _model is None:
+            raise RuntimeError(f"Local sentiment model {settings.local_sentiment_model} unavailable")
+    return _tokenizer, _model
+
+
+def _to_sentiment(label: str, confidence: float) -> str:
+    """Map a classifier label to positive/neutral/negative."""
+    label = label.lower()
+    if label not in ("positive", "neutral", "negative"):
+        return "neutral"
+    if label != "neutral" and confidence < NEUTRAL_BELOW_CONFIDENCE:
+        return "neutral"
+    return label
+
+
+def _classify_sentiments(texts: list[str]) -> list[str]:
+    """Classify a batch of texts in one forward pass (blocking; run off the event loop)."""
+    import torch
+
+    tokenizer, model = _load_sentiment_model()
+    inputs = tokenizer(
+        texts,
+        padding=True,
+        truncation=True,
+        max_length=MAX_INPUT_TOKENS,
+        return_tensors="pt",
+    )
+    with torch.inference_mode():
+        probabilities = torch.softmax(model(**inputs).logits, dim=-1)
+
+    confidences, indices = probabilities.max(dim=-1)
+    id2label = model.config.id2label
+    return [
+        _to_sentiment(id2label[int(index)], float(confidence))
+        for index, confidence in zip(indices, confidences, strict=True)
+    ]
+
+
+async def _sentiment_batch(texts: list[str]) -> list[str | BaseException]:
+    """Run a sentiment batch in a thread so the event loop stays responsive."""
+    return await asyncio.to_thread(_classify_sentiments, texts)
+
+
+def get_sentiment_batcher() -> MicroBatcher[str, str]:
+    """Get the shared sentiment batcher."""
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            _sentiment_batch,
+            max_batch_size=settings.local_sentiment_max_batch_size,
+            max_wait_ms=settings.local_sentiment_max_wait_ms,
+        )
+    return _batcher
+
+
+async def warmup_local_analysis() -> None:
+    """Load the sentiment model ahead of the first message."""
+    await asyncio.to_thread(_load_sentiment_model)
+
+
+def extract_tasks(text: str) -> list[str]:
+    """
+    Find tasks in a message with simple rules.
+
+    Recognizes open checkboxes (``- [ ] ...``, ``☐ ...``), ``TODO:`` lines,
+    lines or sentences starting with an imperative verb ("Buy milk"), and
+    requests such as "please ...", "need to ..." or "don't forget to ...".
+    Ticked checkboxes are skipped.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Tasks in the order they appear, without duplicates
+    """
+    tasks: list[str] = []
+    seen: set[str] = set()
+
+    def add(task: str) -> None:
+        task = task.strip().rstrip(".!;,")
+        key = task.casefold()
+        if task and key not in seen:
+            seen.add(key)
+            tasks.append(task[0].upper() + task[1:])
+
+    for line in text.splitlines():
+        if not line.strip() or _DONE_CHECKBOX.match(line):
+            continue
+        checkbox = _OPEN_CHECKBOX.match(line)
+        if checkbox:
+            add(checkbox.group(1))
+            continue
+
+        line = _BULLET.sub("", line).strip()
+        todo = _TODO_PREFIX.match(line)
+        if todo:
+            add(todo.group(1))
+            continue
+
+        for sentence in _SENTENCE_END.split(line):
+            words = sentence.split(maxsplit=1)
+            if words and words[0].lower().strip(",:") in IMPERATIVE_VERBS:
+                add(sentence)
+                continue
+            request = _REQUEST_PHRASE.search(sentence)
+            if request:
+                add(request.group(1))
+
+    return tasks
+
+
+def lead_summary(text: str) -> str:
+    """Extractive summary: the first sentences of the message."""
+    sentences = _SENTENCE_END.split(" ".join(text.split()))
+    summary = " ".join(sentences[:SUMMARY_MAX_SENTENCES])
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = summary[: SUMMARY_MAX_CHARS - 1].rsplit(" ", 1)[0] + "…"
+    return summary
+
+
+async def analyze_locally(text: str, load_model: bool = True) -> dict[str, Any]:
+    """
+    Analyze a message without calling the LLM API.
+
+    Args:
+        text: Message text
+        load_model: Whether the sentiment model may be loaded now; when False
+            and it isn't loaded yet, the sentiment is neutral (rules only)
+
+    Returns:
+        Dictionary with the same keys as an LLM analysis; the summary is
+        the lead of the message
+    """
+    sentiment = "neutral"
+    if load_model or _model is not None:
+        try:
+            sentiment = await get_sentiment_batcher().submit(text)
+        except Exception as e:
+            logger.warning(f"Local sentiment classification failed: {e}")
+
+    return {
+        "summary": lead_summary(text),
+        "tasks": extract_tasks(text),
+        "sentiment": sentiment,
+    }
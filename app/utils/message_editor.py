@@ -0,0 +1,109 @@
+"""Rate-limited progressive edits of a Telegram message."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+from telegram.error import TelegramError
+
+from app.utils.deadline import current_deadline, telegram_timeouts
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledEditor:
+    """
+    Edit a message with in-progress content at most once per interval.
+
+    Telegram rate-limits edits (roughly one per second per chat, less in
+    groups), so intermediate updates that arrive too soon after the previous
+    edit are dropped; the final edit is always sent. Failed intermediate
+    edits are logged and ignored, since the final edit supersedes them.
+    Once finished, the editor ignores further updates and cancels a
+    progress edit still in flight, so late partials can't overwrite the
+    final text.
+    """
+
+    def __init__(
+        self,
+        message: Any,
+        min_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.message = message
+        self.min_interval = min_interval
+        self.edits = 0
+        self._clock = clock
+        self._last_edit: Optional[float] = None
+        self._last_text: Optional[str] = None
+        self._pending: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def update(self, text: str, parse_mode: Optional[str] = None) -> bool:
+        """
+        Show in-progress text unless the last edit was too recent.
+
+        Returns:
+            Whether the message was edited
+        """
+        if self._closed:
+            return False
+        now = self._clock()
+        if text == self._last_text:
+            return False
+        if self._last_edit is not None and now - self._last_edit < self.min_interval:
+            return False
+        deadline = current_deadline()
+        if deadline is not None and deadline.remaining() <= 0:
+            # Out of budget: leave the time for the final edit
+            return False
+
+        self._last_edit = now
+        self._pending = asyncio.ensure_future(
+            self.message.edit_text(text, parse_mode=parse_mode, **telegram_timeouts())
+        )
+        try:
+            await self._pending
+        except TelegramError as e:
+            logger.debug(f"Skipped progress edit: {e}")
+            return False
+        except asyncio.CancelledError:
+            if not self._closed:
+                raise
+            # Cancelled by finish(): the final text supersedes this edit
+            return False
+        finally:
+            self._pending = None
+        self._last_text = text
+        self.edits += 1
+        return True
+
+    async def finish(self, text: str, parse_mode: Optional[str] = None) -> None:
+        """Show the final text, regardless of the interval, and stop accepting updates."""
+        self._closed = True
+        if self._pending is not None:
+            self._pending.cancel()
+        if text == self._last_text:
+            # Telegram rejects edits that don't change the message
+            return
+        await self.message.edit_text(text, parse_mode=parse_mode, **telegram_timeouts())
+        self._last_text = text
+        self.edits += 1
+
+
+def summary_progress(editor: ThrottledEditor) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    """
+    Partial-analysis callback that shows the summary generated so far.
+
+    Progress edits are plain text: a half-written summary can contain
+    unbalanced Markdown that Telegram would refuse to parse.
+    """
+
+    async def show(partial: dict[str, Any]) -> None:
+        summary = partial.get("summary")
+        if isinstance(summary, str) and summary.strip():
+            await editor.update(f"📊 AI Analysis\n\n📝 Summary:\n{summary} …")
+
+    return show
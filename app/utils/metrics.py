@@ -0,0 +1,87 @@
+"""In-process counters and latency summaries exposed on /metrics."""
+
+import random
+import threading
+from typing import Any
+
+
+class _Summary:
+    """Running count/sum/max plus a bounded reservoir sample for percentiles."""
+
+    def __init__(self, reservoir_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._reservoir: list[float] = []
+        self._reservoir_size = reservoir_size
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if len(self._reservoir) < self._reservoir_size:
+            self._reservoir.append(value)
+        else:
+            # Reservoir sampling keeps a uniform sample of everything observed
+            slot = random.randrange(self.count)
+            if slot < self._reservoir_size:
+                self._reservoir[slot] = value
+
+    def percentile(self, q: float) -> float:
+        if not self._reservoir:
+            return 0.0
+        ordered = sorted(self._reservoir)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(0.50), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named counters and value summaries."""
+
+    def __init__(self):
+        self._counters: dict[str, float] = {}
+        self._summaries: dict[str, _Summary] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value (e.g. a latency in ms) in a summary."""
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = self._summaries[name] = _Summary()
+            summary.observe(value)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter."""
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """All counters and summaries."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "summaries": {name: s.snapshot() for name, s in self._summaries.items()},
+            }
+
+    def reset(self) -> None:
+        """Clear everything (used by tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# Global metrics registry
+metrics = Metrics()
@@ -0,0 +1,70 @@
+"""ONNX Runtime inference backend (CPU execution provider)."""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.utils.backends import InferenceBackend
+from app.utils.labels import ASSETS_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def onnx_path(model_name: str) -> Path:
+    """
+    Location of a model's exported ONNX graph (produced by scripts/export_onnx.py).
+
+    ONNX_MODEL_PATH overrides the location of the main ResNet18 graph.
+    """
+    if model_name == "resnet18" and settings.onnx_model_path:
+        return Path(settings.onnx_model_path)
+    return ASSETS_DIR / f"{model_name}.onnx"
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Run an exported classifier graph with ONNX Runtime.
+
+    A worker using this backend doesn't import torch at all, which keeps its
+    resident memory far below a torch worker's.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: Optional[Path] = None, num_threads: int = 0):
+        self.model_path = Path(model_path or onnx_path("resnet18"))
+        self.num_threads = num_threads
+        self._session = None
+        self._input_name = ""
+
+    def load(self) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(
+                "onnxruntime is not installed; install the 'onnx' extra to use this backend"
+            ) from e
+
+        if not self.model_path.exists():
+            raise RuntimeError(
+                f"ONNX model not found at {self.model_path}. Run scripts/export_onnx.py first."
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+
+        self._session = ort.InferenceSession(
+            str(self.model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+        logger.info(f"Loaded ONNX model from {self.model_path}")
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self._session is None:
+            self.load()
+        return self._session.run(None, {self._input_name: batch})[0]
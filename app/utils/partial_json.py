@@ -0,0 +1,241 @@
+"""Tolerant parsing of JSON that may be cut off at any point.
+
+Used to read a streamed LLM completion before it has finished: whatever
+prefix has arrived so far is turned into the fields completed up to that
+point, with a string that is still being generated returned as far as it got.
+The same parser salvages the fields of a finished completion that was
+truncated, fenced or broken part-way through.
+"""
+
+import json
+import re
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_NUMBER_PREFIX = re.compile(r"-?[0-9.eE+-]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+# LLMs sometimes put raw newlines inside strings
+_DECODER = json.JSONDecoder(strict=False)
+# A backslash escape cut off before it is complete
+_INCOMPLETE_ESCAPE = re.compile(r"\\(?:u[0-9a-fA-F]{0,3})?$")
+
+
+class _Incomplete(Exception):
+    """The input ended inside a value that can't be shown partially."""
+
+
+class _PartialParser:
+    """Recursive-descent parser that stops cleanly at the end of the input."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def _skip_whitespace(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _at_end(self) -> bool:
+        self._skip_whitespace()
+        return self.pos >= len(self.text)
+
+    def parse_value(self) -> tuple[Any, bool]:
+        """Parse one value; returns it and whether it was complete."""
+        if self._at_end():
+            raise _Incomplete
+        char = self.text[self.pos]
+        if char == "{":
+            return self._parse_object()
+        if char == "[":
+            return self._parse_array()
+        if char == '"':
+            return self._parse_string()
+        return self._parse_scalar(), True
+
+    def _parse_string(self) -> tuple[str, bool]:
+        start = self.pos + 1
+        end = start
+        while end < len(self.text):
+            char = self.text[end]
+            if char == "\\":
+                end += 2
+                continue
+            if char == '"':
+                self.pos = end + 1
+                return _DECODER.decode(self.text[start - 1 : end + 1]), True
+            end += 1
+
+        # Unterminated: decode what arrived, minus a half-written escape
+        self.pos = len(self.text)
+        raw = _INCOMPLETE_ESCAPE.sub("", self.text[start:])
+        try:
+            return _DECODER.decode(f'"{raw}"'), False
+        except json.JSONDecodeError:
+            raise _Incomplete from None
+
+    def _parse_scalar(self) -> Any:
+        for literal, value in _LITERALS.items():
+            if self.text.startswith(literal, self.pos):
+                self.pos += len(literal)
+                return value
+        rest = self.text[self.pos :]
+        if any(literal.startswith(rest) for literal in _LITERALS):
+            raise _Incomplete
+
+        match = _NUMBER.match(self.text, self.pos)
+        if match is None:
+            if _NUMBER_PREFIX.fullmatch(rest):
+                raise _Incomplete
+            raise ValueError(f"Unexpected character at position {self.pos}")
+        # A number touching the end of the input may still be growing
+        if match.end() == len(self.text):
+            raise _Incomplete
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def _parse_array(self) -> tuple[list, bool]:
+        self.pos += 1
+        items: list = []
+        while True:
+            if self._at_end():
+                return items, False
+            if self.text[self.pos] == "]":
+                self.pos += 1
+                return items, True
+            try:
+                value, complete = self.parse_value()
+            except _Incomplete:
+                return items, False
+            items.append(value)
+            if not complete or self._at_end():
+                return items, False
+            if self.text[self.pos] == ",":
+                self.pos += 1
+
+    def _parse_object(self) -> tuple[dict, bool]:
+        self.pos += 1
+        result: dict = {}
+        while True:
+            if self._at_end():
+                return result, False
+            if self.text[self.pos] == "}":
+                self.pos += 1
+                return result, True
+            if self.text[self.pos] == ",":
+                self.pos += 1
+                continue
+            if self.text[self.pos] != '"':
+                raise ValueError(f"Expected a key at position {self.pos}")
+
+            key, complete = self._parse_string()
+            if not complete or self._at_end():
+                return result, False
+            if self.text[self.pos] != ":":
+                raise ValueError(f"Expected ':' at position {self.pos}")
+            self.pos += 1
+
+            try:
+                value, complete = self.parse_value()
+            except _Incomplete:
+                return result, False
+            result[key] = value
+            if not complete:
+                return result, False
+
+
+def parse_partial_json(text: str) -> Any:
+    """
+    Parse a possibly truncated JSON document.
+
+    Unterminated strings are returned as far as they got, and unterminated
+    arrays and objects contain the members parsed so far. A number or literal
+    cut off at the end is left out, since its value isn't known yet.
+
+    Args:
+        text: A prefix of a JSON document
+
+    Returns:
+        The parsed (partial) value, or None if no value has started yet
+
+    Raises:
+        ValueError: If the text is not a prefix of valid JSON
+    """
+    try:
+        value, _ = _PartialParser(text).parse_value()
+    except _Incomplete:
+        return None
+    return value
+
+
+def parse_partial_object(text: str) -> dict[str, Any]:
+    """
+    Parse the JSON object in a possibly truncated LLM completion.
+
+    Anything before the first ``{`` (such as a Markdown code fence) is
+    ignored.
+
+    Returns:
+        The fields parsed so far; empty if the object hasn't started or
+        the text isn't valid JSON
+    """
+    start = text.find("{")
+    if start < 0:
+        return {}
+    try:
+        value = parse_partial_json(text[start:])
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def recover_object(text: str) -> tuple[dict[str, Any], set[str]]:
+    """
+    Salvage the members of the first JSON object in an LLM completion.
+
+    Text around the object (code fences, commentary) is ignored. Parsing
+    stops at the end of the input or at the first member that isn't valid
+    JSON; the members before it are kept.
+
+    Args:
+        text: Completion text
+
+    Returns:
+        The members parsed (values cut off at the end included, as far as
+        they got) and the keys whose values are complete
+    """
+    start = text.find("{")
+    if start < 0:
+        return {}, set()
+
+    parser = _PartialParser(text[start:])
+    parser.pos = 1
+    values: dict[str, Any] = {}
+    complete: set[str] = set()
+
+    while not parser._at_end():
+        char = parser.text[parser.pos]
+        if char == "}":
+            break
+        if char == ",":
+            parser.pos += 1
+            continue
+        if char != '"':
+            break
+
+        key, key_complete = parser._parse_string()
+        if not key_complete or parser._at_end() or parser.text[parser.pos] != ":":
+            break
+        parser.pos += 1
+
+        try:
+            value, value_complete = parser.parse_value()
+        except (_Incomplete, ValueError):
+            break
+        values[key] = value
+        if value_complete:
+            complete.add(key)
+        else:
+            break
+
+    return values, complete
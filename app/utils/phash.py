@@ -0,0 +1,58 @@
+"""Perceptual image hashing for duplicate detection."""
+
+from PIL import Image
+
+from app.utils.image_io import ImageBuffer, open_image
+
+# dHash compares each pixel with its right neighbour on a 9x8 grayscale thumbnail
+_HASH_WIDTH = 9
+_HASH_HEIGHT = 8
+_HASH_BITS = (_HASH_WIDTH - 1) * _HASH_HEIGHT
+
+# Flat or low-detail images (sky, a plain wall, a dark photo) hash to
+# (nearly) all zeros or all ones; fewer differing bits than this in
+# either direction say too little about the picture to identify it
+MIN_DISTINCT_BITS = 8
+
+
+def perceptual_hash(image_bytes: ImageBuffer) -> str:
+    """
+    Compute a 64-bit difference hash (dHash) of an image.
+
+    The hash survives re-encoding, resizing and small compression artifacts,
+    so the same picture uploaded twice maps to the same key.
+
+    Args:
+        image_bytes: Raw image bytes
+
+    Returns:
+        16-character hex string
+
+    Raises:
+        ValueError: If the image cannot be decoded
+    """
+    try:
+        image = open_image(image_bytes)
+        # Let the JPEG decoder skip most of the work; we only need a thumbnail
+        image.draft("L", (_HASH_WIDTH * 4, _HASH_HEIGHT * 4))
+        image = image.convert("L").resize((_HASH_WIDTH, _HASH_HEIGHT), Image.Resampling.BILINEAR)
+        pixels = list(image.getdata())
+    except Exception as e:
+        raise ValueError(f"Failed to hash image: {str(e)}") from e
+
+    if len(pixels) != _HASH_WIDTH * _HASH_HEIGHT:
+        raise ValueError(f"Failed to hash image: unexpected thumbnail size {len(pixels)}")
+
+    bits = 0
+    for row in range(_HASH_HEIGHT):
+        offset = row * _HASH_WIDTH
+        for col in range(_HASH_WIDTH - 1):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f"{bits:016x}"
+
+
+def is_distinctive_hash(phash: str) -> bool:
+    """Whether a perceptual hash has enough detail to identify an image."""
+    ones = int(phash, 16).bit_count()
+    return MIN_DISTINCT_BITS <= ones <= _HASH_BITS - MIN_DISTINCT_BITS
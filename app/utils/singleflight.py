@@ -0,0 +1,76 @@
+"""Coalescing of identical concurrent async calls."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+from app.utils.deadline import within_deadline, without_deadline
+
+T = TypeVar("T")
+
+
+async def _run(fn: Callable[[], Awaitable[T]]) -> T:
+    return await fn()
+
+
+class SingleFlight(Generic[T]):
+    """
+    In-flight call table: concurrent callers with the same key share one call.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result (or exception) instead of starting
+    their own. Once it finishes the key is released, so later callers start
+    a fresh call. A caller that is cancelled stops waiting without cancelling
+    the shared call for the others.
+
+    The shared call runs outside any update deadline; each caller waits for
+    it only as long as its own deadline allows.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task[T]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn()`` unless a call for ``key`` is already in flight, and return its result.
+
+        Args:
+            key: Identity of the call; equal keys must produce interchangeable results
+            fn: Starts the call; only invoked by the first caller for a key
+
+        Returns:
+            Result of the shared call
+
+        Raises:
+            DeadlineExceeded: If the caller's update ran out of time first
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.get_running_loop().create_task(
+                _run(fn), context=without_deadline()
+            )
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._release(key, task))
+        else:
+            self.coalesced += 1
+        return await within_deadline(asyncio.shield(task))
+
+    def _release(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every waiter may have been cancelled; the error was theirs to handle
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        """Started calls, callers that joined one in flight, and calls running now."""
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+            "coalesced_rate": round(self.coalesced / total, 4) if total else 0.0,
+        }
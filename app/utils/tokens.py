@@ -0,0 +1,58 @@
+"""Token counts for LLM requests."""
+
+import logging
+import threading
+from typing import Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OpenAI-style BPE tokenizers average about four characters of English per token
+CHARS_PER_TOKEN = 4
+
+_tokenizer: Optional[Any] = None
+_tokenizer_failed = False
+_tokenizer_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough number of tokens in a text, without loading a tokenizer."""
+    return max(len(text) // CHARS_PER_TOKEN, 1) if text else 0
+
+
+def load_tokenizer() -> Optional[Any]:
+    """
+    Load the configured ``llm_tokenizer`` once (thread-safe).
+
+    Returns:
+        The tokenizer, or None if none is configured or it can't be loaded
+    """
+    global _tokenizer, _tokenizer_failed
+    if not settings.llm_tokenizer or _tokenizer_failed:
+        return None
+    with _tokenizer_lock:
+        if _tokenizer is None and not _tokenizer_failed:
+            try:
+                from transformers import AutoTokenizer
+
+                _tokenizer = AutoTokenizer.from_pretrained(
+                    settings.llm_tokenizer, local_files_only=not settings.model_allow_download
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Tokenizer {settings.llm_tokenizer} unavailable, estimating token counts: {e}"
+                )
+                _tokenizer_failed = True
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in a text per the configured tokenizer, or an estimate without one."""
+    if not text:
+        return 0
+    tokenizer = load_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    # verbose=False: texts longer than the tokenizer's model limit are fine for counting
+    return len(tokenizer.encode(text, add_special_tokens=False, verbose=False))
@@ -0,0 +1,246 @@
+"""PyTorch inference backend with selectable CPU execution modes."""
+
+import inspect
+import logging
+import os
+import ssl
+from pathlib import Path
+
+import certifi
+import numpy as np
+import torch
+from torchvision import models
+
+from app.config import settings
+from app.utils.backends import MODELS, InferenceBackend
+from app.utils.image_io import CROP_SIZE
+from app.utils.labels import ASSETS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Fix SSL certificate issues on macOS
+# Set SSL certificate path before any network requests
+os.environ["SSL_CERT_FILE"] = certifi.where()
+os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
+
+# Packaged weights, produced by scripts/fetch_assets.py at build time
+RESNET18_WEIGHTS_PATH = ASSETS_DIR / "resnet18.pth"
+RESNET18_INT8_WEIGHTS_PATH = ASSETS_DIR / "resnet18_int8.pth"
+
+INFERENCE_MODES = ("eager", "torchscript", "compile", "dynamic_int8", "static_int8", "bf16")
+
+# Model name -> (torchvision constructor, ImageNet weights)
+_ARCHITECTURES = {
+    "resnet18": (models.resnet18, models.ResNet18_Weights.IMAGENET1K_V1),
+    "mobilenet_v3_small": (models.mobilenet_v3_small, models.MobileNet_V3_Small_Weights.IMAGENET1K_V1),
+}
+assert set(_ARCHITECTURES) == set(MODELS)
+
+
+def weights_path(model_name: str) -> Path:
+    """Location of a model's packaged fp32 weights."""
+    return ASSETS_DIR / f"{model_name}.pth"
+
+
+def weights_url(model_name: str) -> str:
+    """Download URL of a model's fp32 ImageNet weights."""
+    return _ARCHITECTURES[model_name][1].url
+
+
+def _download_weights(path: Path, url: str = models.ResNet18_Weights.IMAGENET1K_V1.url) -> None:
+    """Download model weights into the assets directory."""
+    # Create SSL context with certifi certificates
+    try:
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        ssl._create_default_https_context = lambda: ssl_context
+    except Exception:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    torch.hub.download_url_to_file(url, str(path))
+
+
+def _ensure_weights(path: Path, url: str) -> None:
+    """Make sure a weights asset exists, downloading it only if allowed."""
+    if path.exists():
+        return
+    if not settings.model_allow_download:
+        raise RuntimeError(
+            f"Model weights not found at {path}. Run scripts/fetch_assets.py to download them."
+        )
+    logger.warning(f"Model weights not found, downloading to {path}")
+    try:
+        _download_weights(path, url)
+    except Exception as e:
+        raise RuntimeError(f"Failed to download model weights: {e}") from e
+
+
+def _load_float_model(model_name: str = "resnet18") -> torch.nn.Module:
+    """
+    Load an fp32 model from the packaged weights.
+
+    The weights are memory-mapped rather than read into memory, so worker
+    processes share the page cache instead of each holding a private copy.
+    """
+    if model_name not in _ARCHITECTURES:
+        raise ValueError(f"Unknown model: {model_name}")
+    constructor, _ = _ARCHITECTURES[model_name]
+    path = weights_path(model_name)
+    _ensure_weights(path, weights_url(model_name))
+
+    state_dict = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    model = constructor(weights=None)
+    # assign=True keeps the memory-mapped tensors instead of copying them
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+    return model
+
+
+def _load_static_int8_model() -> torch.nn.Module:
+    """Load torchvision's pre-quantized (fbgemm, static int8) ResNet18."""
+    weights = models.quantization.ResNet18_QuantizedWeights.IMAGENET1K_FBGEMM_V1
+    _ensure_weights(RESNET18_INT8_WEIGHTS_PATH, weights.url)
+
+    torch.backends.quantized.engine = "fbgemm"
+    # quantize=True builds the fused, converted int8 graph; the state dict fills it in
+    model = models.quantization.resnet18(weights=None, quantize=True)
+    model.load_state_dict(torch.load(RESNET18_INT8_WEIGHTS_PATH, map_location="cpu", weights_only=True))
+    model.eval()
+    return model
+
+
+def bf16_supported() -> bool:
+    """Whether this CPU has native bf16 support (AVX512-BF16 / AMX)."""
+    try:
+        return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except Exception:
+        return False
+
+
+def build_model(mode: str = "eager", model_name: str = "resnet18") -> torch.nn.Module:
+    """
+    Build a classifier for the given CPU inference mode.
+
+    Args:
+        mode: One of INFERENCE_MODES:
+            - eager: plain fp32 module
+            - torchscript: traced, frozen TorchScript graph
+            - compile: ``torch.compile`` (compiled lazily on the first forward pass)
+            - dynamic_int8: int8 dynamic quantization of the Linear layers
+            - static_int8: fully int8 model with pre-calibrated torchvision weights
+            - bf16: fp32 weights run under bf16 autocast (see _forward)
+        model_name: One of MODELS
+
+    Returns:
+        Model in eval mode
+    """
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode: {mode}")
+
+    if mode == "static_int8":
+        return _load_static_int8_model()
+
+    model = _load_float_model(model_name)
+
+    if mode == "torchscript":
+        with torch.no_grad():
+            traced = torch.jit.trace(model, torch.zeros(1, 3, 224, 224))
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    if mode == "compile":
+        return torch.compile(model)
+    if mode == "dynamic_int8":
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return model
+
+
+def _resolve_mode(mode: str, model_name: str = "resnet18") -> str:
+    """Fall back to eager when the requested mode can't run on this CPU or model."""
+    if mode == "static_int8" and model_name != "resnet18":
+        # torchvision only ships pre-quantized weights for ResNet18 here
+        logger.warning(f"static_int8 not available for {model_name}, using eager fp32 inference")
+        return "eager"
+    if mode == "bf16" and not bf16_supported():
+        logger.warning("bf16 not supported on this CPU, using eager fp32 inference")
+        return "eager"
+    return mode
+
+
+def _forward(model: torch.nn.Module, batch: torch.Tensor, mode: str) -> torch.Tensor:
+    """Run a forward pass and return fp32 logits."""
+    with torch.no_grad():
+        if mode == "bf16":
+            with torch.autocast("cpu", dtype=torch.bfloat16):
+                return model(batch).float()
+        return model(batch)
+
+
+class TorchBackend(InferenceBackend):
+    """
+    Run a classifier with PyTorch in one of INFERENCE_MODES.
+
+    A mode that can't run here (see _resolve_mode) or fails to build falls
+    back to eager fp32; ``mode`` is the one actually in use.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str = "resnet18", mode: str = "eager", num_threads: int = 0):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        self.model_name = model_name
+        self.requested_mode = mode
+        self.mode = mode
+        self.num_threads = num_threads
+        self._model = None
+
+    def load(self) -> None:
+        if self.num_threads > 0:
+            torch.set_num_threads(self.num_threads)
+        self.mode = _resolve_mode(self.requested_mode, self.model_name)
+        try:
+            self._model = build_model(self.mode, self.model_name)
+        except Exception as e:
+            if self.mode == "eager":
+                raise
+            logger.warning(
+                f"{self.mode} inference failed to load ({e}), using eager fp32 inference"
+            )
+            self.mode = "eager"
+            self._model = build_model(self.mode, self.model_name)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self._model is None:
+            self.load()
+        # from_numpy shares the buffer's memory; no copy into a new tensor
+        return _forward(self._model, torch.from_numpy(batch), self.mode).numpy()
+
+
+def export_onnx(path: Path, opset: int = 17, model_name: str = "resnet18") -> None:
+    """
+    Export an fp32 model to ONNX with a dynamic batch dimension.
+
+    Args:
+        path: Destination ``.onnx`` file
+        opset: ONNX opset version
+        model_name: One of MODELS
+    """
+    model = _load_float_model(model_name)
+    dummy = torch.zeros(1, 3, CROP_SIZE, CROP_SIZE)
+
+    kwargs = {}
+    # Newer torch defaults to the dynamo exporter, which needs extra packages
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    torch.onnx.export(
+        model,
+        dummy,
+        str(path),
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+        **kwargs,
+    )
@@ -0,0 +1,153 @@
+"""In-memory LRU cache with TTL and optional SQLite persistence."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a fixed TTL.
+
+    When ``sqlite_path`` is set, entries are also written to a SQLite table so
+    they survive restarts; a memory miss falls through to SQLite and promotes
+    the entry back into memory. Values must be JSON-serializable. SQLite access
+    is synchronous: a local-file lookup by primary key takes well under a
+    millisecond, which is cheaper than handing it to a thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        sqlite_path: str = "",
+        namespace: str = "cache",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._clock = clock
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if sqlite_path:
+            self._open_db(sqlite_path)
+
+    def _open_db(self, path: str) -> None:
+        """Open (and create if needed) the persistence table."""
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (self._clock(),))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            value = self._get_from_db(key, now)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._store_in_memory(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                        (self.namespace, key, json.dumps(value), expires_at),
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist cache entry: {e}")
+
+    def _store_in_memory(self, key: str, value: Any, expires_at: float) -> None:
+        """Insert into the LRU map and trim it to max_entries."""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _get_from_db(self, key: str, now: float) -> Optional[Any]:
+        """Look up an unexpired entry in SQLite and promote it into memory."""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM cache_entries "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, now),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read cache entry: {e}")
+            return None
+        if row is None:
+            return None
+
+        value = json.loads(row[0])
+        self._store_in_memory(key, value, row[1])
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries from memory and SQLite."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmark for image classification.
+
+Times each stage of classify_images separately (decode, preprocess, forward
+pass, top-k/labeling) on synthetic JPEGs of Telegram photo sizes, across batch
+sizes, thread counts and inference modes. Every configuration runs in a fresh
+process so peak RSS is measured per configuration.
+
+Usage:
+    python -m benchmarks.bench_classify [--batch-sizes 1,8,16] [--threads 1,4]
+        [--modes eager,static_int8,onnx] [--output results.json] [--compare old.json]
+
+Modes are torch INFERENCE_MODE values, plus "onnx" for the ONNX Runtime
+backend. Results are written as JSON tagged with the git commit so runs can
+be compared across commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Settings require a bot token, which isn't needed here
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "")
+
+STAGES = ("decode", "preprocess", "forward", "topk")
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99 of a list of millisecond samples."""
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def run_config(mode: str, threads: int, batch_size: int, iterations: int, warmup: int) -> dict:
+    """Benchmark one configuration. Runs inside a dedicated subprocess."""
+    import numpy as np
+
+    from app.utils import classify
+    from app.utils.backends import create_backend
+    from benchmarks.synthetic import TELEGRAM_PHOTO_SIZES, synthetic_images
+
+    if mode == "onnx":
+        backend = create_backend("onnx", num_threads=threads)
+    else:
+        backend = create_backend("torch", mode=mode, num_threads=threads)
+    backend.load()
+    classify._load_imagenet_classes()
+
+    images = synthetic_images(batch_size * 4, sizes=TELEGRAM_PHOTO_SIZES, seed=1)
+    buffer = np.empty((batch_size, 3, classify.CROP_SIZE, classify.CROP_SIZE), dtype=np.float32)
+
+    stage_ms: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    batch_ms: list[float] = []
+    total_images = 0
+    total_seconds = 0.0
+
+    for i in range(warmup + iterations):
+        start = i * batch_size % len(images)
+        batch = (images + images)[start : start + batch_size]
+
+        t0 = time.perf_counter()
+        decoded = [classify._decode(data) for data in batch]
+        # draft() only takes effect once pixels are loaded
+        for image in decoded:
+            image.load()
+        t1 = time.perf_counter()
+        for row, image in enumerate(decoded):
+            classify._normalize_into(image, buffer[row])
+        t2 = time.perf_counter()
+        logits = backend.predict(buffer)
+        t3 = time.perf_counter()
+        probabilities = classify._softmax(logits)
+        for row in range(batch_size):
+            classify._top_k(probabilities[row], 3)
+        t4 = time.perf_counter()
+
+        if i < warmup:
+            continue
+
+        spans = ((t0, t1), (t1, t2), (t2, t3), (t3, t4))
+        for stage, (begin, end) in zip(STAGES, spans, strict=True):
+            stage_ms[stage].append((end - begin) * 1000)
+        batch_ms.append((t4 - t0) * 1000)
+        total_images += batch_size
+        total_seconds += t4 - t0
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "mode": mode,
+        "threads": threads,
+        "batch_size": batch_size,
+        "iterations": iterations,
+        "images_per_sec": round(total_images / total_seconds, 2),
+        "batch_latency_ms": _percentiles(batch_ms),
+        "per_image_latency_ms": _percentiles([ms / batch_size for ms in batch_ms]),
+        "stages_ms": {stage: _percentiles(samples) for stage, samples in stage_ms.items()},
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+def _git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _compare(results: list[dict], baseline_path: Path) -> None:
+    """Print throughput changes against a previous results file."""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {
+        (r["mode"], r["threads"], r["batch_size"]): r
+        for r in baseline["results"]
+        if "error" not in r
+    }
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit', '?')}):")
+    for r in results:
+        key = (r["mode"], r["threads"], r["batch_size"])
+        if "error" in r or key not in previous:
+            continue
+        before = previous[key]["images_per_sec"]
+        change = (r["images_per_sec"] - before) / before * 100
+        print(f"  {r['mode']:<13} t={r['threads']:<3} b={r['batch_size']:<4} {change:+6.1f}% img/s")
+
+
+def _parse_ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,4,8,16", help="Comma-separated batch sizes")
+    parser.add_argument("--threads", default="1,2,4", help="Comma-separated thread counts")
+    parser.add_argument("--modes", default="eager", help="Torch modes and/or 'onnx'")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed batches per config")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed batches per config")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous results file to diff against")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    configs = [
+        (mode.strip(), threads, batch_size)
+        for mode in args.modes.split(",")
+        for threads in _parse_ints(args.threads)
+        for batch_size in _parse_ints(args.batch_sizes)
+    ]
+
+    results = []
+    print(f"{'mode':<13}{'threads':>8}{'batch':>7}{'img/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'decode':>8}{'prep':>7}{'fwd':>8}{'topk':>7}{'RSS MB':>8}")
+
+    for mode, threads, batch_size in configs:
+        # Fresh process per config: isolates peak RSS and thread-pool settings
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            try:
+                r = pool.submit(
+                    run_config, mode, threads, batch_size, args.iterations, args.warmup
+                ).result()
+            except Exception as e:
+                results.append({"mode": mode, "threads": threads, "batch_size": batch_size, "error": str(e)})
+                print(f"{mode:<13}{threads:>8}{batch_size:>7}  error: {e}")
+                continue
+
+        results.append(r)
+        lat, st = r["per_image_latency_ms"], r["stages_ms"]
+        print(
+            f"{mode:<13}{threads:>8}{batch_size:>7}{r['images_per_sec']:>9.1f}"
+            f"{lat['p50']:>9.2f}{lat['p95']:>9.2f}{lat['p99']:>9.2f}"
+            f"{st['decode']['p50']:>8.2f}{st['preprocess']['p50']:>7.2f}"
+            f"{st['forward']['p50']:>8.2f}{st['topk']['p50']:>7.2f}{r['peak_rss_mb']:>8.0f}"
+        )
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or ROOT / "benchmarks" / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
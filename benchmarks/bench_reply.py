@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for rendering the image classification reply.
+
+Compares the per-reply cost of the original inline formatting (escape,
+title-casing, description lookups and tier branching for every prediction)
+with the renderer that pre-renders per-class fragments.
+
+Usage:
+    python -m benchmarks.bench_reply [--replies 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from html import escape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings require a bot token, which isn't needed here
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "")
+
+from app.utils.classify import ClassificationResult  # noqa: E402
+from app.utils.image_descriptions import get_category_description, get_image_description  # noqa: E402
+from app.utils.image_reply import ReplyRenderer  # noqa: E402
+from app.utils.labels import NUM_CLASSES, load_imagenet_classes  # noqa: E402
+
+
+def render_baseline(result: ClassificationResult) -> str:
+    """The reply formatting as it was done inline in handle_image_message."""
+    predictions = result.predictions
+    top_label, top_confidence = predictions[0]
+    main_description = get_image_description(top_label, top_confidence)
+    category_desc = get_category_description(top_label)
+
+    response_parts = [
+        "🖼️ <b>Image Recognition Analysis</b>\n",
+        f"📸 {category_desc.lower()}.\n",
+        f"🎯 <b>Primary Identification:</b>\n{main_description}\n",
+        "\n📊 <b>Detailed Predictions:</b>\n",
+    ]
+    for i, (label, confidence) in enumerate(predictions, 1):
+        confidence_percent = confidence * 100
+        escaped_label = escape(label.replace("_", " ").title())
+        description = get_image_description(label, confidence)
+        emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
+        if confidence_percent > 80:
+            conf_level = "Very High"
+        elif confidence_percent > 50:
+            conf_level = "High"
+        elif confidence_percent > 30:
+            conf_level = "Medium"
+        else:
+            conf_level = "Low"
+        response_parts.append(
+            f"{emoji} <b>{i}.</b> {escaped_label}\n"
+            f"   {description}\n"
+            f"   Confidence: {confidence_percent:.1f}% ({conf_level})\n"
+        )
+    response_parts.append(f"🧠 <i>Model: {escape('ResNet18')}</i>")
+    return "\n".join(response_parts)
+
+
+def sample_results(count: int, seed: int = 0) -> list[ClassificationResult]:
+    """Random top-3 results over all classes with descending confidences."""
+    rng = random.Random(seed)
+    classes = load_imagenet_classes()
+    results = []
+    for _ in range(count):
+        indices = rng.sample(range(NUM_CLASSES), 3)
+        confidences = sorted((rng.random() for _ in indices), reverse=True)
+        results.append(
+            ClassificationResult(
+                [(classes[i], c) for i, c in zip(indices, confidences, strict=True)],
+                class_indices=indices,
+            )
+        )
+    return results
+
+
+def _time_per_reply(render, results: list[ClassificationResult]) -> float:
+    """Mean microseconds per rendered reply."""
+    start = time.perf_counter()
+    for result in results:
+        render(result)
+    return (time.perf_counter() - start) / len(results) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--replies", type=int, default=20000, help="Replies rendered per variant")
+    args = parser.parse_args()
+
+    results = sample_results(args.replies)
+
+    start = time.perf_counter()
+    renderer = ReplyRenderer()
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    # Warm both paths (description tables, word index) before timing
+    render_baseline(results[0])
+    renderer.render(results[0])
+
+    before = _time_per_reply(render_baseline, results)
+    after = _time_per_reply(renderer.render, results)
+    print(f"{'renderer setup':<22}{setup_ms:8.2f} ms (once per process)")
+    print(f"{'before (inline)':<22}{before:8.2f} us/reply")
+    print(f"{'after (pre-rendered)':<22}{after:8.2f} us/reply ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
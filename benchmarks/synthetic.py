@@ -0,0 +1,42 @@
+"""Reproducible synthetic test images."""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+# Sizes Telegram generates for a typical 4:3 phone photo
+TELEGRAM_PHOTO_SIZES = [(320, 240), (800, 600), (1280, 960)]
+
+
+def synthetic_jpeg(width: int, height: int, rng: np.random.Generator, quality: int = 87) -> bytes:
+    """Encode a JPEG with smooth color gradients plus sensor-like noise."""
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+    colors = rng.random((2, 3), dtype=np.float32)
+    pixels = (y * colors[0] + x * colors[1]) * 160 + rng.normal(0, 24, (height, width, 3))
+
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(
+        buffer, format="JPEG", quality=quality
+    )
+    return buffer.getvalue()
+
+
+def synthetic_images(
+    count: int, sizes: list[tuple[int, int]] | None = None, seed: int = 0
+) -> list[bytes]:
+    """
+    Generate ``count`` JPEGs, cycling through ``sizes``.
+
+    With no sizes given, each image gets a random size between 480 and 1280px.
+    """
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        if sizes:
+            width, height = sizes[i % len(sizes)]
+        else:
+            width, height = (int(v) for v in rng.integers(480, 1280, size=2))
+        images.append(synthetic_jpeg(width, height, rng))
+    return images
@@ -12,6 +12,15 @@ import sys
 
 from app.bot import create_bot_application
 from app.config import settings
+from app.utils.cache import classification_cache
+from app.utils.events import flush_deferred_events
+from app.utils.http import http_clients
+from app.utils.image_reply import get_reply_renderer
+from app.utils.inference import get_image_batcher, inference_engine
+from app.utils.llm import analysis_cache
+from app.utils.llm_endpoints import llm_endpoints
+from app.utils.local_analysis import get_sentiment_batcher, warmup_local_analysis
+from app.utils.tokens import load_tokenizer
 
 # Configure logging
 logging.basicConfig(
@@ -51,6 +60,22 @@ async def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
+        # Pre-render reply fragments, start inference workers and warm the model
+        get_reply_renderer()
+        http_clients.start(
+            *(e.api_base for e in llm_endpoints.endpoints), settings.n8n_webhook_url
+        )
+        try:
+            await inference_engine.warmup()
+        except Exception as e:
+            logger.error(f"Model warmup failed, image classification unavailable: {e}")
+        await asyncio.to_thread(load_tokenizer)
+        if settings.text_analysis_policy != "llm":
+            try:
+                await warmup_local_analysis()
+            except Exception as e:
+                logger.error(f"Local sentiment model failed to load: {e}")
+
         # Start the bot
         async with application:
             await application.start()
@@ -77,6 +102,13 @@ async def main():
             await application.shutdown()
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
+        await flush_deferred_events()
+        await get_image_batcher().close()
+        await get_sentiment_batcher().close()
+        await inference_engine.shutdown()
+        await http_clients.close()
+        classification_cache.close()
+        analysis_cache.close()
         logger.info("Bot stopped. Goodbye!")
 
 
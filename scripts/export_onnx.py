@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Export packaged model weights to ONNX for the onnx inference backend.
+
+Usage:
+    python scripts/export_onnx.py [--model resnet18] [--output PATH] [--opset 17]
+
+Afterwards set INFERENCE_BACKEND=onnx (with CASCADE_ENABLED, export
+mobilenet_v3_small as well). The script checks that ONNX Runtime
+reproduces the PyTorch logits before reporting success.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings require a bot token, which isn't needed here
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "")
+
+import numpy as np  # noqa: E402
+
+from app.utils.backends import MODELS  # noqa: E402
+from app.utils.onnx_backend import OnnxBackend, onnx_path  # noqa: E402
+from app.utils.torch_backend import TorchBackend, export_onnx  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--model", choices=MODELS, default="resnet18", help="Model to export")
+    parser.add_argument("--output", type=Path, help="Destination file (default: app/assets/<model>.onnx)")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    args = parser.parse_args()
+    output = args.output or onnx_path(args.model)
+
+    export_onnx(output, opset=args.opset, model_name=args.model)
+    print(f"Exported {output} ({output.stat().st_size / 1e6:.1f} MB)")
+
+    # Sanity check: both runtimes must agree on a random batch
+    batch = np.random.default_rng(0).standard_normal((4, 3, 224, 224)).astype(np.float32)
+    expected = TorchBackend(model_name=args.model).predict(batch)
+    actual = OnnxBackend(model_path=output).predict(batch)
+    max_diff = float(np.abs(expected - actual).max())
+    print(f"Max logit difference vs PyTorch: {max_diff:.2e}")
+    if max_diff > 1e-3:
+        sys.exit("ONNX output does not match PyTorch")
+
+
+if __name__ == "__main__":
+    main()
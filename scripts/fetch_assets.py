@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Download model weights into app/assets so the bot can run offline.
+
+Run this once at build time (the Dockerfile does) so the first image after a
+deploy doesn't wait on a download, and an offline container fails loudly
+instead of classifying with random weights. It also writes the per-class
+description and category tables.
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings require a bot token, which isn't available at image build time
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "")
+
+from torchvision import models  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.utils.backends import MODELS  # noqa: E402
+from app.utils.class_tables import CLASS_TABLES_PATH, build_class_tables, save_class_tables  # noqa: E402
+from app.utils.labels import load_imagenet_classes  # noqa: E402
+from app.utils.torch_backend import (  # noqa: E402
+    RESNET18_INT8_WEIGHTS_PATH,
+    _download_weights,
+    weights_path,
+    weights_url,
+)
+
+logging.basicConfig(format="%(levelname)s - %(message)s", level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fetch_tokenizer() -> None:
+    """Cache LLM_TOKENIZER so LLM prompts are counted exactly offline."""
+    if not settings.llm_tokenizer:
+        return
+    from transformers import AutoTokenizer
+
+    logger.info(f"Fetching tokenizer {settings.llm_tokenizer}")
+    AutoTokenizer.from_pretrained(settings.llm_tokenizer)
+
+
+def fetch_sentiment_model() -> None:
+    """Cache LOCAL_SENTIMENT_MODEL so the local text tier loads it offline."""
+    if settings.text_analysis_policy == "llm":
+        # The local tier only runs under the local and local_first policies
+        return
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    name = settings.local_sentiment_model
+    logger.info(f"Fetching local sentiment model {name}")
+    AutoTokenizer.from_pretrained(name)
+    AutoModelForSequenceClassification.from_pretrained(name)
+
+
+def main() -> None:
+    """Fetch missing assets and validate the ones already present."""
+    # Labels are committed to the repository; just make sure they are intact
+    load_imagenet_classes()
+
+    weights = [(weights_path(name), weights_url(name)) for name in MODELS]
+    weights += [
+        # Pre-quantized weights for INFERENCE_MODE=static_int8
+        (
+            RESNET18_INT8_WEIGHTS_PATH,
+            models.quantization.ResNet18_QuantizedWeights.IMAGENET1K_FBGEMM_V1.url,
+        ),
+    ]
+
+    for path, url in weights:
+        if path.exists():
+            logger.info(f"Weights already present: {path}")
+        else:
+            logger.info(f"Downloading {url} to {path}")
+            _download_weights(path, url)
+
+    save_class_tables(build_class_tables())
+    logger.info(f"Wrote class tables to {CLASS_TABLES_PATH}")
+
+    # Hugging Face models go to the Hugging Face cache, which from_pretrained
+    # reads with local_files_only once MODEL_ALLOW_DOWNLOAD=false
+    fetch_tokenizer()
+    fetch_sentiment_model()
+
+
+if __name__ == "__main__":
+    main()
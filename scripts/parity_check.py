@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare CPU inference modes against eager fp32 ResNet18.
+
+For every mode this reports top-1 and top-3 agreement with fp32 on a fixed
+image set, plus mean batch latency, so the fastest mode that stays accurate
+can be chosen for INFERENCE_MODE.
+
+Usage:
+    python scripts/parity_check.py [--images DIR] [--modes eager,static_int8,...]
+
+Without --images a seeded synthetic image set is used, which is reproducible
+but less representative than real photos.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings require a bot token, which isn't needed here
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "")
+
+import numpy as np  # noqa: E402
+import torch  # noqa: E402
+
+from app.utils.classify import _preprocess  # noqa: E402
+from app.utils.torch_backend import (  # noqa: E402
+    INFERENCE_MODES,
+    _forward,
+    _resolve_mode,
+    build_model,
+)
+from benchmarks.synthetic import synthetic_images  # noqa: E402
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def load_images(directory: Path) -> list[bytes]:
+    """Read every image file in a directory, sorted by name."""
+    return [
+        path.read_bytes()
+        for path in sorted(directory.iterdir())
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    ]
+
+
+def run_mode(mode: str, batch: torch.Tensor, repeats: int) -> tuple[torch.Tensor, float]:
+    """Return the top-3 class indices per image and mean latency in ms."""
+    model = build_model(mode)
+    logits = _forward(model, batch, mode)  # also warms up / compiles
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        _forward(model, batch, mode)
+    latency_ms = (time.perf_counter() - start) / repeats * 1000
+
+    return torch.topk(logits, 3, dim=1).indices, latency_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--images", type=Path, help="Directory of images (default: synthetic)")
+    parser.add_argument("--count", type=int, default=32, help="Synthetic image count")
+    parser.add_argument("--modes", default=",".join(INFERENCE_MODES), help="Comma-separated modes")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed passes per mode")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    images = load_images(args.images) if args.images else synthetic_images(args.count)
+    if not images:
+        sys.exit("No images found")
+    batch = torch.from_numpy(np.stack([_preprocess(image) for image in images]))
+
+    reference, reference_ms = run_mode("eager", batch, args.repeats)
+    report = []
+
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        if _resolve_mode(mode) != mode:
+            report.append({"mode": mode, "skipped": "not supported on this CPU"})
+            continue
+        try:
+            if mode == "eager":
+                top3, latency_ms = reference, reference_ms
+            else:
+                top3, latency_ms = run_mode(mode, batch, args.repeats)
+        except Exception as e:
+            report.append({"mode": mode, "skipped": str(e)})
+            continue
+
+        top1_agree = (top3[:, 0] == reference[:, 0]).float().mean().item()
+        top3_agree = sum(
+            set(row.tolist()) == set(ref.tolist()) for row, ref in zip(top3, reference, strict=True)
+        ) / len(images)
+        report.append(
+            {
+                "mode": mode,
+                "top1_agreement": round(top1_agree, 4),
+                "top3_agreement": round(top3_agree, 4),
+                "batch_latency_ms": round(latency_ms, 2),
+                "speedup_vs_fp32": round(reference_ms / latency_ms, 2),
+            }
+        )
+
+    print(f"{len(images)} images, batch size {len(images)}\n")
+    print(f"{'mode':<14}{'top-1':>8}{'top-3':>8}{'ms/batch':>11}{'speedup':>9}")
+    for row in report:
+        if "skipped" in row:
+            print(f"{row['mode']:<14}  skipped: {row['skipped']}")
+        else:
+            print(
+                f"{row['mode']:<14}{row['top1_agreement']:>8.1%}{row['top3_agreement']:>8.1%}"
+                f"{row['batch_latency_ms']:>11.1f}{row['speedup_vs_fp32']:>8.2f}x"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps({"images": len(images), "modes": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Tests for the inference micro-batcher."""
+
+import asyncio
+
+import pytest
+
+from app.utils.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    """Test that concurrent submissions are processed in a single batch."""
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    await batcher.close()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_capped():
+    """Test that batches never exceed max_batch_size."""
+    batches = []
+
+    async def process(items):
+        batches.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20)
+    await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+    await batcher.close()
+
+    assert max(batches) <= 4
+    assert sum(batches) == 10
+
+
+@pytest.mark.asyncio
+async def test_per_item_errors_only_fail_their_caller():
+    """Test that an exception result is raised only to its own caller."""
+
+    async def process(items):
+        return [ValueError("bad") if item == "bad" else item for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=10)
+    results = await asyncio.gather(
+        batcher.submit("ok"), batcher.submit("bad"), return_exceptions=True
+    )
+    await batcher.close()
+
+    assert results[0] == "ok"
+    assert isinstance(results[1], ValueError)
@@ -0,0 +1,30 @@
+"""Tests for the classification result cache."""
+
+from app.utils.cache import ClassificationCache
+from app.utils.classify import ClassificationResult
+from app.utils.phash import is_distinctive_hash
+
+RESULT = ClassificationResult([("tabby", 0.9)], model="resnet18", class_indices=[281])
+
+
+def test_result_round_trips_through_both_tiers():
+    """Test that a result stored under both keys comes back from either."""
+    cache = ClassificationCache()
+    cache.set(RESULT, file_unique_id="file-1", phash="a5c3f00f3c5a0ff0")
+
+    for cached in (cache.get_by_file_id("file-1"), cache.get_by_phash("a5c3f00f3c5a0ff0")):
+        assert cached.predictions == [("tabby", 0.9)]
+        assert cached.model == "resnet18"
+        assert cached.class_indices == [281]
+
+
+def test_low_detail_hashes_skip_the_perceptual_tier():
+    """Test that flat images don't share one cached classification."""
+    cache = ClassificationCache()
+    for phash in ("0000000000000000", "ffffffffffffffff", "0000000000000101"):
+        assert not is_distinctive_hash(phash)
+        cache.set(RESULT, file_unique_id=f"file-{phash}", phash=phash)
+
+        assert cache.get_by_phash(phash) is None
+        assert cache.get_by_file_id(f"file-{phash}") is not None
+    assert cache.stats()["perceptual_hash"]["entries"] == 0
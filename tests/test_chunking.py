@@ -0,0 +1,36 @@
+"""Tests for splitting long texts into chunks."""
+
+from app.utils.chunking import split_into_chunks
+from app.utils.tokens import estimate_tokens
+
+
+def test_short_text_is_one_chunk():
+    """Test that a text within the budget is not split."""
+    assert split_into_chunks("Hello.\n\nWorld.", 100) == ["Hello.\n\nWorld."]
+
+
+def test_paragraphs_are_packed_without_splitting():
+    """Test that chunks end on paragraph boundaries and stay within the budget."""
+    paragraphs = [f"Paragraph {i}. " + "word " * 40 for i in range(10)]
+    chunks = split_into_chunks("\n\n".join(paragraphs), 120)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 120 for chunk in chunks)
+    assert "\n\n".join(chunks).split("\n\n") == [p.strip() for p in paragraphs]
+
+
+def test_oversized_paragraph_is_split_by_sentences():
+    """Test that a single paragraph over the budget is split at sentence ends."""
+    chunks = split_into_chunks("This is a sentence. " * 100, 50)
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_text_without_boundaries_is_split_by_length():
+    """Test that a text with no breaks at all is cut at a fixed length."""
+    chunks = split_into_chunks("x" * 1000, 50)
+
+    assert "".join(chunks) == "x" * 1000
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
@@ -0,0 +1,88 @@
+"""Tests for upstream circuit breakers."""
+
+import httpx
+import pytest
+
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_upstream_failure,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _fail():
+    raise httpx.ConnectError("down")
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_threshold_and_fails_fast():
+    """Test that consecutive failures open the circuit and later calls are rejected."""
+    circuit = CircuitBreaker("test", failure_threshold=3, recovery_seconds=10, clock=Clock())
+
+    for _ in range(3):
+        with pytest.raises(httpx.ConnectError):
+            await circuit.call(_fail)
+
+    assert circuit.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await circuit.call(_ok)
+    assert circuit.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_or_reopens():
+    """Test that after the interval one probe decides the next state."""
+    clock = Clock()
+    circuit = CircuitBreaker("test", failure_threshold=1, recovery_seconds=10, clock=clock)
+    with pytest.raises(httpx.ConnectError):
+        await circuit.call(_fail)
+
+    clock.now = 10
+    assert circuit.state == HALF_OPEN
+    with pytest.raises(httpx.ConnectError):
+        await circuit.call(_fail)
+    assert circuit.state == OPEN
+
+    clock.now = 20
+    assert await circuit.call(_ok) == "ok"
+    assert circuit.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    """Test that concurrent callers don't all probe a recovering upstream."""
+    clock = Clock()
+    circuit = CircuitBreaker("test", failure_threshold=1, recovery_seconds=5, clock=clock)
+    circuit.record_failure()
+    clock.now = 5
+
+    assert circuit.allow()
+    assert not circuit.allow()
+
+
+@pytest.mark.asyncio
+async def test_request_errors_do_not_trip_the_circuit():
+    """Test that errors that aren't the upstream's fault are not counted."""
+    circuit = CircuitBreaker("test", failure_threshold=1, is_failure=is_upstream_failure)
+    response = httpx.Response(400, request=httpx.Request("POST", "https://llm.example.com"))
+
+    async def bad_request():
+        response.raise_for_status()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await circuit.call(bad_request)
+    assert circuit.state == CLOSED
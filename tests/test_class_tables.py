@@ -0,0 +1,33 @@
+"""Tests for the per-class description and category tables."""
+
+import json
+
+from app.utils.class_tables import _read_artifact, build_class_tables, save_class_tables
+from app.utils.image_descriptions import get_category_description, get_image_description
+from app.utils.labels import load_imagenet_classes
+
+
+def test_tables_match_label_based_lookups():
+    """Test that indexing the tables gives the same text as the label lookups."""
+    tables = build_class_tables()
+    classes = load_imagenet_classes()
+
+    for index, label in enumerate(classes):
+        assert f"I'm very confident this is {tables.descriptions[index]}." == get_image_description(label, 0.95)
+        assert tables.categories[index] == get_category_description(label)
+
+
+def test_artifact_round_trip(tmp_path):
+    """Test that saved tables load back unchanged and stale files are ignored."""
+    tables = build_class_tables()
+    path = tmp_path / "class_tables.json"
+    save_class_tables(tables, path)
+
+    assert _read_artifact(path) == tables
+
+    artifact = json.loads(path.read_text())
+    artifact["fingerprint"] = "stale"
+    path.write_text(json.dumps(artifact))
+    assert _read_artifact(path) is None
+    assert _read_artifact(tmp_path / "missing.json") is None
+
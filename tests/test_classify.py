@@ -0,0 +1,101 @@
+"""Tests for the classification cascade."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.utils import classify
+from app.utils.backends import InferenceBackend
+from app.utils.labels import NUM_CLASSES
+
+
+class FakeBackend(InferenceBackend):
+    """Backend returning fixed logits per row, recording batch sizes."""
+
+    def __init__(self, logits: list[np.ndarray]):
+        self.logits = logits
+        self.batch_sizes = []
+
+    def load(self) -> None:
+        pass
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        self.batch_sizes.append(len(batch))
+        return np.stack(self.logits[: len(batch)])
+
+
+def _logits(top_class: int, margin: float) -> np.ndarray:
+    row = np.zeros(NUM_CLASSES, dtype=np.float32)
+    row[top_class] = margin
+    return row
+
+
+@pytest.fixture(autouse=True)
+def skip_decoding():
+    """PIL is mocked in tests; the fake backends ignore pixel values anyway."""
+    with patch("app.utils.classify._preprocess_into"):
+        yield
+
+
+@pytest.fixture
+def cascade_settings():
+    with patch.object(classify.settings, "cascade_enabled", True), \
+        patch.object(classify.settings, "cascade_threshold", 0.6):
+        yield
+
+
+def test_cascade_escalates_only_low_confidence_images(cascade_settings):
+    """Test that confident images are answered by the fast model and the rest by ResNet18."""
+    # Confident on image 0, nearly uniform on image 1
+    fast = FakeBackend([_logits(1, 20.0), _logits(2, 0.1)])
+    main = FakeBackend([_logits(3, 20.0)])
+
+    with patch.dict(classify._backends, {"mobilenet_v3_small": fast, "resnet18": main}, clear=True):
+        results = classify.classify_images([b"image-0", b"image-1"], top_k=1)
+
+    assert [r.model for r in results] == ["mobilenet_v3_small", "resnet18"]
+    assert results[0].predictions[0][0] == classify._load_imagenet_classes()[1]
+    assert results[1].predictions[0][0] == classify._load_imagenet_classes()[3]
+    assert fast.batch_sizes == [2]
+    assert main.batch_sizes == [1]
+
+
+def test_cascade_disabled_uses_resnet18_only():
+    """Test that without the cascade every image goes straight to ResNet18."""
+    main = FakeBackend([_logits(5, 0.1)])
+
+    with patch.object(classify.settings, "cascade_enabled", False), \
+        patch.dict(classify._backends, {"resnet18": main}, clear=True):
+        results = classify.classify_images([b"image"], top_k=3)
+
+    assert results[0].model == "resnet18"
+    assert len(results[0].predictions) == 3
+
+
+class BrokenBackend(FakeBackend):
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        raise RuntimeError("out of memory")
+
+
+def test_escalation_failure_keeps_fast_model_answers(cascade_settings):
+    """Test that a failing ResNet18 only fails the images escalated to it."""
+    fast = FakeBackend([_logits(1, 20.0), _logits(2, 0.1), _logits(4, 20.0)])
+    main = BrokenBackend([])
+
+    with patch.dict(classify._backends, {"mobilenet_v3_small": fast, "resnet18": main}, clear=True):
+        results = classify.classify_images([b"image-0", b"image-1", b"image-2"], top_k=1)
+
+    assert [r.model for r in (results[0], results[2])] == ["mobilenet_v3_small"] * 2
+    assert isinstance(results[1], ValueError)
+    assert "out of memory" in str(results[1])
+
+
+def test_fast_model_failure_fails_every_image(cascade_settings):
+    """Test that without any answer every image gets the fast model's error."""
+    fast = BrokenBackend([])
+
+    with patch.dict(classify._backends, {"mobilenet_v3_small": fast}, clear=True):
+        results = classify.classify_images([b"image-0", b"image-1"], top_k=1)
+
+    assert all(isinstance(result, ValueError) for result in results)
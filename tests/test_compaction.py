@@ -0,0 +1,31 @@
+"""Tests for compacting message text before LLM requests."""
+
+from app.utils.compaction import compact_text
+
+
+def test_whitespace_is_collapsed_but_paragraphs_kept():
+    """Test that space runs and extra blank lines are removed."""
+    assert compact_text("Hello   \t world  \n\n\n\nSecond   paragraph ") == (
+        "Hello world\n\nSecond paragraph"
+    )
+
+
+def test_repeated_lines_are_removed():
+    """Test that a line repeated later in the message is kept only once."""
+    assert compact_text("Deploy today\nCheck logs\ndeploy  today\nDone") == (
+        "Deploy today\nCheck logs\nDone"
+    )
+
+
+def test_quoted_reply_chain_is_stripped():
+    """Test that quoted lines, reply headers and original messages are dropped."""
+    text = (
+        "Sounds good, see you at 5.\n"
+        "On Mon, 3 Jun 2024, Alice <alice@example.com> wrote:\n"
+        "> Can we meet at 5?\n"
+        "> > Earlier thread\n"
+        "-----Original Message-----\n"
+        "From: Bob\n"
+        "Old content"
+    )
+    assert compact_text(text) == "Sounds good, see you at 5."
@@ -0,0 +1,95 @@
+"""Tests for per-update deadline budgets."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import deadline as deadlines
+from app.utils.deadline import (
+    DeadlineExceeded,
+    begin_update,
+    current_deadline,
+    end_update,
+    telegram_timeouts,
+    within_deadline,
+)
+from app.utils.metrics import metrics
+
+
+async def _slow(seconds: float) -> str:
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+@pytest.mark.asyncio
+async def test_calls_without_deadline_are_unbounded():
+    """Test that outside an update calls run as is, with library default timeouts."""
+    assert await within_deadline(_slow(0)) == "done"
+    assert telegram_timeouts() == {}
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_cancelled_when_budget_runs_out():
+    """Test that a call is stopped at the deadline and the update counted once."""
+    exceeded = metrics.counter("update_deadline_exceeded")
+    begin_update(1, budget=0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        await within_deadline(_slow(1))
+    # Later calls fail immediately without starting
+    with pytest.raises(DeadlineExceeded):
+        await within_deadline(_slow(1))
+    end_update()
+
+    assert metrics.counter("update_deadline_exceeded") == exceeded + 1
+    assert current_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_own_timeouts_are_not_deadline_errors():
+    """Test that a TimeoutError raised by the call itself is passed through."""
+
+    async def times_out():
+        raise TimeoutError("upstream")
+
+    begin_update(2, budget=10)
+    with pytest.raises(TimeoutError) as error:
+        await within_deadline(times_out())
+    assert not isinstance(error.value, DeadlineExceeded)
+    assert not current_deadline().exceeded
+
+
+@pytest.mark.asyncio
+async def test_begin_update_keeps_the_deadline_of_the_same_update():
+    """Test that a running deadline is kept for its update and replaced for the next."""
+    first = begin_update(3, budget=10)
+    assert begin_update(3, budget=99) is first
+    assert begin_update(4, budget=10) is not first
+
+
+@pytest.mark.asyncio
+async def test_telegram_timeouts_follow_the_remaining_budget():
+    """Test that Bot API calls get the time left, but at least a minimum for replies."""
+    begin_update(5, budget=30)
+    assert 29 < telegram_timeouts()["read_timeout"] <= 30
+
+    begin_update(6, budget=0)
+    assert telegram_timeouts()["read_timeout"] == deadlines.MIN_REPLY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_events_after_the_deadline_are_deferred():
+    """Test that n8n delivery is skipped after the deadline without tripping the circuit."""
+    from app.utils import events
+    from app.utils.circuit_breaker import CircuitBreaker
+
+    circuit = CircuitBreaker("n8n", failure_threshold=1)
+    with patch("app.utils.events.n8n_circuit", circuit), \
+        patch.object(events, "_deferred", events.deque(maxlen=10)), \
+        patch.object(events.settings, "n8n_webhook_url", "https://n8n.example.com/hook"):
+        begin_update(7, budget=0)
+        assert await events.log_event("text_message", {}) is False
+
+        assert events.deferred_event_count() == 1
+        assert circuit.state == "closed"
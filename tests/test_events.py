@@ -0,0 +1,51 @@
+"""Tests for n8n event delivery."""
+
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.utils import events
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.http import HTTPClientManager
+
+
+@pytest.fixture
+def n8n():
+    """Stub n8n webhook; set ``n8n.status`` to control its answer."""
+
+    class Webhook:
+        status = 200
+        received: list[str] = []
+
+        def handle(self, request: httpx.Request) -> httpx.Response:
+            if self.status == 200:
+                self.received.append(json.loads(request.content)["event_type"])
+            return httpx.Response(self.status)
+
+    webhook = Webhook()
+    webhook.received = []
+    manager = HTTPClientManager(transport=httpx.MockTransport(webhook.handle))
+    with patch("app.utils.events.http_clients", manager), \
+        patch("app.utils.events.n8n_circuit", CircuitBreaker("n8n", failure_threshold=2)), \
+        patch.object(events, "_deferred", events.deque(maxlen=10)), \
+        patch.object(events.settings, "n8n_webhook_url", "https://n8n.example.com/hook"):
+        yield webhook
+
+
+@pytest.mark.asyncio
+async def test_events_are_deferred_while_n8n_is_down(n8n):
+    """Test that failed and circuit-rejected events are held and delivered later in order."""
+    n8n.status = 503
+    for i in range(4):
+        assert await events.log_event(f"event_{i}", {}) is False
+
+    assert events.n8n_circuit.state == "open"
+    assert events.deferred_event_count() == 4
+
+    n8n.status = 200
+    events.n8n_circuit.record_success()
+    assert await events.flush_deferred_events() == 4
+    assert n8n.received == ["event_0", "event_1", "event_2", "event_3"]
+    assert events.deferred_event_count() == 0
@@ -0,0 +1,51 @@
+"""Tests for the shared HTTP client manager."""
+
+import httpx
+import pytest
+
+from app.utils.http import HTTPClientManager
+
+
+def _stub_transport() -> httpx.MockTransport:
+    return httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_upstream():
+    """Test that URLs on the same origin share one pooled client."""
+    manager = HTTPClientManager(transport=_stub_transport())
+
+    llm = manager.client_for("https://llm.example.com/api/v1")
+    assert manager.client_for("https://llm.example.com/other") is llm
+    assert manager.client_for("https://n8n.example.com/webhook") is not llm
+
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_per_upstream():
+    """Test that requests show up in the per-upstream stats."""
+    manager = HTTPClientManager(transport=_stub_transport())
+
+    for _ in range(3):
+        response = await manager.client_for("https://llm.example.com").post(
+            "https://llm.example.com/chat/completions", json={}
+        )
+        assert response.json() == {"ok": True}
+
+    stats = manager.stats()["upstreams"]["https://llm.example.com:443"]
+    assert stats["requests"] == 3
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_close_allows_reuse():
+    """Test that clients are recreated after close()."""
+    manager = HTTPClientManager(transport=_stub_transport())
+    client = manager.client_for("https://llm.example.com")
+
+    await manager.close()
+
+    assert client.is_closed
+    assert not manager.client_for("https://llm.example.com").is_closed
+    await manager.close()
@@ -0,0 +1,52 @@
+"""Tests for image description lookup."""
+
+from app.utils.image_descriptions import _get_image_descriptions, get_image_description
+
+
+def _linear_scan_description(label: str):
+    """The original front-to-back word-overlap scan, kept as a reference."""
+    descriptions = _get_image_descriptions()
+    label_lower = label.lower().replace("_", " ")
+    if label_lower in descriptions:
+        return descriptions[label_lower]
+
+    label_words = set(label_lower.split())
+    base_desc = None
+    best_match_score = 0
+    for key, desc in descriptions.items():
+        key_words = set(key.split())
+        overlap = len(label_words & key_words)
+        if overlap > 0 and overlap > best_match_score:
+            if label_lower == key or all(word in key_words for word in label_words):
+                base_desc = desc
+                best_match_score = overlap
+                break
+            elif overlap == len(label_words):
+                base_desc = desc
+                best_match_score = overlap
+    return base_desc
+
+
+def _fuzzy_labels() -> list[str]:
+    """Labels that miss the exact lookup: single words, word subsets, reorderings, unknowns."""
+    labels = ["", "   ", "unknown thing", "Golden_Retriever", "retriever golden", "dog", "sports car"]
+    for key in _get_image_descriptions():
+        words = key.split()
+        labels.extend(words)
+        if len(words) > 1:
+            labels.append(" ".join(reversed(words)))
+            labels.append(" ".join(words[1:]))
+            labels.append(words[0] + " zebra")
+    return labels
+
+
+def test_fuzzy_matching_matches_linear_scan():
+    """Test that the word index picks exactly what the full scan picks."""
+    for label in _fuzzy_labels():
+        expected = _linear_scan_description(label)
+        description = get_image_description(label, 0.95)
+        if expected is None:
+            name = label.replace("_", " ").title()
+            assert description.startswith(f"I'm very confident this is a {name}, "), label
+        else:
+            assert description == f"I'm very confident this is {expected}.", label
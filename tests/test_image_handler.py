@@ -3,7 +3,17 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.handlers.image import handle_image_message
+from app.handlers.image import handle_image_message, select_photo_size
+from app.utils.cache import ClassificationCache
+from app.utils.classify import ClassificationResult
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Give every test an empty classification cache."""
+    cache = ClassificationCache()
+    with patch("app.handlers.image.classification_cache", cache):
+        yield cache
 
 
 @pytest.fixture
@@ -11,7 +21,15 @@ def mock_update():
     """Create a mock Telegram update with photo."""
     update = MagicMock()
     update.message = MagicMock()
-    update.message.photo = [MagicMock(file_id="test_file_id")]
+    update.message.photo = [
+        MagicMock(
+            file_id="test_file_id",
+            file_unique_id="test_unique_id",
+            width=800,
+            height=600,
+            file_size=15,
+        )
+    ]
     update.effective_user = MagicMock(id=123)
     update.effective_chat = MagicMock(id=456)
     update.message.reply_text = AsyncMock(return_value=MagicMock())
@@ -33,9 +51,13 @@ def mock_context():
 @pytest.mark.asyncio
 async def test_handle_image_message_success(mock_update, mock_context):
     """Test successful image classification."""
-    with patch("app.handlers.image.classify_image") as mock_classify, \
+    with patch("app.handlers.image.classify_image_async", new_callable=AsyncMock) as mock_classify, \
         patch("app.handlers.image.log_event", new_callable=AsyncMock) as mock_log:
-        mock_classify.return_value = [("cat", 0.95), ("dog", 0.03), ("bird", 0.02)]
+        mock_classify.return_value = ClassificationResult(
+            [("tiger cat", 0.95), ("golden retriever", 0.03), ("goldfinch", 0.02)],
+            model="mobilenet_v3_small",
+            class_indices=[282, 207, 11],
+        )
 
         await handle_image_message(mock_update, mock_context)
 
@@ -43,6 +65,10 @@ async def test_handle_image_message_success(mock_update, mock_context):
         mock_classify.assert_called_once()
         # Should send processing message
         assert mock_update.message.reply_text.called
+        # Should say which model answered
+        reply = mock_update.message.reply_text.return_value.edit_text.call_args[0][0]
+        assert "MobileNetV3-Small" in reply
+        assert "this is an animal" in reply
         # Should log event
         assert mock_log.called
 
@@ -50,7 +76,7 @@ async def test_handle_image_message_success(mock_update, mock_context):
 @pytest.mark.asyncio
 async def test_handle_image_message_error(mock_update, mock_context):
     """Test image handling with classification error."""
-    with patch("app.handlers.image.classify_image") as mock_classify, \
+    with patch("app.handlers.image.classify_image_async", new_callable=AsyncMock) as mock_classify, \
         patch("app.handlers.image.log_event", new_callable=AsyncMock):
         mock_classify.side_effect = ValueError("Classification failed")
 
@@ -60,3 +86,32 @@ async def test_handle_image_message_error(mock_update, mock_context):
         assert True
 
 
+@pytest.mark.asyncio
+async def test_handle_image_message_cache_hit_skips_download(mock_update, mock_context, fresh_cache):
+    """Test that a cached file_unique_id is answered without downloading."""
+    fresh_cache.set(
+        ClassificationResult([("cat", 0.95), ("dog", 0.03), ("bird", 0.02)]),
+        file_unique_id="test_unique_id",
+    )
+
+    with patch("app.handlers.image.classify_image_async", new_callable=AsyncMock) as mock_classify, \
+        patch("app.handlers.image.log_event", new_callable=AsyncMock):
+        await handle_image_message(mock_update, mock_context)
+
+        mock_context.bot.get_file.assert_not_called()
+        mock_classify.assert_not_called()
+        assert mock_update.message.reply_text.return_value.edit_text.called
+
+
+def test_select_photo_size_prefers_smallest_sufficient_variant():
+    """Test that the smallest variant covering the model input is chosen."""
+    sizes = [
+        MagicMock(width=90, height=68),
+        MagicMock(width=320, height=240),
+        MagicMock(width=800, height=600),
+        MagicMock(width=1280, height=960),
+    ]
+
+    assert select_photo_size(sizes) is sizes[2]
+    # Fall back to the largest when none is big enough
+    assert select_photo_size(sizes[:2]) is sizes[1]
@@ -0,0 +1,19 @@
+"""Tests for the image reply renderer."""
+
+from app.utils.classify import ClassificationResult
+from app.utils.image_reply import ReplyRenderer
+from benchmarks.bench_reply import render_baseline, sample_results
+
+
+def test_renderer_matches_inline_formatting():
+    """Test that pre-rendered fragments produce the same reply as formatting inline."""
+    renderer = ReplyRenderer()
+    for result in sample_results(300):
+        assert renderer.render(result) == render_baseline(result)
+
+
+def test_renderer_handles_results_without_class_indices():
+    """Test that cached results without class indices still render."""
+    result = ClassificationResult([("tiger cat", 0.95), ("tabby", 0.03), ("Egyptian cat", 0.02)])
+
+    assert ReplyRenderer().render(result) == render_baseline(result)
@@ -0,0 +1,71 @@
+"""Tests for the process-pool inference engine."""
+
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import inference
+from app.utils.inference import InferenceEngine
+
+
+def _crash_first_call(images: list[str], top_k: int) -> list[str]:
+    """Worker function that kills its own process unless the marker file exists yet."""
+    marker = Path(images[0])
+    if not marker.exists():
+        marker.touch()
+        os.kill(os.getpid(), signal.SIGKILL)
+    return ["ok"] * len(images)
+
+
+def _always_crash(images: list[str], top_k: int) -> list[str]:
+    """Worker function that always kills its own process."""
+    os.kill(os.getpid(), signal.SIGKILL)
+    return []
+
+
+def _plain_executor(self: InferenceEngine) -> ProcessPoolExecutor:
+    """Worker pool without the model-loading initializer."""
+    return ProcessPoolExecutor(
+        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@pytest.fixture
+def engine():
+    """Inference engine whose workers don't load any model."""
+    engine = InferenceEngine(workers=1)
+    with patch.object(InferenceEngine, "_create_executor", _plain_executor):
+        yield engine
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted_and_batch_retried(engine, tmp_path):
+    """Test that a worker dying mid-batch rebuilds the pool and retries the batch once."""
+    try:
+        with patch.object(inference, "_worker_classify", _crash_first_call):
+            results = await engine.classify_batch([str(tmp_path / "crashed")])
+    finally:
+        await engine.shutdown()
+
+    assert results == ["ok"]
+    assert engine.restarts == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_crashing_twice_fails_the_batch(engine, tmp_path):
+    """Test that a batch that kills the worker again is not retried forever."""
+    try:
+        with patch.object(inference, "_worker_classify", _always_crash), \
+            pytest.raises(RuntimeError, match="crashed twice") as error:
+            await engine.classify_batch([str(tmp_path / "unused")])
+    finally:
+        await engine.shutdown()
+
+    assert isinstance(error.value.__cause__, BrokenProcessPool)
+    assert engine.restarts == 2
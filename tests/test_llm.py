@@ -0,0 +1,520 @@
+"""Tests for LLM text analysis."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.utils import llm
+from app.utils.circuit_breaker import CircuitBreaker, is_upstream_failure
+from app.utils.deadline import begin_update, end_update
+from app.utils.http import HTTPClientManager
+from app.utils.llm_endpoints import EndpointPool, LLMEndpoint
+from app.utils.ttl_cache import TTLCache
+
+ANALYSIS = {"summary": "A short note.", "tasks": ["Buy milk"], "sentiment": "Positive"}
+
+
+def _completion(content: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def upstream():
+    """Stub LLM API; set ``upstream.responses`` or ``upstream.respond`` to control what it returns."""
+
+    class Upstream:
+        calls = 0
+        responses = [_completion(json.dumps(ANALYSIS))]
+        respond = None
+
+        def handle(self, request: httpx.Request) -> httpx.Response:
+            if self.respond is not None:
+                self.calls += 1
+                return self.respond(json.loads(request.content))
+            response = self.responses[min(self.calls, len(self.responses) - 1)]
+            self.calls += 1
+            return response
+
+    stub = Upstream()
+    manager = HTTPClientManager(transport=httpx.MockTransport(stub.handle))
+    with patch("app.utils.llm.http_clients", manager), \
+        patch("app.utils.llm.llm_circuit", CircuitBreaker("llm", is_failure=is_upstream_failure)), \
+        patch("app.utils.llm.analysis_cache", TTLCache()), \
+        patch("app.utils.llm.llm_endpoints", EndpointPool([LLMEndpoint(api_base="https://llm.test/v1")])), \
+        patch.object(llm.settings, "llm_api_key", "test-key"), \
+        patch.object(llm.settings, "llm_tokenizer", ""):
+        yield stub
+
+
+@pytest.mark.asyncio
+async def test_identical_text_is_served_from_cache(upstream):
+    """Test that the same text (up to whitespace) only reaches the LLM once."""
+    first = await llm.analyze_text("Buy  milk\ntomorrow ")
+    second = await llm.analyze_text("Buy milk tomorrow")
+
+    assert first == second == {"summary": "A short note.", "tasks": ["Buy milk"], "sentiment": "positive"}
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_error_fallbacks_are_not_cached(upstream):
+    """Test that a failed analysis is retried on the next call."""
+    upstream.responses = [httpx.Response(500), _completion(json.dumps(ANALYSIS))]
+
+    failed = await llm.analyze_text("Buy milk tomorrow")
+    retried = await llm.analyze_text("Buy milk tomorrow")
+
+    assert failed["summary"] == "LLM API error: 500"
+    assert retried["summary"] == "A short note."
+    assert upstream.calls == 2
+
+
+def test_cache_key_depends_on_model_and_prompt_version():
+    """Test that changing the model or prompt version changes the key."""
+    key = llm.analysis_cache_key("hello", "model-a")
+
+    assert key == llm.analysis_cache_key("  hello ", "model-a")
+    assert key != llm.analysis_cache_key("hello", "model-b")
+    with patch.object(llm, "PROMPT_VERSION", "999"):
+        assert key != llm.analysis_cache_key("hello", "model-a")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced(upstream):
+    """Test that simultaneous analyses of the same text make one upstream call."""
+    results = await asyncio.gather(*(llm.analyze_text("Buy milk tomorrow") for _ in range(4)))
+
+    assert all(result == results[0] for result in results)
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_completion_reports_partial_summary(upstream):
+    """Test that a streamed analysis reports the summary while it is generated."""
+    content = json.dumps(ANALYSIS)
+    events = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': content[i : i + 7]}}]})}\n\n"
+        for i in range(0, len(content), 7)
+    )
+    upstream.responses = [httpx.Response(200, text=": keep-alive\n\n" + events + "data: [DONE]\n\n")]
+    partials = []
+
+    async def on_partial(partial):
+        partials.append(partial)
+
+    with patch.object(llm.settings, "llm_streaming", True):
+        result = await llm.analyze_text("Buy milk tomorrow", on_partial=on_partial)
+
+    assert result == {"summary": "A short note.", "tasks": ["Buy milk"], "sentiment": "positive"}
+    summaries = [p["summary"] for p in partials if "summary" in p]
+    assert summaries[0] != "A short note."
+    assert summaries[-1] == "A short note."
+
+
+def _chunk_answer(payload: dict) -> httpx.Response:
+    """Answer each chunk prompt according to the part it covers."""
+    prompt = payload["messages"][-1]["content"]
+    if "summaries of consecutive parts" in prompt:
+        return _completion(json.dumps({"summary": "Whole message.", "sentiment": "negative"}))
+    if "part 1 of" in prompt:
+        answer = {"summary": "First part.", "tasks": ["Buy milk", "Call Bob"], "sentiment": "positive"}
+    elif "part 2 of" in prompt:
+        answer = {"summary": "Second part.", "tasks": ["buy  milk!", "Pay rent"], "sentiment": "positive"}
+    else:
+        answer = {"summary": "Last part.", "tasks": [], "sentiment": "neutral"}
+    return _completion(json.dumps(answer))
+
+
+@pytest.mark.asyncio
+async def test_long_text_is_analyzed_in_chunks_and_merged(upstream):
+    """Test that a text above the threshold is split and the chunk results merged."""
+    upstream.respond = _chunk_answer
+    text = "\n\n".join(["a" * 400, "b" * 400, "c" * 100])
+
+    with patch.object(llm.settings, "llm_chunk_threshold_tokens", 100), \
+        patch.object(llm.settings, "llm_chunk_max_tokens", 100):
+        result = await llm.analyze_text(text)
+
+    assert upstream.calls == 3
+    assert result == {
+        "summary": "First part. Second part. Last part.",
+        "tasks": ["Buy milk", "Call Bob", "Pay rent"],
+        "sentiment": "positive",
+    }
+
+
+@pytest.mark.asyncio
+async def test_chunked_analysis_reduce_merge(upstream):
+    """Test that the reduce merge asks the LLM for the overall summary and sentiment."""
+    upstream.respond = _chunk_answer
+    text = "\n\n".join(["a" * 400, "b" * 400])
+
+    with patch.object(llm.settings, "llm_chunk_threshold_tokens", 100), \
+        patch.object(llm.settings, "llm_chunk_max_tokens", 100), \
+        patch.object(llm.settings, "llm_chunk_merge", "reduce"):
+        result = await llm.analyze_text(text)
+
+    assert upstream.calls == 3
+    assert result["summary"] == "Whole message."
+    assert result["sentiment"] == "negative"
+    assert result["tasks"] == ["Buy milk", "Call Bob", "Pay rent"]
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_fails_the_whole_analysis(upstream):
+    """Test that one failing chunk gives the error fallback, which isn't cached."""
+    upstream.respond = lambda payload: (
+        httpx.Response(400) if "part 2 of" in payload["messages"][-1]["content"] else _chunk_answer(payload)
+    )
+    text = "\n\n".join(["a" * 400, "b" * 400])
+
+    with patch.object(llm.settings, "llm_chunk_threshold_tokens", 100), \
+        patch.object(llm.settings, "llm_chunk_max_tokens", 100):
+        result = await llm.analyze_text(text)
+        upstream.respond = _chunk_answer
+        retried = await llm.analyze_text(text)
+
+    assert result["summary"] == "LLM API error: 400"
+    assert retried["summary"] == "First part. Second part."
+
+
+@pytest.mark.asyncio
+async def test_chunks_fit_the_fast_model(upstream):
+    """Test that chunks are sized under the route threshold even with a larger chunk budget."""
+    models = []
+
+    def respond(payload):
+        models.append(payload["model"])
+        return _chunk_answer(payload)
+
+    upstream.respond = respond
+    text = "\n\n".join(["a" * 400, "b" * 400, "c" * 100])
+
+    with patch.object(llm.settings, "llm_chunk_threshold_tokens", 100), \
+        patch.object(llm.settings, "llm_chunk_max_tokens", 1000), \
+        patch.object(llm.settings, "llm_route_threshold_tokens", 100), \
+        patch.object(llm.settings, "llm_fast_model", "fast"), \
+        patch.object(llm.settings, "llm_long_context_model", "long"):
+        await llm.analyze_text(text)
+
+    assert models == ["fast"] * 3
+
+
+def test_merge_sentiment_weights_chunks_by_length():
+    """Test that longer chunks count more and ties are neutral."""
+    assert llm._merge_sentiment(["positive", "negative"], [100, 300]) == "negative"
+    assert llm._merge_sentiment(["positive", "negative"], [200, 200]) == "neutral"
+    assert llm._merge_sentiment(["unknown"], [10]) == "neutral"
+
+
+@pytest.mark.asyncio
+async def test_local_policy_makes_no_llm_calls(upstream):
+    """Test that the local policy answers without the LLM API."""
+    with patch.object(llm.settings, "text_analysis_policy", "local"), \
+        patch("app.utils.local_analysis._classify_sentiments", return_value=["negative"]):
+        result = await llm.analyze_text("The build is broken again. Fix the build before noon.")
+
+    assert upstream.calls == 0
+    assert result == {
+        "summary": "The build is broken again. Fix the build before noon.",
+        "tasks": ["Fix the build before noon"],
+        "sentiment": "negative",
+    }
+
+
+@pytest.mark.asyncio
+async def test_local_first_policy_uses_llm_only_for_the_summary(upstream):
+    """Test that local_first takes the summary from a summary-only LLM prompt."""
+    prompts = []
+
+    def respond(payload):
+        prompts.append(payload["messages"][-1]["content"])
+        return _completion(json.dumps({"summary": "LLM summary."}))
+
+    upstream.respond = respond
+    with patch.object(llm.settings, "text_analysis_policy", "local_first"), \
+        patch("app.utils.local_analysis._classify_sentiments", return_value=["positive"]):
+        result = await llm.analyze_text("Great news! Book the venue.")
+
+    assert prompts[0].startswith("Summarize the following text message")
+    assert result == {"summary": "LLM summary.", "tasks": ["Book the venue"], "sentiment": "positive"}
+
+
+@pytest.mark.asyncio
+async def test_local_first_falls_back_to_lead_summary(upstream):
+    """Test that local_first keeps the local summary when the LLM fails."""
+    upstream.responses = [httpx.Response(400)]
+    with patch.object(llm.settings, "text_analysis_policy", "local_first"), \
+        patch("app.utils.local_analysis._classify_sentiments", return_value=["neutral"]):
+        result = await llm.analyze_text("Meeting moved to Monday. Bring the reports.")
+
+    assert result["summary"] == "Meeting moved to Monday. Bring the reports."
+    assert result["tasks"] == ["Bring the reports"]
+
+
+@pytest.mark.asyncio
+async def test_router_picks_model_by_length_and_sets_max_tokens(upstream):
+    """Test that short and long texts go to different models with an output budget."""
+    payloads = []
+
+    def respond(payload):
+        payloads.append(payload)
+        return _completion(json.dumps(ANALYSIS))
+
+    upstream.respond = respond
+    with patch.object(llm.settings, "llm_fast_model", "fast-model"), \
+        patch.object(llm.settings, "llm_long_context_model", "long-model"), \
+        patch.object(llm.settings, "llm_route_threshold_tokens", 100):
+        await llm.analyze_text("Short note about lunch.")
+        await llm.analyze_text("word " * 200)
+
+    assert [p["model"] for p in payloads] == ["fast-model", "long-model"]
+    assert all(p["max_tokens"] == llm.ANALYSIS_MAX_TOKENS for p in payloads)
+
+
+@pytest.mark.asyncio
+async def test_prompt_is_compacted_before_sending(upstream):
+    """Test that quoted replies and repeated lines never reach the LLM."""
+    prompts = []
+
+    def respond(payload):
+        prompts.append(payload["messages"][-1]["content"])
+        return _completion(json.dumps(ANALYSIS))
+
+    upstream.respond = respond
+    await llm.analyze_text("Ship it   today.\nShip it today.\n> quoted secret\nThanks")
+
+    assert "Text: Ship it today.\nThanks\n" in prompts[0]
+    assert "quoted secret" not in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_open_llm_circuit_answers_locally(upstream):
+    """Test that once the LLM API is down, analyses fail fast to the local tier."""
+    upstream.responses = [httpx.Response(500)]
+    for _ in range(llm.llm_circuit.failure_threshold):
+        await llm.analyze_text("Deploy the fix. It broke again.")
+    calls = upstream.calls
+
+    with patch("app.utils.local_analysis._model", object()), \
+        patch("app.utils.local_analysis._classify_sentiments", return_value=["negative"]):
+        result = await llm.analyze_text("Deploy the fix. It broke again.")
+
+    assert upstream.calls == calls
+    assert llm.llm_circuit.state == "open"
+    assert result == {
+        "summary": "Deploy the fix. It broke again.",
+        "tasks": ["Deploy the fix"],
+        "sentiment": "negative",
+    }
+
+
+@pytest.mark.asyncio
+async def test_open_llm_circuit_does_not_load_the_local_model(upstream):
+    """Test that the circuit fallback uses rules only while the sentiment model isn't loaded."""
+    upstream.responses = [httpx.Response(500)]
+    for _ in range(llm.llm_circuit.failure_threshold):
+        await llm.analyze_text("Deploy the fix. It broke again.")
+
+    with patch("app.utils.local_analysis._model", None), \
+        patch("app.utils.local_analysis._load_sentiment_model") as load:
+        result = await llm.analyze_text("Deploy the fix. It broke again.")
+
+    load.assert_not_called()
+    assert result["tasks"] == ["Deploy the fix"]
+    assert result["sentiment"] == "neutral"
+
+
+@pytest.mark.asyncio
+async def test_requests_schema_constrained_output(upstream):
+    """Test that the request carries a strict JSON schema of the requested fields."""
+    payloads = []
+
+    def respond(payload):
+        payloads.append(payload)
+        return _completion(json.dumps(ANALYSIS))
+
+    upstream.respond = respond
+    await llm.analyze_text("Buy milk tomorrow")
+
+    response_format = payloads[0]["response_format"]
+    assert response_format["type"] == "json_schema"
+    schema = response_format["json_schema"]["schema"]
+    assert schema["required"] == ["summary", "tasks", "sentiment"]
+    assert schema["additionalProperties"] is False
+
+
+@pytest.mark.asyncio
+async def test_fenced_answer_with_trailing_text_needs_no_repair(upstream):
+    """Test that a fenced answer followed by commentary is parsed from one call."""
+    content = f"Here you go:\n```json\n{json.dumps(ANALYSIS)}\n```\nLet me know!"
+    upstream.responses = [_completion(content)]
+
+    result = await llm.analyze_text("Buy milk tomorrow")
+
+    assert result == {"summary": "A short note.", "tasks": ["Buy milk"], "sentiment": "positive"}
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_answer_is_repaired_for_missing_fields_only(upstream):
+    """Test that only the fields lost to truncation are asked for again."""
+    payloads = []
+
+    def respond(payload):
+        payloads.append(payload)
+        if len(payloads) == 1:
+            return _completion('{"summary": "A short note.", "tasks": ["Buy milk", "Call B')
+        return _completion('{"tasks": ["Buy milk", "Call Bob"], "sentiment": "negative"}')
+
+    upstream.respond = respond
+    result = await llm.analyze_text("Buy milk and call Bob")
+
+    assert result == {
+        "summary": "A short note.",
+        "tasks": ["Buy milk", "Call Bob"],
+        "sentiment": "negative",
+    }
+    repair = payloads[1]
+    assert repair["response_format"]["json_schema"]["schema"]["required"] == ["tasks", "sentiment"]
+    assert repair["max_tokens"] < llm.ANALYSIS_MAX_TOKENS
+
+
+@pytest.mark.asyncio
+async def test_failed_repair_keeps_salvaged_fields(upstream):
+    """Test that a cut-off summary is kept when the repair call fails too."""
+    upstream.responses = [
+        _completion('{"summary": "The team agreed to ship on Fri'),
+        _completion("I can't do that."),
+    ]
+
+    result = await llm.analyze_text("Ship on Friday")
+
+    assert result == {"summary": "The team agreed to ship on Fri…", "tasks": [], "sentiment": "neutral"}
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_response_format_is_downgraded(upstream):
+    """Test that an endpoint rejecting JSON schemas falls back to JSON mode and stays there."""
+    formats = []
+
+    def respond(payload):
+        response_format = payload.get("response_format", {}).get("type")
+        formats.append(response_format)
+        if response_format == "json_schema":
+            return httpx.Response(400, json={"error": "response_format not supported"})
+        return _completion(json.dumps(ANALYSIS))
+
+    upstream.respond = respond
+    first = await llm.analyze_text("Buy milk tomorrow")
+    await llm.analyze_text("Buy bread tomorrow")
+
+    assert first["summary"] == "A short note."
+    assert formats == ["json_schema", "json_object", "json_object"]
+    assert llm.llm_endpoints.endpoints[0].response_format == "json_object"
+
+
+@pytest.mark.asyncio
+async def test_unrelated_bad_request_keeps_response_format(upstream):
+    """Test that a 400 that isn't about the response format is neither retried nor remembered."""
+    upstream.responses = [httpx.Response(400, json={"error": "maximum context length exceeded"})]
+
+    result = await llm.analyze_text("Buy milk tomorrow")
+
+    assert result["summary"] == "LLM API error: 400"
+    assert upstream.calls == 1
+    assert llm.llm_endpoints.endpoints[0].response_format == ""
+
+
+@pytest.mark.asyncio
+async def test_degraded_answer_is_not_cached(upstream):
+    """Test that an analysis with salvaged or defaulted fields is asked for again next time."""
+    truncated = _completion('{"summary": "A short note.", "tasks": ["Buy milk", "b')
+
+    def respond(payload):
+        if "previous answer was cut off" in payload["messages"][-1]["content"]:
+            return httpx.Response(500)
+        return truncated
+
+    upstream.respond = respond
+    with patch.object(llm.llm_scheduler, "max_retries", 0):
+        first = await llm.analyze_text("Buy milk and bread")
+        calls = upstream.calls
+        await llm.analyze_text("Buy milk and bread")
+
+    assert first == {"summary": "A short note.", "tasks": ["Buy milk", "b"], "sentiment": "neutral"}
+    assert upstream.calls == calls * 2
+
+
+@pytest.mark.asyncio
+async def test_repair_cut_short_by_deadline_keeps_recovered_fields(upstream):
+    """Test that running out of time during the repair still returns the recovered fields."""
+    upstream.responses = [_completion('{"summary": "A short note.", "tasks": ["Buy milk"]')]
+
+    with patch.object(llm, "_repair_prompt", side_effect=llm.DeadlineExceeded()):
+        result = await llm.analyze_text("Buy milk tomorrow")
+
+    assert result == {"summary": "A short note.", "tasks": ["Buy milk"], "sentiment": "neutral"}
+
+
+@pytest.mark.asyncio
+async def test_streamed_partials_are_parsed_at_edit_rate(upstream):
+    """Test that a long stream isn't re-parsed on every delta once the summary is shown."""
+    content = json.dumps({**ANALYSIS, "summary": "word " * 400})
+    events = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': content[i : i + 4]}}]})}\n\n"
+        for i in range(0, len(content), 4)
+    )
+    upstream.responses = [httpx.Response(200, text=events + "data: [DONE]\n\n")]
+    partials = []
+
+    async def on_partial(partial):
+        partials.append(partial)
+
+    with patch.object(llm.settings, "llm_streaming", True), \
+        patch.object(llm.settings, "llm_stream_edit_interval_seconds", 60.0):
+        await llm.analyze_text("Buy milk tomorrow", on_partial=on_partial)
+
+    # Every delta up to the first summary text, then only the final state
+    assert len(partials) < 10
+    assert partials[-1]["summary"] == "word " * 400
+
+
+@pytest.mark.asyncio
+async def test_partials_stop_when_the_caller_gives_up(upstream):
+    """Test that a stream outliving its caller's deadline no longer reports to it."""
+    content = json.dumps(ANALYSIS)
+    streamed = asyncio.Event()
+
+    async def slow_stream():
+        for i, size in ((0, 20), (20, len(content))):
+            delta = {"choices": [{"delta": {"content": content[i : i + size]}}]}
+            yield f"data: {json.dumps(delta)}\n\n".encode()
+            await asyncio.sleep(0.2)
+        streamed.set()
+        yield b"data: [DONE]\n\n"
+
+    upstream.respond = lambda payload: httpx.Response(200, content=slow_stream())
+    partials = []
+
+    async def on_partial(partial):
+        partials.append(partial)
+
+    with patch.object(llm.settings, "llm_streaming", True), \
+        patch.object(llm.settings, "llm_stream_edit_interval_seconds", 0.0):
+        begin_update(1, budget=0.1)
+        try:
+            result = await llm.analyze_text("Buy milk tomorrow", on_partial=on_partial)
+        finally:
+            end_update()
+        reported = len(partials)
+        await asyncio.wait_for(streamed.wait(), 2)
+        await asyncio.sleep(0.05)
+
+    assert result["summary"] == "Analysis took too long, please try again."
+    assert reported == 1
+    assert len(partials) == reported
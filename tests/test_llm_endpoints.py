@@ -0,0 +1,149 @@
+"""Tests for hedged requests and failover across LLM endpoints."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.http import HTTPClientManager
+from app.utils.llm_endpoints import MIN_HEDGE_SAMPLES, EndpointPool, LLMEndpoint
+
+
+class StubServers:
+    """Local stub LLM servers by host: each has a delay and a status code."""
+
+    def __init__(self, **servers: tuple[float, int]):
+        self.servers = servers
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+        self.clients = HTTPClientManager(transport=httpx.MockTransport(self.handle))
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        delay, status = self.servers[host]
+        self.started.append(host)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(host)
+            raise
+        return httpx.Response(status, json={"host": host})
+
+    async def request(self, endpoint: LLMEndpoint) -> str:
+        url = f"{endpoint.api_base}/chat/completions"
+        response = await self.clients.client_for(url).post(url, json={})
+        response.raise_for_status()
+        return response.json()["host"]
+
+
+def _endpoint(host: str, p95: float = 0.0) -> LLMEndpoint:
+    endpoint = LLMEndpoint(api_base=f"http://{host}/v1")
+    for _ in range(MIN_HEDGE_SAMPLES if p95 else 0):
+        endpoint.record_success(p95)
+    return endpoint
+
+
+def test_ranked_prefers_fast_healthy_endpoints():
+    """Test that endpoints are ordered by health, then EWMA latency."""
+    slow, fast, broken = _endpoint("slow", 0.5), _endpoint("fast", 0.1), _endpoint("broken", 0.01)
+    for _ in range(5):
+        broken.record_error(now=0.0)
+
+    pool = EndpointPool([slow, broken, fast], clock=lambda: 1.0)
+
+    assert pool.ranked() == [fast, slow, broken]
+    # After a quiet period the broken endpoint gets another chance
+    assert EndpointPool([slow, broken], clock=lambda: 60.0).ranked()[0] is broken
+
+
+@pytest.mark.asyncio
+async def test_slow_endpoint_is_hedged_and_loser_cancelled():
+    """Test that a request slower than the p95 is raced against the next endpoint."""
+    servers = StubServers(primary=(1.0, 200), backup=(0.05, 200))
+    pool = EndpointPool([_endpoint("primary", p95=0.02), _endpoint("backup", p95=0.05)])
+
+    assert await pool.call(servers.request) == "backup"
+    assert servers.started == ["primary", "backup"]
+    assert servers.cancelled == ["primary"]
+    assert pool.hedged == pool.hedge_wins == 1
+    # The cancelled request isn't an error, but it raises the primary's estimate
+    assert pool.endpoints[0].errors == 0
+    assert pool.endpoints[0].latency_ewma > 0.02
+
+
+@pytest.mark.asyncio
+async def test_losing_hedges_demote_a_slow_primary():
+    """Test that an endpoint that keeps losing hedge races stops being ranked first."""
+    servers = StubServers(primary=(1.0, 200), backup=(0.03, 200))
+    primary, backup = _endpoint("primary", p95=0.02), _endpoint("backup", p95=0.05)
+    pool = EndpointPool([primary, backup])
+
+    for _ in range(20):
+        if pool.ranked()[0] is backup:
+            break
+        assert await pool.call(servers.request) == "backup"
+
+    assert pool.ranked()[0] is backup
+
+
+@pytest.mark.asyncio
+async def test_fast_answer_is_not_hedged():
+    """Test that no duplicate is sent when the first endpoint answers in time."""
+    servers = StubServers(primary=(0.0, 200), backup=(0.0, 200))
+    pool = EndpointPool([_endpoint("primary", p95=0.5), _endpoint("backup", p95=0.5)])
+
+    assert await pool.call(servers.request) == "primary"
+    assert servers.started == ["primary"]
+    assert pool.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_fails_over():
+    """Test that a 5xx moves the request to the next endpoint and raises its error rate."""
+    servers = StubServers(primary=(0.0, 503), backup=(0.0, 200))
+    pool = EndpointPool([_endpoint("primary"), _endpoint("backup")], hedging=False)
+
+    assert await pool.call(servers.request) == "backup"
+    assert pool.failovers == 1
+    assert pool.endpoints[0].error_rate > 0
+
+
+@pytest.mark.asyncio
+async def test_request_errors_are_not_failed_over():
+    """Test that a 400 (the request's fault) is raised without trying other endpoints."""
+    servers = StubServers(primary=(0.0, 400), backup=(0.0, 200))
+    pool = EndpointPool([_endpoint("primary"), _endpoint("backup")])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await pool.call(servers.request)
+    assert servers.started == ["primary"]
+    assert pool.endpoints[0].error_rate == 0
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_failing_raises_last_error():
+    """Test that the last endpoint's error is raised once every endpoint failed."""
+    servers = StubServers(primary=(0.0, 502), backup=(0.0, 503))
+    pool = EndpointPool([_endpoint("primary"), _endpoint("backup")])
+
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        await pool.call(servers.request)
+    assert error.value.response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_hedge_needs_spare_capacity():
+    """Test that no duplicate is sent without a free slot, and a hedge's slot is released."""
+    servers = StubServers(primary=(0.1, 200), backup=(0.0, 200))
+    endpoints = [_endpoint("primary", p95=0.02), _endpoint("backup", p95=0.05)]
+    pool = EndpointPool(endpoints)
+
+    assert await pool.call(servers.request, reserve_hedge=lambda: None) == "primary"
+    assert servers.started == ["primary"]
+    assert pool.hedged == 0
+    assert pool.hedges_skipped == 1
+
+    released = []
+    assert await pool.call(servers.request, reserve_hedge=lambda: lambda: released.append(1)) == "backup"
+    assert pool.hedged == 1
+    assert released == [1]
@@ -0,0 +1,140 @@
+"""Tests for the LLM request scheduler."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.llm_scheduler import (
+    PRIORITY_GROUP,
+    PRIORITY_PRIVATE,
+    LLMScheduler,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _status_error(status: int, headers: dict | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://llm.example.com/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+def test_token_bucket_reservations_wait_for_refill():
+    """Test that overdrawing the bucket returns the time until it refills."""
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    clock.now = 2.0
+    assert bucket.reserve(1) == 0
+    assert TokenBucket(per_minute=0, clock=clock).reserve(10**6) == 0
+
+
+def test_retry_after_header_parsing():
+    """Test Retry-After in seconds, as a date, and missing."""
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"})) == 3.0
+    assert retry_after_seconds(
+        httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    ) == 0.0
+    assert retry_after_seconds(httpx.Response(429)) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_serves_private_chats_first():
+    """Test that queued private-chat requests go ahead of earlier group requests."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await release.wait()
+
+    def call(name):
+        async def run():
+            order.append(name)
+
+        return run
+
+    first = asyncio.create_task(scheduler.run(blocker))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(scheduler.run(call("group"), priority=PRIORITY_GROUP)),
+        asyncio.create_task(scheduler.run(call("private"), priority=PRIORITY_PRIVATE)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == 2
+
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert order == ["private", "group"]
+    assert scheduler.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_calls_are_retried_after_retry_after():
+    """Test that a 429 is retried after Retry-After and other errors are not."""
+    scheduler = LLMScheduler(max_retries=2, backoff_base_seconds=0)
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise _status_error(429, {"Retry-After": "0"})
+        return "ok"
+
+    async def bad_request():
+        raise _status_error(400)
+
+    assert await scheduler.run(flaky) == "ok"
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.run(bad_request)
+
+    assert attempts == 2
+    assert scheduler.stats()["rate_limited"] == 1
+    assert scheduler.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_give_up_after_max_retries():
+    """Test that the last error is raised once retries are exhausted."""
+    scheduler = LLMScheduler(max_retries=1, backoff_base_seconds=0)
+
+    async def unavailable():
+        raise _status_error(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.run(unavailable)
+    assert scheduler.retries == 1
+
+
+def test_try_reserve_only_uses_spare_capacity():
+    """Test that extra requests never exceed the concurrency cap or the token budget."""
+    clock = FakeClock()
+    scheduler = LLMScheduler(max_concurrency=2, tokens_per_minute=1000, clock=clock)
+
+    release = scheduler.try_reserve(tokens=600)
+    assert release is not None
+    assert scheduler.stats()["active"] == 1
+    # Slot free, but the token budget can't cover another 600 yet
+    assert scheduler.try_reserve(tokens=600) is None
+
+    second = scheduler.try_reserve(tokens=100)
+    assert second is not None
+    # Every slot taken
+    assert scheduler.try_reserve(tokens=1) is None
+
+    release()
+    second()
+    assert scheduler.stats()["active"] == 0
@@ -0,0 +1,98 @@
+"""Tests for the local text analysis tier."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils import local_analysis
+from app.utils.local_analysis import analyze_locally, extract_tasks, lead_summary
+
+MESSAGE = """Hi team! Great work last week.
+- [ ] Update the roadmap
+- [x] Ship v1
+TODO: book the venue
+Please send me the slides by Friday. Also don't forget to pay the invoice.
+1. Review PR 42
+Buy milk
+buy milk
+"""
+
+
+def test_extract_tasks_finds_checkboxes_todos_and_imperatives():
+    """Test the rule-based task extractor on a mixed message."""
+    assert extract_tasks(MESSAGE) == [
+        "Update the roadmap",
+        "Book the venue",
+        "Send me the slides by Friday",
+        "Pay the invoice",
+        "Review PR 42",
+        "Buy milk",
+    ]
+
+
+def test_extract_tasks_ignores_plain_prose():
+    """Test that statements without instructions give no tasks."""
+    assert extract_tasks("The weather was lovely. We walked to the lake and back.") == []
+
+
+def test_lead_summary_is_first_sentences():
+    """Test that the extractive summary keeps the first two sentences."""
+    assert lead_summary("One.  Two!\nThree? Four.") == "One. Two!"
+    assert len(lead_summary("word " * 200)) <= local_analysis.SUMMARY_MAX_CHARS
+
+
+def test_binary_classifier_low_confidence_is_neutral():
+    """Test the mapping of classifier labels to sentiments."""
+    assert local_analysis._to_sentiment("POSITIVE", 0.99) == "positive"
+    assert local_analysis._to_sentiment("NEGATIVE", 0.6) == "neutral"
+    assert local_analysis._to_sentiment("LABEL_3", 0.99) == "neutral"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_messages_share_one_sentiment_batch():
+    """Test that concurrent local analyses are classified in a single batch."""
+    with patch.object(
+        local_analysis, "_classify_sentiments", side_effect=lambda texts: ["positive"] * len(texts)
+    ) as classify:
+        results = await asyncio.gather(*(analyze_locally(f"Message {i}.") for i in range(5)))
+
+    assert classify.call_count == 1
+    assert [r["sentiment"] for r in results] == ["positive"] * 5
+    assert results[0]["summary"] == "Message 0."
+
+
+@pytest.mark.asyncio
+async def test_classifier_failure_falls_back_to_neutral():
+    """Test that a broken sentiment model doesn't fail the analysis."""
+    with patch.object(local_analysis, "_classify_sentiments", side_effect=RuntimeError("no model")):
+        result = await analyze_locally("Buy milk.")
+
+    assert result == {"summary": "Buy milk.", "tasks": ["Buy milk"], "sentiment": "neutral"}
+
+
+def test_failed_model_load_is_retried_with_backoff():
+    """Test that a failed load isn't retried for every batch, but is once the backoff passes."""
+    import transformers
+
+    now = [0.0]
+    loaded = MagicMock()
+    attempts = [OSError("offline")] * 2 + [loaded]
+    model_class = transformers.AutoModelForSequenceClassification
+    with patch.object(local_analysis, "_model", None), \
+        patch.object(local_analysis, "_load_failures", 0), \
+        patch.object(local_analysis, "_retry_at", 0.0), \
+        patch.object(local_analysis.time, "monotonic", lambda: now[0]), \
+        patch.object(model_class, "from_pretrained", return_value=loaded), \
+        patch.object(transformers.AutoTokenizer, "from_pretrained", side_effect=attempts) as load:
+        for at in (0, 10, 31, 60):
+            now[0] = at
+            with pytest.raises(RuntimeError):
+                local_analysis._load_sentiment_model()
+        # The second failure doubled the wait: 31 + 60
+        assert load.call_count == 2
+        now[0] = 91
+        assert local_analysis._load_sentiment_model() == (loaded, loaded)
+        assert local_analysis._load_failures == 0
+
+    assert load.call_count == 3
@@ -0,0 +1,33 @@
+"""Tests for the FastAPI endpoints."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app import main
+from app.utils.inference import InferenceEngine
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_model_warmup():
+    """Test that /ready answers 503 until warmup has finished, while /health is always OK."""
+    engine = InferenceEngine(workers=1)
+    transport = httpx.ASGITransport(app=main.app)
+
+    with patch.object(main, "inference_engine", engine), \
+        patch.object(InferenceEngine, "_create_executor", lambda self: ThreadPoolExecutor(1)), \
+        patch("app.utils.inference._worker_warmup", lambda: None):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+            before = await client.get("/ready")
+            health = await client.get("/health")
+            await engine.warmup()
+            after = await client.get("/ready")
+        await engine.shutdown()
+
+    assert before.status_code == 503
+    assert before.json()["status"] == "not ready"
+    assert health.status_code == 200
+    assert after.status_code == 200
+    assert after.json() == {"status": "ready"}
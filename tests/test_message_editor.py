@@ -0,0 +1,86 @@
+"""Tests for throttled progressive message edits."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.message_editor import ThrottledEditor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_updates_are_throttled_but_final_edit_is_sent():
+    """Test that updates within the interval are dropped and finish() always edits."""
+    message = MagicMock(edit_text=AsyncMock())
+    clock = FakeClock()
+    editor = ThrottledEditor(message, min_interval=1.0, clock=clock)
+
+    assert await editor.update("a")
+    clock.now = 0.5
+    assert not await editor.update("ab")
+    clock.now = 1.2
+    assert await editor.update("abc")
+    assert not await editor.update("abc")
+    await editor.finish("final", parse_mode="Markdown")
+
+    texts = [call.args[0] for call in message.edit_text.call_args_list]
+    assert texts == ["a", "abc", "final"]
+
+
+@pytest.mark.asyncio
+async def test_finish_skips_unchanged_text():
+    """Test that finishing with the text already shown doesn't edit again."""
+    message = MagicMock(edit_text=AsyncMock())
+    editor = ThrottledEditor(message, min_interval=1.0, clock=FakeClock())
+
+    await editor.update("same")
+    await editor.finish("same")
+
+    assert message.edit_text.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_updates_after_finish_are_ignored():
+    """Test that a late partial can't overwrite the final text."""
+    message = MagicMock(edit_text=AsyncMock())
+    editor = ThrottledEditor(message, min_interval=0.0, clock=FakeClock())
+
+    await editor.finish("final")
+
+    assert not await editor.update("late partial")
+    assert [call.args[0] for call in message.edit_text.call_args_list] == ["final"]
+
+
+@pytest.mark.asyncio
+async def test_finish_cancels_progress_edit_in_flight():
+    """Test that finishing cancels a progress edit that hasn't completed yet."""
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def edit_text(text, **kwargs):
+        if text == "partial":
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    message = MagicMock(edit_text=AsyncMock(side_effect=edit_text))
+    editor = ThrottledEditor(message, min_interval=1.0, clock=FakeClock())
+
+    update = asyncio.create_task(editor.update("partial"))
+    await started.wait()
+    await editor.finish("final")
+
+    assert not await update
+    assert cancelled.is_set()
+    assert editor.edits == 1
@@ -0,0 +1,174 @@
+"""Tests for the ONNX Runtime backend and the ONNX export.
+
+onnxruntime is optional and torch is mocked in tests, so ONNX Runtime is
+replaced by a fake session that records how it was created and called.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.utils import onnx_backend, torch_backend
+from app.utils.backends import create_backend
+from app.utils.onnx_backend import OnnxBackend, onnx_path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class FakeSession:
+    """Stands in for onnxruntime.InferenceSession: logits are the per-image pixel sums."""
+
+    created: list["FakeSession"] = []
+
+    def __init__(self, path, options, providers):
+        self.path = path
+        self.options = options
+        self.providers = providers
+        self.feeds: list[dict] = []
+        FakeSession.created.append(self)
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input")]
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        batch = feeds["input"]
+        return [np.repeat(batch.reshape(len(batch), -1).sum(axis=1, keepdims=True), 1000, axis=1)]
+
+
+@pytest.fixture
+def fake_ort():
+    FakeSession.created = []
+    ort = SimpleNamespace(
+        InferenceSession=FakeSession,
+        SessionOptions=lambda: SimpleNamespace(),
+        GraphOptimizationLevel=SimpleNamespace(ORT_ENABLE_ALL="all"),
+    )
+    with patch.dict(sys.modules, {"onnxruntime": ort}):
+        yield ort
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "resnet18.onnx"
+    path.write_bytes(b"graph")
+    return path
+
+
+def test_session_is_created_on_cpu_with_thread_limit(fake_ort, model_file):
+    """Test that loading opens the graph on the CPU provider with the configured threads."""
+    backend = OnnxBackend(model_path=model_file, num_threads=2)
+    backend.load()
+
+    session = FakeSession.created[0]
+    assert session.path == str(model_file)
+    assert session.providers == ["CPUExecutionProvider"]
+    assert session.options.intra_op_num_threads == 2
+    assert session.options.graph_optimization_level == "all"
+
+
+def test_predict_feeds_the_named_input_and_keeps_the_batch_axis(fake_ort, model_file):
+    """Test that any batch size goes through the graph input and comes back row for row."""
+    backend = OnnxBackend(model_path=model_file)
+
+    for size in (1, 3):
+        batch = np.arange(size, dtype=np.float32)[:, None, None, None] * np.ones(
+            (size, 3, 224, 224), dtype=np.float32
+        )
+        logits = backend.predict(batch)
+
+        assert logits.shape == (size, 1000)
+        assert list(logits[:, 0]) == [i * 3 * 224 * 224 for i in range(size)]
+
+    # Loaded lazily, once
+    assert len(FakeSession.created) == 1
+    assert list(FakeSession.created[0].feeds[0]) == ["input"]
+
+
+def test_load_errors_are_explained(fake_ort, tmp_path, model_file):
+    """Test that a missing graph or a missing onnxruntime raise a RuntimeError saying what to do."""
+    with pytest.raises(RuntimeError, match="export_onnx.py"):
+        OnnxBackend(model_path=tmp_path / "missing.onnx").load()
+
+    with patch.dict(sys.modules, {"onnxruntime": None}), \
+        pytest.raises(RuntimeError, match="onnxruntime is not installed"):
+        OnnxBackend(model_path=model_file).load()
+
+
+def test_create_backend_selects_onnx_graph_per_model():
+    """Test that the onnx backend is chosen by name and finds each model's graph."""
+    main = create_backend("onnx", "resnet18", num_threads=3)
+    fast = create_backend("onnx", "mobilenet_v3_small")
+
+    assert isinstance(main, OnnxBackend) and main.num_threads == 3
+    assert main.model_path == onnx_path("resnet18")
+    assert fast.model_path.name == "mobilenet_v3_small.onnx"
+    with patch.object(onnx_backend.settings, "onnx_model_path", "/models/custom.onnx"):
+        assert create_backend("onnx").model_path == Path("/models/custom.onnx")
+        assert create_backend("onnx", "mobilenet_v3_small").model_path == fast.model_path
+    with pytest.raises(ValueError):
+        create_backend("tensorrt")
+
+
+def test_export_names_the_graph_and_makes_the_batch_dynamic(tmp_path):
+    """Test that the export names the input and output and leaves the batch axis dynamic."""
+    model = MagicMock()
+    with patch.object(torch_backend, "_load_float_model", return_value=model) as load, \
+        patch.object(torch_backend.torch.onnx, "export") as export:
+        torch_backend.export_onnx(
+            tmp_path / "out" / "graph.onnx", opset=13, model_name="mobilenet_v3_small"
+        )
+
+    load.assert_called_once_with("mobilenet_v3_small")
+    args, kwargs = export.call_args
+    assert args[0] is model
+    assert args[2] == str(tmp_path / "out" / "graph.onnx")
+    assert (tmp_path / "out").is_dir()
+    assert kwargs["input_names"] == ["input"]
+    assert kwargs["output_names"] == ["logits"]
+    assert kwargs["dynamic_axes"] == {"input": {0: "batch"}, "logits": {0: "batch"}}
+    assert kwargs["opset_version"] == 13
+
+
+def _load_export_script():
+    path = ROOT / "scripts" / "export_onnx.py"
+    spec = importlib.util.spec_from_file_location("export_onnx", path)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    return script
+
+
+@pytest.mark.parametrize("drift, fails", [(0.0, False), (0.1, True)])
+def test_export_script_checks_parity_with_torch(tmp_path, capsys, drift, fails):
+    """Test that the script exports the chosen model and fails when ONNX disagrees with torch."""
+    script = _load_export_script()
+    output = tmp_path / "graph.onnx"
+
+    def export(path, opset, model_name):
+        path.write_bytes(b"graph")
+
+    logits = np.zeros((4, 1000), dtype=np.float32)
+    torch_model = MagicMock(**{"predict.return_value": logits})
+    onnx_model = MagicMock(**{"predict.return_value": logits + drift})
+    argv = ["export_onnx.py", "--model", "mobilenet_v3_small", "--opset", "13"]
+    argv += ["--output", str(output)]
+    with patch.object(sys, "argv", argv), \
+        patch.object(script, "export_onnx", side_effect=export) as exported, \
+        patch.object(script, "TorchBackend", return_value=torch_model) as torch_cls, \
+        patch.object(script, "OnnxBackend", return_value=onnx_model) as onnx_cls:
+        if fails:
+            with pytest.raises(SystemExit, match="does not match"):
+                script.main()
+        else:
+            script.main()
+
+    exported.assert_called_once_with(output, opset=13, model_name="mobilenet_v3_small")
+    torch_cls.assert_called_once_with(model_name="mobilenet_v3_small")
+    onnx_cls.assert_called_once_with(model_path=output)
+    assert torch_model.predict.call_args.args[0].shape == (4, 3, 224, 224)
+    assert "Max logit difference" in capsys.readouterr().out
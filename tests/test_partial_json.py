@@ -0,0 +1,59 @@
+"""Tests for tolerant parsing of truncated JSON."""
+
+import json
+
+import pytest
+
+from app.utils.partial_json import parse_partial_json, parse_partial_object, recover_object
+
+DOCUMENT = {"summary": "Line one.\nCafé \"two\"", "tasks": ["a", "b c"], "sentiment": "positive", "n": 12.5}
+
+
+def test_every_prefix_parses_to_a_consistent_partial_value():
+    """Test that each prefix yields fields that agree with the full document."""
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    for end in range(len(text) + 1):
+        partial = parse_partial_object(text[:end])
+        for key, value in partial.items():
+            if isinstance(value, str):
+                assert DOCUMENT[key].startswith(value)
+            elif isinstance(value, list):
+                # Only the last item may still be growing
+                for i, item in enumerate(value):
+                    assert DOCUMENT[key][i].startswith(item)
+            else:
+                assert DOCUMENT[key] == value
+    assert parse_partial_object(text) == DOCUMENT
+
+
+def test_partial_values():
+    """Test strings, arrays, escapes and scalars cut off mid-way."""
+    assert parse_partial_json('{"summary": "Hello wor') == {"summary": "Hello wor"}
+    assert parse_partial_json('{"summary": "Tab\\') == {"summary": "Tab"}
+    assert parse_partial_json('{"summary": "caf\\u00') == {"summary": "caf"}
+    assert parse_partial_json('["done", "half') == ["done", "half"]
+    assert parse_partial_json('{"n": 12') == {}
+    assert parse_partial_json('{"ok": tr') == {}
+    assert parse_partial_json("") is None
+
+
+def test_code_fence_and_garbage():
+    """Test that a leading code fence is skipped and invalid JSON gives no fields."""
+    assert parse_partial_object('```json\n{"summary": "Hi"') == {"summary": "Hi"}
+    assert parse_partial_object("no json here") == {}
+    assert parse_partial_object('{"summary" = "x"}') == {}
+    with pytest.raises(ValueError):
+        parse_partial_json("{oops")
+
+
+def test_recover_object_from_broken_completions():
+    """Test that members are salvaged around fences, trailing text and damage."""
+    fenced = '```json\n{"summary": "Hi", "sentiment": "neutral",}\n```\nHope this helps!'
+    assert recover_object(fenced) == ({"summary": "Hi", "sentiment": "neutral"}, {"summary", "sentiment"})
+
+    values, complete = recover_object('{"summary": "Done.", "tasks": ["Call Bob", "Buy mi')
+    assert values == {"summary": "Done.", "tasks": ["Call Bob", "Buy mi"]}
+    assert complete == {"summary"}
+
+    assert recover_object('{"summary": "Ok", sentiment: positive}') == ({"summary": "Ok"}, {"summary"})
+    assert recover_object("Sorry, I can't help with that.") == ({}, set())
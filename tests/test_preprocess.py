@@ -0,0 +1,104 @@
+"""Parity of the fast image preprocessing with the torchvision reference pipeline.
+
+conftest mocks PIL for the rest of the suite, so the comparison runs in a
+fresh interpreter with the real library.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Exit code of the script when real PIL isn't installed
+SKIP = 77
+
+SCRIPT = r'''
+import io
+import json
+import sys
+
+try:
+    import numpy as np
+    from PIL import Image, ImageDraw
+except ImportError:
+    sys.exit(77)
+
+from app.utils import classify
+from app.utils.image_io import CROP_SIZE, RESIZE_SIZE
+
+
+def photo(width=1280, height=960):
+    """A Telegram-sized JPEG with gradients and hard edges."""
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    rgb = np.stack(
+        [x * 200 + y * 40, (1 - x) * 120 + y * 100, y * 220 + 20 * np.sin(x * 12)], axis=-1
+    )
+    image = Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((400, 250, 900, 700), fill=(230, 180, 60))
+    draw.rectangle((100, 600, 350, 900), fill=(40, 90, 160))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+def reference(data):
+    """Full decode, Resize(256), CenterCrop(224), ToTensor and Normalize, as torchvision does."""
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    width, height = image.size
+    if width <= height:
+        size = (RESIZE_SIZE, int(RESIZE_SIZE * height / width))
+    else:
+        size = (int(RESIZE_SIZE * width / height), RESIZE_SIZE)
+    image = image.resize(size, Image.Resampling.BILINEAR)
+    width, height = image.size
+    top = int(round((height - CROP_SIZE) / 2.0))
+    left = int(round((width - CROP_SIZE) / 2.0))
+    image = image.crop((left, top, left + CROP_SIZE, top + CROP_SIZE))
+    pixels = np.asarray(image, dtype=np.float32).transpose(2, 0, 1) / 255.0
+    return (pixels - classify._MEAN[:, None, None]) / classify._STD[:, None, None]
+
+
+data = photo()
+fast = classify._preprocess(data)
+print(json.dumps({
+    "shape": list(fast.shape),
+    "mean_abs_error": float(np.abs(fast - reference(data)).mean()),
+    "bytearray_equal": bool(np.array_equal(classify._preprocess(bytearray(data)), fast)),
+    "memoryview_equal": bool(
+        np.array_equal(classify._preprocess(memoryview(bytearray(data))), fast)
+    ),
+}))
+'''
+
+
+@pytest.fixture(scope="module")
+def parity():
+    """Run the comparison in a subprocess and return its measurements."""
+    env = {**os.environ, "TELEGRAM_BOT_TOKEN": "test", "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode == SKIP:
+        pytest.skip("Pillow and numpy are required for the preprocessing parity check")
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_draft_decode_matches_reference_pipeline(parity):
+    """Test that draft decoding and the LUT normalization stay close to the reference."""
+    assert parity["shape"] == [3, 224, 224]
+    # Normalized units span about 4.5; differences come from draft scaling at hard edges
+    assert parity["mean_abs_error"] < 0.02
+
+
+def test_buffer_types_give_identical_input(parity):
+    """Test that bytearray and memoryview downloads preprocess exactly like bytes."""
+    assert parity["bytearray_equal"]
+    assert parity["memoryview_equal"]
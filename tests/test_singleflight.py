@@ -0,0 +1,87 @@
+"""Tests for single-flight call coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.utils.deadline import DeadlineExceeded, begin_update, current_deadline
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """Test that concurrent calls with the same key run the function once."""
+    flights = SingleFlight()
+    started = 0
+
+    async def call():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("key", call) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert started == 1
+    assert flights.stats()["coalesced"] == 4
+    assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_calls_are_not_reused():
+    """Test that a later call with the same key starts a new call."""
+    flights = SingleFlight()
+
+    async def call():
+        return object()
+
+    first = await flights.do("key", call)
+    second = await flights.do("key", call)
+
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_exceptions_reach_every_waiter_and_cancellation_does_not_spread():
+    """Test that errors are shared and that one cancelled caller doesn't cancel the rest."""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    cancelled = asyncio.create_task(flights.do("key", call))
+    waiter = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+
+    with pytest.raises(ValueError):
+        await waiter
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+@pytest.mark.asyncio
+async def test_each_caller_waits_under_its_own_deadline():
+    """Test that a joining caller isn't cut off by the first caller's shorter deadline."""
+    flights = SingleFlight()
+
+    async def call():
+        # The shared call itself isn't bound to any update's deadline
+        assert current_deadline() is None
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def caller(update_id, budget):
+        begin_update(update_id, budget)
+        return await flights.do("key", call)
+
+    first, second = await asyncio.gather(
+        caller(1, 0.01), caller(2, 5.0), return_exceptions=True
+    )
+
+    assert isinstance(first, DeadlineExceeded)
+    assert second == "result"
@@ -61,7 +61,8 @@ async def test_handle_long_text_message(mock_update, mock_context):
         await handle_text_message(mock_update, mock_context)
 
         # Should call analyze_text
-        mock_analyze.assert_called_once_with(long_text)
+        mock_analyze.assert_called_once()
+        assert mock_analyze.call_args[0][0] == long_text
         # Should send processing message
         assert mock_update.message.reply_text.called
 
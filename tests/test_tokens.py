@@ -0,0 +1,24 @@
+"""Tests for LLM token counting."""
+
+from unittest.mock import MagicMock, patch
+
+from app.utils import tokens
+
+
+def test_count_tokens_uses_the_tokenizer():
+    """Test that the loaded tokenizer's encoding length is the count."""
+    tokenizer = MagicMock()
+    tokenizer.encode.return_value = [1, 2, 3]
+
+    with patch.object(tokens, "load_tokenizer", return_value=tokenizer):
+        assert tokens.count_tokens("three tokens here") == 3
+    tokenizer.encode.assert_called_once_with(
+        "three tokens here", add_special_tokens=False, verbose=False
+    )
+
+
+def test_count_tokens_falls_back_to_estimate():
+    """Test that without a tokenizer the count is estimated from the length."""
+    with patch.object(tokens.settings, "llm_tokenizer", ""):
+        assert tokens.count_tokens("a" * 40) == 10
+        assert tokens.count_tokens("") == 0
@@ -0,0 +1,201 @@
+"""Tests for the PyTorch backend's inference modes.
+
+conftest mocks torch for the rest of the suite, so mode selection is tested
+against the mock here, and the modes themselves run on a tiny model in a
+fresh interpreter with the real library.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils import torch_backend
+from app.utils.torch_backend import TorchBackend, build_model
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Exit code of the script when real torch isn't installed
+SKIP = 77
+
+SCRIPT = r'''
+import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+try:
+    import torch
+except ImportError:
+    sys.exit(77)
+try:
+    import torchvision  # noqa: F401
+except ImportError:
+    # Only the real architectures need it; this script builds its own model
+    sys.modules["torchvision"] = MagicMock()
+
+from app.utils import torch_backend
+from app.utils.torch_backend import TorchBackend
+
+
+class Tiny(torch.nn.Module):
+    def __init__(self, weights=None):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 8, 7, stride=8)
+        self.pool = torch.nn.AdaptiveAvgPool2d(1)
+        self.fc = torch.nn.Linear(8, 1000)
+
+    def forward(self, x):
+        return self.fc(self.pool(torch.relu(self.conv(x))).flatten(1))
+
+
+torch.manual_seed(0)
+weights = Path(tempfile.mkdtemp()) / "resnet18.pth"
+torch.save(Tiny().state_dict(), weights)
+batch = torch.rand(2, 3, 224, 224).numpy()
+report = {}
+
+with patch.dict(torch_backend._ARCHITECTURES, {"resnet18": (Tiny, SimpleNamespace(url=""))}), \
+    patch.object(torch_backend, "weights_path", lambda model_name: weights):
+    model = torch_backend._load_float_model()
+    saved = torch.load(weights, weights_only=True)
+    report["weights_loaded"] = all(
+        torch.equal(saved[name], value) for name, value in model.state_dict().items()
+    )
+    report["eval"] = not model.training
+
+    reference = TorchBackend(mode="eager").predict(batch)
+    for mode in ("torchscript", "dynamic_int8", "bf16"):
+        backend = TorchBackend(mode=mode)
+        logits = backend.predict(batch)
+        report[mode] = {
+            "mode": backend.mode,
+            "shape": list(logits.shape),
+            "max_diff": float(abs(logits - reference).max()),
+        }
+
+    with patch.object(torch, "compile", side_effect=RuntimeError("no compiler")):
+        backend = TorchBackend(mode="compile")
+        backend.load()
+        report["compile_failure"] = backend.mode
+
+print(json.dumps(report))
+'''
+
+
+def test_build_model_applies_each_mode():
+    """Test that each mode wraps the fp32 model the way it names."""
+    model = MagicMock()
+    torch = torch_backend.torch
+    with patch.object(torch_backend, "_load_float_model", return_value=model) as load_float, \
+        patch.object(torch_backend, "_load_static_int8_model") as load_int8, \
+        patch.object(torch, "compile") as compile_, \
+        patch.object(torch.ao.quantization, "quantize_dynamic") as quantize, \
+        patch.object(torch.jit, "trace") as trace:
+        assert build_model("eager") is model
+        assert build_model("bf16", "mobilenet_v3_small") is model
+        assert build_model("compile") is compile_.return_value
+        assert build_model("dynamic_int8") is quantize.return_value
+        build_model("torchscript")
+        assert build_model("static_int8") is load_int8.return_value
+
+    compile_.assert_called_once_with(model)
+    assert quantize.call_args.args[:2] == (model, {torch.nn.Linear})
+    assert trace.call_args.args[0] is model
+    assert load_float.call_args_list[1].args == ("mobilenet_v3_small",)
+    # static_int8 has its own pre-quantized weights
+    assert load_float.call_count == 5
+
+
+def test_invalid_mode_is_rejected():
+    """Test that an unknown mode fails up front instead of falling back."""
+    with pytest.raises(ValueError, match="fp8"):
+        build_model("fp8")
+    with pytest.raises(ValueError, match="fp8"):
+        TorchBackend(mode="fp8")
+
+
+def test_unavailable_modes_resolve_to_eager():
+    """Test that bf16 without CPU support and static_int8 without weights run as eager."""
+    with patch.object(torch_backend, "bf16_supported", return_value=False):
+        assert torch_backend._resolve_mode("bf16") == "eager"
+    with patch.object(torch_backend, "bf16_supported", return_value=True):
+        assert torch_backend._resolve_mode("bf16") == "bf16"
+    assert torch_backend._resolve_mode("static_int8", "mobilenet_v3_small") == "eager"
+    assert torch_backend._resolve_mode("static_int8", "resnet18") == "static_int8"
+
+
+def test_mode_that_fails_to_load_falls_back_to_eager():
+    """Test that a mode that can't be built is replaced by eager, but eager failures propagate."""
+    eager = MagicMock()
+    with patch.object(torch_backend, "build_model", side_effect=[RuntimeError("boom"), eager]):
+        backend = TorchBackend(mode="torchscript")
+        backend.load()
+    assert (backend.requested_mode, backend.mode) == ("torchscript", "eager")
+    assert backend._model is eager
+
+    with patch.object(torch_backend, "build_model", side_effect=RuntimeError("no weights")), \
+        pytest.raises(RuntimeError, match="no weights"):
+        TorchBackend(mode="eager").load()
+
+
+def test_float_weights_are_memory_mapped(tmp_path):
+    """Test that fp32 weights are mmapped and assigned into the model rather than copied."""
+    path = tmp_path / "resnet18.pth"
+    path.write_bytes(b"weights")
+    constructor = MagicMock()
+    architecture = {"resnet18": (constructor, SimpleNamespace(url=""))}
+    with patch.dict(torch_backend._ARCHITECTURES, architecture), \
+        patch.object(torch_backend, "weights_path", return_value=path), \
+        patch.object(torch_backend.torch, "load") as load:
+        model = torch_backend._load_float_model("resnet18")
+
+    load.assert_called_once_with(path, map_location="cpu", mmap=True, weights_only=True)
+    constructor.assert_called_once_with(weights=None)
+    model.load_state_dict.assert_called_once_with(load.return_value, assign=True)
+    model.eval.assert_called_once_with()
+    with pytest.raises(ValueError):
+        torch_backend._load_float_model("vgg16")
+
+
+@pytest.fixture(scope="module")
+def real_modes():
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "TELEGRAM_BOT_TOKEN": "test"}
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, env=env, timeout=300
+    )
+    if result.returncode == SKIP:
+        pytest.skip("torch is not installed")
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_real_weights_load_through_mmap(real_modes):
+    """Test that a real state dict round-trips through the mmap/assign load."""
+    assert real_modes["weights_loaded"]
+    assert real_modes["eval"]
+
+
+@pytest.mark.parametrize("mode, tolerance", [
+    ("torchscript", 1e-4),
+    ("dynamic_int8", 0.05),
+    ("bf16", 0.05),
+])
+def test_real_modes_match_eager(real_modes, mode, tolerance):
+    """Test that the optimized modes produce eager's logits on a tiny model."""
+    result = real_modes[mode]
+    assert result["mode"] in (mode, "eager")
+    assert result["shape"] == [2, 1000]
+    assert result["max_diff"] < tolerance
+
+
+def test_real_compile_failure_falls_back(real_modes):
+    """Test that a torch.compile failure leaves the backend running eager."""
+    assert real_modes["compile_failure"] == "eager"
@@ -0,0 +1,54 @@
+"""Tests for the TTL/LRU cache."""
+
+from app.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Test that entries expire after the TTL."""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_persistence(tmp_path):
+    """Test that entries survive a restart when a SQLite path is set."""
+    path = str(tmp_path / "cache.db")
+    cache = TTLCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+    cache.set("a", [["cat", 0.9]])
+    cache.close()
+
+    reopened = TTLCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+    assert reopened.get("a") == [["cat", 0.9]]
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()